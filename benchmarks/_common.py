@@ -0,0 +1,84 @@
+"""
+Shared setup for the standalone benchmark scripts.
+
+Each script runs against a throwaway test database (in-memory SQLite, or a
+test database next to DATABASE_URL when that is set) seeded with synthetic
+panel data, so running a benchmark never touches real study data.
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+
+from delphi.choices import write_choices  # noqa: E402
+from delphi.models import Item, Panelist, Response, Round, RoundItem, Study  # noqa: E402
+
+
+def setup_database(test_name: str | None = None) -> None:
+    """Create an empty test database; `test_name` forces a file-backed SQLite db."""
+    setup_test_environment()
+    if test_name:
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = test_name
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def seed_round(
+    panelists: int, items: int, item_type: str = "likert5", seed: int = 0, answered: bool = True
+) -> Round:
+    """Create one study/round with `items` round items, each answered by every panelist unless `answered` is False."""
+    rng = random.Random(seed)
+    study = Study.objects.create(name="Benchmark study")
+    rnd = Round.objects.create(study=study, number=1)
+
+    item_objs = Item.objects.bulk_create(
+        [Item(study=study, prompt=f"Statement {i}", item_type=item_type) for i in range(items)]
+    )
+    ris = RoundItem.objects.bulk_create(
+        [RoundItem(round=rnd, item=item, order=i + 1) for i, item in enumerate(item_objs)]
+    )
+    people = Panelist.objects.bulk_create(
+        [Panelist(study=study, email=f"p{i}@example.com", consent_given=True) for i in range(panelists)]
+    )
+
+    if not answered:
+        return rnd
+
+    def save(batch):
+        # bulk_create bypasses signals, so write the choice rows that stats and exports read
+        created = Response.objects.bulk_create(batch)
+        write_choices([(r.id, r.panelist_id, r.round_item, r.value) for r in created], replace=False)
+
+    batch = []
+    for p in people:
+        for ri in ris:
+            batch.append(Response(panelist=p, round_item=ri, value=str(rng.randint(1, 5))))
+        if len(batch) >= 20000:
+            save(batch)
+            batch = []
+    save(batch)
+    return rnd
+
+
+@contextmanager
+def measure(label: str):
+    """Print wall time and query count for the wrapped block."""
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000:10.1f} ms  {len(ctx.captured_queries):7d} queries")
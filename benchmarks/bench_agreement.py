@@ -0,0 +1,42 @@
+"""
+Benchmark round-wide agreement metrics (Fleiss' kappa, Krippendorff's alpha, Kendall's W).
+
+    python benchmarks/bench_agreement.py --panelists 2000 --items 300
+"""
+from __future__ import annotations
+
+import argparse
+import tracemalloc
+
+from _common import measure, seed_round, setup_database
+
+from delphi.agreement import agreement, compute_agreement_for_round
+from delphi.stats import likert_matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--panelists", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=300)
+    args = parser.parse_args()
+
+    setup_database()
+    rnd = seed_round(args.panelists, args.items)
+    print(f"{args.panelists} panelists x {args.items} items = {args.panelists * args.items} responses\n")
+
+    with measure("load matrix"):
+        _, _, matrix = likert_matrix(rnd.id)
+
+    tracemalloc.start()
+    with measure("coefficients (array math only)"):
+        agreement(matrix)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{'peak memory during coefficients':<40} {peak / 2 ** 20:10.1f} MiB")
+
+    with measure("compute_agreement_for_round (end to end)"):
+        compute_agreement_for_round(rnd.id)
+
+
+if __name__ == "__main__":
+    main()
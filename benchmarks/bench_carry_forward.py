@@ -0,0 +1,30 @@
+"""
+Benchmark carrying a round forward: aggregate recompute, round item copy and previous-answer snapshot.
+
+    python benchmarks/bench_carry_forward.py --panelists 2000 --items 300
+"""
+from __future__ import annotations
+
+import argparse
+
+from _common import measure, seed_round, setup_database
+
+from delphi.rounds import carry_forward_round
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--panelists", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=300)
+    args = parser.parse_args()
+
+    setup_database()
+    rnd = seed_round(args.panelists, args.items)
+
+    with measure(f"carry forward {args.items} items x {args.panelists} panelists"):
+        result = carry_forward_round(rnd.id)
+    print(f"round {result['round'].number}: {result['items']} items, {result['prior_responses']} previous answers")
+
+
+if __name__ == "__main__":
+    main()
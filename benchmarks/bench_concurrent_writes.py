@@ -0,0 +1,109 @@
+"""
+Benchmark concurrent answer saves: many panelists saving at the same time.
+
+    python benchmarks/bench_concurrent_writes.py --panelists 50 --items 40 --passes 2
+
+Each panelist runs in its own thread with its own connection to a file-backed
+SQLite database (or the DATABASE_URL test database) and saves every item
+`--passes` times: the first pass creates answers, later passes revise them.
+Compares save_response (one INSERT ... ON CONFLICT write checked against the
+submission lock) with the previous update_or_create path, then checks the
+incrementally maintained aggregates against the stored responses.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+
+from _common import seed_round, setup_database
+
+from django.db import connection, transaction
+
+from delphi.models import FeedbackAggregate, Panelist, Response, RoundItem
+from delphi.services import COUNTER_FIELDS, apply_response_delta, round_aggregates, save_response
+
+
+def update_or_create_save(panelist_id, round_item, value):
+    """The save path before the single-statement upsert."""
+    with transaction.atomic():
+        old_value = (
+            Response.objects.select_for_update()
+            .filter(panelist_id=panelist_id, round_item=round_item)
+            .values_list("value", flat=True)
+            .first()
+        )
+        Response.objects.update_or_create(panelist_id=panelist_id, round_item=round_item, defaults={"value": value})
+        apply_response_delta(round_item, old_value, value)
+
+
+def run(label, save, panelist_ids, round_items, passes):
+    errors = Counter()
+    saved = Counter()
+    start_line = threading.Barrier(len(panelist_ids))
+
+    def worker(panelist_id):
+        rng = random.Random(panelist_id)
+        start_line.wait()
+        try:
+            for _ in range(passes):
+                for ri in round_items:
+                    try:
+                        save(panelist_id, ri, str(rng.randint(1, 5)))
+                        saved[threading.get_ident()] += 1
+                    except Exception as e:  # count and carry on, as a web worker would
+                        errors[f"{type(e).__name__}: {e}"] += 1
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(pid,)) for pid in panelist_ids]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    total = sum(saved.values())
+    failed = ", ".join(f"{n} {name}" for name, n in errors.items()) or "none"
+    print(f"{label:<28} {total:6d} saves in {elapsed:6.2f} s = {total / elapsed:8.1f} writes/s  errors: {failed}")
+
+
+def aggregates_match(round_id):
+    expected = {agg.round_item_id: agg for agg in round_aggregates(round_id)}
+    stored = {agg.round_item_id: agg for agg in FeedbackAggregate.objects.filter(round_item__round_id=round_id)}
+    return all(
+        ri_id in stored and all(getattr(stored[ri_id], f) == getattr(want, f) for f in ["n", *COUNTER_FIELDS])
+        for ri_id, want in expected.items()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--panelists", type=int, default=50)
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument("--passes", type=int, default=2)
+    args = parser.parse_args()
+
+    setup_database("bench_concurrent_writes.sqlite3")
+    rnd = seed_round(args.panelists, args.items, answered=False)
+    panelist_ids = list(Panelist.objects.filter(study=rnd.study).values_list("id", flat=True))
+    round_items = list(RoundItem.objects.filter(round=rnd).select_related("item"))
+    print(f"{args.panelists} concurrent panelists x {args.items} items x {args.passes} passes\n")
+
+    for label, save in [
+        ("update_or_create", update_or_create_save),
+        ("INSERT ... ON CONFLICT", save_response),
+    ]:
+        Response.objects.all().delete()
+        FeedbackAggregate.objects.all().delete()
+        run(label, save, panelist_ids, round_items, args.passes)
+        print(f"{'':<28} aggregates match responses: {'yes' if aggregates_match(rnd.id) else 'NO'}")
+
+    connection.creation.destroy_test_db(connection.settings_dict["NAME"], verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark the streaming exporter: throughput and peak Python memory at two sizes.
+
+    python benchmarks/bench_export.py --sizes 10000 200000
+
+Peak memory should stay roughly constant as the number of responses grows.
+Throughput is measured with tracemalloc running, which slows it down.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from _common import seed_round, setup_database
+
+from delphi.exports import Progress, iter_responses, open_output, write_rows
+from delphi.models import Study
+
+ITEMS = 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 200000])
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+
+    setup_database()
+    for size in args.sizes:
+        Study.objects.all().delete()
+        rnd = seed_round(max(size // ITEMS, 1), ITEMS)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "export"
+            tracemalloc.start()
+            start = time.perf_counter()
+            with open_output(out, args.gzip) as f:
+                n = write_rows(iter_responses(rnd.study_id), f, args.format, Progress(lambda *a: None))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        print(f"{n:>10} rows  {n / elapsed:12,.0f} rows/sec  peak {peak / 2 ** 20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Benchmark round-wide feedback aggregation.
+
+    python benchmarks/bench_feedback.py --panelists 1000 --items 200
+
+Compares the grouped single-pass engine (compute_feedback_for_round) with
+aggregating the same round one item at a time.
+"""
+from __future__ import annotations
+
+import argparse
+
+from _common import measure, seed_round, setup_database
+
+from delphi.models import FeedbackAggregate, RoundItem
+from delphi.services import compute_feedback_for_round, compute_feedback_for_round_item
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--panelists", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_database()
+    rnd = seed_round(args.panelists, args.items)
+    print(f"{args.panelists} panelists x {args.items} items = {args.panelists * args.items} responses\n")
+
+    with measure("per-item loop"):
+        for ri in RoundItem.objects.filter(round=rnd).select_related("item"):
+            compute_feedback_for_round_item(ri)
+
+    FeedbackAggregate.objects.all().delete()
+    with measure("grouped engine (fresh insert)"):
+        compute_feedback_for_round(rnd.id)
+
+    with measure("grouped engine (upsert existing)"):
+        compute_feedback_for_round(rnd.id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Load test for live group feedback: many idle Server-Sent Events connections.
+
+    python benchmarks/bench_feedback_stream.py --connections 1000 --idle 5
+
+Opens `--connections` item feedback streams (one panelist session each,
+`--batch` at a time) against the ASGI application in-process, so no server
+or sockets are involved. It then:
+
+- keeps them idle for `--idle` seconds;
+- saves one answer and times until every stream has received the update;
+- closes all of the streams.
+
+Reports traced memory per open connection, the publisher's database polls
+while idle (independent of the number of connections) and the fan-out time.
+Uses a file-backed SQLite database because polls run on a worker thread.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from _common import seed_round, setup_database
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.asgi import get_asgi_application
+from django.db import connection
+from django.test import RequestFactory
+
+from delphi import live
+from delphi.models import Panelist, RoundItem
+from delphi.services import save_response
+from delphi.sessions import get_panelist
+
+
+class Connection:
+    """One streaming GET driven through the ASGI interface."""
+
+    def __init__(self, app, path: str, session_key: str):
+        self.scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"testserver"), (b"cookie", f"sessionid={session_key}".encode())],
+            "client": ("127.0.0.1", 40000),
+            "server": ("testserver", 80),
+        }
+        self.app = app
+        self.status = None
+        self.opened = asyncio.Event()
+        self.updated = asyncio.Event()
+        self.gone = asyncio.Event()
+        self.requested = False
+
+    async def receive(self):
+        if not self.requested:
+            self.requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message["type"] == "http.response.body":
+            if message.get("body", b"").startswith(b"retry:"):
+                self.opened.set()
+            elif b"event: feedback" in message.get("body", b""):
+                self.updated.set()
+            if not message.get("more_body"):
+                self.opened.set()
+
+    def start(self) -> asyncio.Task:
+        return asyncio.create_task(self.app(self.scope, self.receive, self.send))
+
+
+def make_sessions(panelist_ids):
+    """One logged-in session per panelist, with the panelist snapshot already stored as after a page view."""
+    keys = []
+    for panelist_id in panelist_ids:
+        request = RequestFactory().get("/")
+        request.session = SessionStore()
+        request.session["panelist_id"] = panelist_id
+        get_panelist(request)
+        request.session.create()
+        keys.append(request.session.session_key)
+    return keys
+
+
+async def run(app, round_item, panelist_ids, session_keys, idle, batch):
+    polls = 0
+    changed_aggregates = live.changed_aggregates
+
+    def counted(*args):
+        nonlocal polls
+        polls += 1
+        return changed_aggregates(*args)
+
+    live.changed_aggregates = counted
+    path = f"/item/{round_item.id}/feedback/stream/"
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    connections = [Connection(app, path, key) for key in session_keys]
+    tasks = []
+    for i in range(0, len(connections), batch):
+        tasks.extend(c.start() for c in connections[i:i + batch])
+        await asyncio.gather(*(c.opened.wait() for c in connections[i:i + batch]))
+    statuses = Counter(c.status for c in connections)
+    print(f"{'open streams':<40} {time.perf_counter() - start:10.2f} s  "
+          f"({live.publisher.connections} subscribed, statuses {dict(statuses)})")
+    connections = [c for c in connections if c.status == 200]
+
+    polls = 0
+    await asyncio.sleep(idle)
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    print(f"{'idle':<40} {idle:10.2f} s  {polls} polls, "
+          f"{held / len(connections) / 1024:.1f} KiB traced per connection, {threading.active_count()} threads")
+
+    start = time.perf_counter()
+    await sync_to_async(save_response)(panelist_ids[0], round_item, "4")
+    await asyncio.gather(*(c.updated.wait() for c in connections))
+    print(f"{'update reaches every stream':<40} {time.perf_counter() - start:10.2f} s")
+
+    for c in connections:
+        c.gone.set()
+    await asyncio.gather(*tasks)
+    tracemalloc.stop()
+    live.changed_aggregates = changed_aggregates
+    print(f"{'closed':<40} {live.publisher.connections} still subscribed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--idle", type=float, default=5.0)
+    parser.add_argument("--batch", type=int, default=50, help="Streams opened at the same time.")
+    args = parser.parse_args()
+
+    settings.DELPHI_LIVE_FEEDBACK = True
+    setup_database("bench_feedback_stream.sqlite3")
+    rnd = seed_round(args.connections, 1, answered=False)
+    rnd.show_feedback_immediately = True
+    rnd.save()
+    round_item = RoundItem.objects.select_related("item").get(round=rnd)
+    panelist_ids = list(Panelist.objects.filter(study=rnd.study).values_list("id", flat=True))
+    session_keys = make_sessions(panelist_ids)
+    print(f"{args.connections} idle feedback streams on one round item\n")
+
+    asyncio.run(run(get_asgi_application(), round_item, panelist_ids, session_keys, args.idle, args.batch))
+
+    connection.creation.destroy_test_db(connection.settings_dict["NAME"], verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
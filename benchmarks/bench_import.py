@@ -0,0 +1,50 @@
+"""
+Benchmark the bulk item importer: first import, re-import (all unchanged) and a partial update.
+
+    python benchmarks/bench_import.py --items 10000
+
+Query counts grow with the number of 500-row batches, not with the number of rows.
+"""
+from __future__ import annotations
+
+import argparse
+
+from _common import measure, setup_database
+
+from delphi.importers import import_items, parse_item_rows
+from delphi.models import Round, Study
+
+
+def rows(n: int, suffix: str = ""):
+    for i in range(n):
+        yield {
+            "stable_code": f"Q{i:05d}",
+            "version": "1",
+            "stem_text": f"Statement {i}{suffix if i % 10 == 0 else ''}",
+            "response_type": "LIKERT_5",
+            "domain_tag": f"Domain {i % 8}",
+            "order_index": str(i + 1),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=10000)
+    args = parser.parse_args()
+
+    setup_database()
+    study = Study.objects.create(name="Benchmark study")
+    rnd = Round.objects.create(study=study, number=1)
+
+    with measure(f"parse + validate {args.items} rows"):
+        items = parse_item_rows(rows(args.items))
+    with measure("first import + attach to round"):
+        print(import_items(study, items, rnd))
+    with measure("re-import, unchanged"):
+        print(import_items(study, parse_item_rows(rows(args.items)), rnd))
+    with measure("re-import, 10% changed"):
+        print(import_items(study, parse_item_rows(rows(args.items, " (revised)")), rnd))
+
+
+if __name__ == "__main__":
+    main()
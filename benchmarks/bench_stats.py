@@ -0,0 +1,60 @@
+"""
+Benchmark likert descriptive statistics (median, SD, IQR, mode, top/bottom box).
+
+    python benchmarks/bench_stats.py --panelists 1000 --items 200
+
+Compares the vectorized NumPy matrix pass (delphi.stats) with a per-item
+Python loop that loads each item's responses and uses the statistics module.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+
+from _common import measure, seed_round, setup_database
+
+from delphi.models import Response, RoundItem
+from delphi.stats import compute_descriptive_stats, describe, likert_matrix
+
+
+def per_item_loop(round_id):
+    results = {}
+    for ri in RoundItem.objects.filter(round_id=round_id):
+        values = [int(v) for v in Response.objects.filter(round_item=ri).values_list("value", flat=True)]
+        if not values:
+            continue
+        q1, _, q3 = statistics.quantiles(values, n=4, method="inclusive")
+        results[ri.id] = {
+            "median": statistics.median(values),
+            "std_dev": statistics.stdev(values) if len(values) > 1 else None,
+            "iqr": q3 - q1,
+            "mode": min(statistics.multimode(values)),
+            "top_box": sum(v >= 4 for v in values) / len(values),
+            "bottom_box": sum(v <= 2 for v in values) / len(values),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--panelists", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_database()
+    rnd = seed_round(args.panelists, args.items)
+    print(f"{args.panelists} panelists x {args.items} items = {args.panelists * args.items} responses\n")
+
+    with measure("per-item Python loop (no writes)"):
+        per_item_loop(rnd.id)
+
+    with measure("NumPy: load matrix"):
+        _, _, matrix = likert_matrix(rnd.id)
+    with measure("NumPy: describe (array math only)"):
+        describe(matrix)
+    with measure("NumPy: full pass incl. bulk write"):
+        compute_descriptive_stats(rnd.id)
+
+
+if __name__ == "__main__":
+    main()
@@ -97,6 +97,34 @@ else:
         }
     }
 
+# -----------------------
+# Cache
+# -----------------------
+# Per-process memory by default. With several gunicorn workers, set DJANGO_CACHE so they share
+# group feedback, navigation and session versions: "file:/var/tmp/delphi-cache", or
+# "db:delphi_cache" after `python manage.py createcachetable`.
+DJANGO_CACHE = os.environ.get("DJANGO_CACHE", "locmem")
+if DJANGO_CACHE.startswith("file:"):
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": DJANGO_CACHE[5:]}
+    }
+elif DJANGO_CACHE.startswith("db:"):
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": DJANGO_CACHE[3:]}}
+else:
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "OPTIONS": {"MAX_ENTRIES": 10000}}
+    }
+
+# Group feedback (delphi.feedback_cache) is served from the cache for this many seconds, then
+# served stale while one request refreshes it, for at most DELPHI_FEEDBACK_STALE_TTL more seconds.
+DELPHI_FEEDBACK_MAX_AGE = float(os.environ.get("DELPHI_FEEDBACK_MAX_AGE", "5"))
+DELPHI_FEEDBACK_STALE_TTL = float(os.environ.get("DELPHI_FEEDBACK_STALE_TTL", "300"))
+
+# Live group feedback over Server-Sent Events (delphi.live) needs the ASGI app, e.g.
+# `gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker`. Under WSGI a stream would hold a
+# worker forever, so it stays off unless enabled, and is never served to WSGI requests.
+DELPHI_LIVE_FEEDBACK = os.environ.get("DELPHI_LIVE_FEEDBACK", "0") == "1"
+
 # -----------------------
 # Password validation
 # -----------------------
@@ -1,8 +1,10 @@
 from django.contrib import admin
+from django.db.models import Count, F, Q
 from django.utils.html import format_html
 from .models import (
     Study, Round, Item, RoundItem, Panelist, 
-    MagicLink, Response, RoundSubmission, FeedbackAggregate
+    MagicLink, Response, RoundSubmission, FeedbackAggregate,
+    AgreementMetric, StabilityStat, PriorResponse, RoundProgress,
 )
 
 
@@ -14,20 +16,37 @@ class StudyAdmin(admin.ModelAdmin):
 
 @admin.register(Round)
 class RoundAdmin(admin.ModelAdmin):
-    list_display = ('study', 'number', 'is_open', 'show_feedback_immediately', 'created_at')
+    list_display = ('study', 'number', 'is_open', 'show_feedback_immediately', 'completion', 'created_at')
     list_filter = ('study', 'is_open')
     list_editable = ('is_open', 'show_feedback_immediately')
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            n_started=Count('progress'),
+            n_completed=Count(
+                'progress',
+                filter=Q(progress__total_items__gt=0, progress__answered_count__gte=F('progress__total_items')),
+            ),
+        )
+
+    def completion(self, obj):
+        return f"{obj.n_completed} of {obj.n_started} started"
+    completion.short_description = "Completed"
+
 
 @admin.register(Item)
 class ItemAdmin(admin.ModelAdmin):
-    list_display = ('prompt_short', 'study', 'item_type', 'created_at')
-    list_filter = ('study', 'item_type')
-    search_fields = ('prompt',)
+    list_display = ('prompt_short', 'study', 'stable_code', 'version', 'item_type', 'domain', 'created_at')
+    list_filter = ('study', 'item_type', 'domain')
+    search_fields = ('prompt', 'stable_code')
     
     fieldsets = (
         (None, {
-            'fields': ('study', 'prompt', 'item_type')
+            'fields': ('study', 'prompt', 'item_type', 'domain')
+        }),
+        ('Question Bank', {
+            'fields': ('stable_code', 'version', 'order_index'),
+            'classes': ('collapse',),
         }),
         ('Multiple Choice Options', {
             'fields': ('option_a', 'option_b', 'option_c', 'option_d', 'option_e', 'option_f'),
@@ -105,6 +124,30 @@ class ResponseAdmin(admin.ModelAdmin):
     search_fields = ('panelist__email',)
 
 
+@admin.register(PriorResponse)
+class PriorResponseAdmin(admin.ModelAdmin):
+    list_display = ('panelist', 'round_item', 'value', 'answered_at')
+    list_filter = ('round_item__round__study', 'round_item__round')
+    search_fields = ('panelist__email',)
+
+
+@admin.register(RoundProgress)
+class RoundProgressAdmin(admin.ModelAdmin):
+    list_display = ('panelist', 'round', 'answered_count', 'total_items', 'percent_complete', 'complete', 'last_activity')
+    list_filter = ('round__study', 'round')
+    search_fields = ('panelist__email',)
+    list_select_related = ('panelist', 'round')
+    readonly_fields = ('panelist', 'round', 'answered_count', 'total_items', 'last_activity')
+
+    def percent_complete(self, obj):
+        return f"{round(100 * obj.answered_count / obj.total_items) if obj.total_items else 0}%"
+    percent_complete.short_description = "Progress"
+
+    def complete(self, obj):
+        return obj.is_complete
+    complete.boolean = True
+
+
 @admin.register(RoundSubmission)
 class RoundSubmissionAdmin(admin.ModelAdmin):
     list_display = ('panelist', 'round', 'submitted_at')
@@ -113,5 +156,21 @@ class RoundSubmissionAdmin(admin.ModelAdmin):
 
 @admin.register(FeedbackAggregate)
 class FeedbackAggregateAdmin(admin.ModelAdmin):
-    list_display = ('round_item', 'n', 'mean', 'pct_agree', 'consensus_reached', 'computed_at')
-    list_filter = ('round_item__round__study', 'round_item__round', 'consensus_reached')
\ No newline at end of file
+    list_display = ('round_item', 'n', 'mean', 'median', 'iqr', 'pct_agree', 'consensus_reached', 'computed_at')
+    list_filter = ('round_item__round__study', 'round_item__round', 'consensus_reached')
+
+
+@admin.register(AgreementMetric)
+class AgreementMetricAdmin(admin.ModelAdmin):
+    list_display = ('round', 'domain_display', 'n_items', 'n_panelists', 'fleiss_kappa', 'krippendorff_alpha', 'kendall_w', 'computed_at')
+    list_filter = ('round__study', 'round')
+
+    def domain_display(self, obj):
+        return obj.domain or "All items"
+    domain_display.short_description = "Domain"
+
+
+@admin.register(StabilityStat)
+class StabilityStatAdmin(admin.ModelAdmin):
+    list_display = ('round_item', 'n_paired', 'change_rate', 'mean_shift', 'test', 'p_value', 'is_stable', 'shift_significant', 'computed_at')
+    list_filter = ('round_item__round__study', 'round_item__round', 'is_stable', 'shift_significant')
@@ -0,0 +1,127 @@
+"""
+Inter-rater agreement coefficients over a round's likert items.
+
+All three coefficients are computed from the panelist x item matrix built by
+delphi.stats.likert_matrix:
+
+- Fleiss' kappa (nominal, allowing a different number of raters per item)
+- Krippendorff's alpha with the ordinal difference function
+- Kendall's W (panelists as judges ranking the items), over panelists who
+  rated every item, with the correction for tied ranks
+
+Kappa and alpha only need each item's level counts; W is accumulated over
+panelist chunks so memory stays bounded by CHUNK_SIZE x items.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .models import AgreementMetric, RoundItem
+from .stats import LEVELS, MISSING, level_counts, likert_matrix
+
+CHUNK_SIZE = 1000
+
+
+def _ratio(num: float, den: float) -> Optional[float]:
+    return float(num / den) if den else None
+
+
+def fleiss_kappa(counts: np.ndarray) -> Optional[float]:
+    """`counts` is (items, levels). Items with fewer than two ratings are ignored."""
+    n_i = counts.sum(axis=1)
+    counts = counts[n_i >= 2]
+    n_i = n_i[n_i >= 2]
+    if not len(n_i):
+        return None
+
+    p_i = ((counts ** 2).sum(axis=1) - n_i) / (n_i * (n_i - 1))
+    p_j = counts.sum(axis=0) / n_i.sum()
+    p_e = (p_j ** 2).sum()
+    return _ratio(p_i.mean() - p_e, 1 - p_e)
+
+
+def krippendorff_alpha_ordinal(counts: np.ndarray) -> Optional[float]:
+    """`counts` is (items, levels). Items with fewer than two ratings are not pairable and are ignored."""
+    counts = counts.astype(np.float64)
+    m_u = counts.sum(axis=1)
+    counts = counts[m_u >= 2]
+    m_u = m_u[m_u >= 2]
+    if not len(m_u):
+        return None
+
+    weighted = counts / (m_u - 1)[:, None]
+    coincidence = weighted.T @ counts - np.diag(weighted.sum(axis=0))
+    n_c = coincidence.sum(axis=1)
+    n = n_c.sum()
+
+    # Ordinal metric: delta(c, k) = (sum of n_g for g between c and k - (n_c + n_k) / 2) ** 2
+    cum = np.concatenate([[0.0], np.cumsum(n_c)])
+    lo = np.minimum.outer(np.arange(len(n_c)), np.arange(len(n_c)))
+    hi = np.maximum.outer(np.arange(len(n_c)), np.arange(len(n_c)))
+    delta = (cum[hi + 1] - cum[lo] - (n_c[:, None] + n_c[None, :]) / 2) ** 2
+
+    observed = (coincidence * delta).sum()
+    expected = (np.outer(n_c, n_c) * delta).sum() / (n - 1)
+    if not expected:
+        return None
+    return float(1 - observed / expected)
+
+
+def kendall_w(matrix: np.ndarray) -> tuple:
+    """Returns (W, number of complete judges) over panelists who rated every item."""
+    complete = matrix[(matrix != MISSING).all(axis=1)]
+    m, n = complete.shape
+    if m < 2 or n < 2:
+        return None, m
+
+    rank_sums = np.zeros(n)
+    ties = 0.0
+    for start in range(0, m, CHUNK_SIZE):
+        chunk = complete[start:start + CHUNK_SIZE]
+        # Each judge's ratings take few distinct values, so tied average ranks come from level counts
+        per_level = np.stack([(chunk == k).sum(axis=1) for k in LEVELS], axis=1)
+        below = np.cumsum(per_level, axis=1) - per_level
+        rank_of_level = below + (per_level + 1) / 2
+        rank_sums += np.take_along_axis(rank_of_level, chunk.astype(np.intp) - 1, axis=1).sum(axis=0)
+        ties += (per_level ** 3 - per_level).sum()
+
+    s = ((rank_sums - rank_sums.mean()) ** 2).sum()
+    return _ratio(12 * s, m ** 2 * (n ** 3 - n) - m * ties), m
+
+
+def agreement(matrix: np.ndarray) -> Dict:
+    """All coefficients for a panelist x item matrix."""
+    counts = level_counts(matrix).T
+    w, n_complete = kendall_w(matrix)
+    return {
+        "n_items": matrix.shape[1],
+        "n_panelists": int((matrix != MISSING).any(axis=1).sum()),
+        "n_complete": n_complete,
+        "fleiss_kappa": fleiss_kappa(counts),
+        "krippendorff_alpha": krippendorff_alpha_ordinal(counts),
+        "kendall_w": w,
+    }
+
+
+def compute_agreement_for_round(round_id: int) -> List[AgreementMetric]:
+    """Compute agreement for the whole round and for each item domain, and store it."""
+    _, round_item_ids, matrix = likert_matrix(round_id)
+    domain_of = dict(RoundItem.objects.filter(round_id=round_id).values_list("id", "item__domain"))
+    domains = np.array([domain_of[ri_id] for ri_id in round_item_ids.tolist()], dtype=object)
+
+    metrics = [AgreementMetric(round_id=round_id, domain="", **agreement(matrix))]
+    for domain in sorted(set(domains) - {""}):
+        metrics.append(AgreementMetric(round_id=round_id, domain=domain, **agreement(matrix[:, domains == domain])))
+
+    AgreementMetric.objects.filter(round_id=round_id).exclude(domain__in=[m.domain for m in metrics]).delete()
+    AgreementMetric.objects.bulk_create(
+        metrics,
+        update_conflicts=True,
+        unique_fields=["round", "domain"],
+        update_fields=[
+            "n_items", "n_panelists", "n_complete", "fleiss_kappa", "krippendorff_alpha", "kendall_w", "computed_at",
+        ],
+    )
+    return metrics
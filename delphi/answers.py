@@ -0,0 +1,110 @@
+"""
+Reading a panelist's answer to one item from submitted data.
+
+item_detail and the whole-round form (HTML or JSON) all go through
+parse_answer, so every path applies the same rules per item type and stores
+the formats described in delphi.distributions. The rules come from the item's
+compiled schema (delphi.schema). Data is read from a QueryDict
+or MultiValueDict; answer_data builds one from a JSON object.
+"""
+from __future__ import annotations
+
+import json
+from typing import Optional, Tuple
+
+from django.utils.datastructures import MultiValueDict
+
+from .distributions import OTHER_PREFIX
+from .schema import MATRIX_ANSWERS, item_schema
+
+
+class AnswerError(ValueError):
+    """A submitted value the item cannot take."""
+
+
+def answer_data(obj: dict) -> MultiValueDict:
+    """A JSON answer object as form data; list values (checkbox_value) become multi-values."""
+    return MultiValueDict(
+        {key: [str(v) for v in value] if isinstance(value, list) else [value] for key, value in obj.items()}
+    )
+
+
+def _text(data, key: str) -> str:
+    value = data.get(key)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return "" if value is None else str(value).strip()
+
+
+def _matrix_value(schema, data, prefix: str) -> str:
+    value = _text(data, f"{prefix}value")
+    if value and value != "{}":
+        try:
+            cells = json.loads(value)
+        except json.JSONDecodeError:
+            raise AnswerError("The grid answer could not be read.")
+        if not isinstance(cells, dict):
+            raise AnswerError("The grid answer could not be read.")
+    else:
+        # Plain forms send one answer and classification per row instead of the JSON value
+        cells = {}
+        for i, row in enumerate(schema.matrix_rows, start=1):
+            answer = _text(data, f"{prefix}matrix_answer_{i}")
+            if answer:
+                classification = _text(data, f"{prefix}matrix_class_{i}") if answer == "Yes" else ""
+                cells[row] = {"answer": answer, "classification": classification or None}
+
+    for row, cell in cells.items():
+        if row not in schema.matrix_rows or not isinstance(cell, dict) or cell.get("answer") not in MATRIX_ANSWERS:
+            raise AnswerError(f"Unknown grid answer for {row!r}.")
+        # Only a row answered "Yes" is classified, and only with a classification column
+        allowed = schema.classifications if cell["answer"] == "Yes" else ()
+        if cell.get("classification") not in (None, *allowed):
+            raise AnswerError(f"Unknown classification for {row!r}.")
+    return json.dumps(cells) if cells else ""
+
+
+def parse_answer(item, data, prefix: str = "") -> Tuple[str, Optional[str]]:
+    """
+    The (value, comment) submitted for `item`, with field names optionally
+    prefixed (e.g. "ri-12-" on the round form). value is "" when unanswered.
+    Raises AnswerError for a value the item does not offer.
+    """
+    comment = _text(data, f"{prefix}comment") or None
+    schema = item_schema(item)
+    item_type, other_code = schema.item_type, schema.other_code
+
+    if item_type == "likert5":
+        value = _text(data, f"{prefix}value")
+        if value and value not in schema.accepted:
+            raise AnswerError("Choose a rating from 1 to 5.")
+
+    elif item_type == "yesno":
+        value = _text(data, f"{prefix}value")
+        if value and value not in schema.accepted:
+            raise AnswerError("Answer yes or no.")
+
+    elif item_type == "multiple":
+        value = _text(data, f"{prefix}value")
+        if value and value not in schema.accepted:
+            raise AnswerError("Choose one of the listed options.")
+        other_text = _text(data, f"{prefix}other_text")
+        if value and value == other_code and other_text:
+            value = f"{OTHER_PREFIX} {other_text}"
+
+    elif item_type == "checkbox":
+        chosen = [str(v).strip() for v in data.getlist(f"{prefix}checkbox_value")]
+        if any(code not in schema.accepted for code in chosen):
+            raise AnswerError("Choose from the listed options.")
+        other_text = _text(data, f"{prefix}cb_other_text")
+        value = ",".join(
+            f"{OTHER_PREFIX} {other_text}" if code == other_code and other_text else code for code in chosen
+        )
+
+    elif item_type == "matrix":
+        value = _matrix_value(schema, data, prefix)
+
+    else:
+        value = _text(data, f"{prefix}value")
+
+    return value, comment
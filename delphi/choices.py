@@ -0,0 +1,116 @@
+"""
+Normalized, typed copy of each Response's selections (ResponseChoice).
+
+A stored value is split with response_tokens into one row per likert level,
+selected option or matrix cell, so readers get typed selections from indexed
+columns instead of parsing `Response.value` in Python: the likert matrix behind
+descriptive stats and agreement (likert_ratings), the wide export's one-hot
+and matrix answer columns (item_selections), and per-option counts and likert
+means computed in the database (option_counts, likert_means), which
+`rebuild_choices --check` compares with the feedback rebuilt from responses.
+Free "Other" texts stay in the value only.
+
+Rows are rewritten wherever a Response is written: save_response and
+save_round_responses call write_choices directly (their writes bypass model
+signals) and a post_save receiver covers Model.save(), e.g. admin edits.
+Code that writes responses with queryset update() or bulk_create() must call
+write_choices itself.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import Avg, Count
+
+from .distributions import DISTRIBUTION_TYPES, likert_level, response_tokens
+from .models import ResponseChoice
+
+BATCH_SIZE = 1000
+
+# (response id, panelist id, round item with `item` loaded, stored value)
+ResponseRow = Tuple[int, int, object, str]
+
+
+def choice_rows(item, value: Optional[str]) -> List[Tuple[str, str, Optional[int]]]:
+    """(row_key, option_code, numeric_value) for each selection in a stored value."""
+    if item.item_type == "likert5":
+        level = likert_level(value)
+        return [("", str(level), level)] if level is not None else []
+    if item.item_type not in DISTRIBUTION_TYPES:
+        return []
+    tokens, _ = response_tokens(item, value)
+    return [(row or "", code, None) for row, code in tokens]
+
+
+def build_choices(responses: Iterable[ResponseRow]) -> list:
+    """Unsaved choice rows for `responses`."""
+    return [
+        ResponseChoice(
+            response_id=response_id,
+            round_item_id=round_item.id,
+            panelist_id=panelist_id,
+            row_key=row_key,
+            option_code=option_code,
+            numeric_value=numeric_value,
+        )
+        for response_id, panelist_id, round_item, value in responses
+        for row_key, option_code, numeric_value in choice_rows(round_item.item, value)
+    ]
+
+
+def write_choices(responses: List[ResponseRow], replace: bool = True) -> int:
+    """Rewrite the choice rows of `responses` (skip the delete with `replace=False` for new responses)."""
+    if replace:
+        ResponseChoice.objects.filter(response_id__in=[r[0] for r in responses]).delete()
+    rows = build_choices(responses)
+    ResponseChoice.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    return len(rows)
+
+
+def likert_ratings(round_id: int):
+    """(panelist id, round item id, level) of every likert answer in a round, read from the numeric index."""
+    return ResponseChoice.objects.filter(
+        round_item__round_id=round_id, round_item__item__item_type="likert5", numeric_value__isnull=False
+    ).values_list("panelist_id", "round_item_id", "numeric_value")
+
+
+def item_selections(round_item_ids: Iterable[int]):
+    """(panelist id, round item id, row_key, option_code) of the items' choice rows, ordered by panelist."""
+    return (
+        ResponseChoice.objects.filter(round_item_id__in=list(round_item_ids))
+        .order_by("panelist_id")
+        .values_list("panelist_id", "round_item_id", "row_key", "option_code")
+    )
+
+
+def option_counts(round_id: int) -> Dict[int, Dict]:
+    """
+    {round_item_id: distribution} for a round from one GROUP BY: {code: count}
+    for likert and option items, {row: {code: count}} for matrix items.
+    """
+    counts: Dict[int, Dict] = {}
+    rows = (
+        ResponseChoice.objects.filter(round_item__round_id=round_id)
+        .order_by()
+        .values("round_item_id", "row_key", "option_code")
+        .annotate(n=Count("id"))
+        .values_list("round_item_id", "row_key", "option_code", "n")
+    )
+    for round_item_id, row_key, option_code, n in rows:
+        bucket = counts.setdefault(round_item_id, {})
+        if row_key:
+            bucket = bucket.setdefault(row_key, {})
+        bucket[option_code] = n
+    return counts
+
+
+def likert_means(round_id: int) -> Dict[int, Tuple[int, float]]:
+    """{round_item_id: (n, mean)} for a round's likert items, computed in the database."""
+    rows = (
+        ResponseChoice.objects.filter(round_item__round_id=round_id, numeric_value__isnull=False)
+        .order_by()
+        .values("round_item_id")
+        .annotate(n=Count("id"), mean=Avg("numeric_value"))
+        .values_list("round_item_id", "n", "mean")
+    )
+    return {round_item_id: (n, mean) for round_item_id, n, mean in rows}
@@ -0,0 +1,144 @@
+"""
+Conditional GET (ETag) for panelist pages and the JSON feedback endpoint.
+
+A page's version is a tuple of everything it renders from: the panelist
+snapshot, the round's fields, the panelist's answer timestamps, the version
+of the item's cached group feedback (delphi.feedback_cache, so the ETag
+follows what is actually served), the submission lock and cache version
+counters for navigation and item content. It is read with one query (plus
+cache reads), before the view does any other work. When it hashes to the
+ETag the browser sent, the view is skipped and a 304 is returned.
+
+Responses are marked `Cache-Control: private, no-cache`, so browsers keep
+them but revalidate every time. No ETag is used while flash messages are
+pending, as the page shows them only once. The CSRF cookie is part of the
+version, so a cached form never carries a token from before a login.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import astuple
+from functools import wraps
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.contrib import messages
+from django.db.models import Count, Exists, Max, OuterRef, Subquery
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
+
+from . import versioning
+from .feedback_cache import cached_feedback
+from .models import PriorResponse, Response, Round, RoundItem, RoundSubmission
+from .navigation import navigation_version
+from .sessions import get_panelist
+
+ROUND_FIELDS = ("id", "number", "is_open", "show_feedback_immediately")
+
+
+def _items_key(study_id: int) -> str:
+    return f"delphi:study:{study_id}:items_version"
+
+
+def invalidate_study_items(study_id: int) -> None:
+    """Make pages that show the study's item texts or options change their ETag."""
+    versioning.bump(_items_key(study_id))
+
+
+def _round_fields(prefix: str = "") -> list:
+    return [f"{prefix}{name}" for name in ROUND_FIELDS]
+
+
+def _latest(*values):
+    found = [v for v in values if v is not None]
+    return max(found) if found else None
+
+
+def item_page_version(panelist, round_item_id: int) -> Optional[tuple]:
+    """Version of one panelist's item page, or None when the round item is not in their study."""
+    mine = Response.objects.filter(panelist_id=panelist.id)
+    row = (
+        RoundItem.objects.filter(id=round_item_id, round__study_id=panelist.study_id)
+        .annotate(
+            answered_at=Subquery(mine.filter(round_item_id=OuterRef("pk")).values("updated_at")[:1]),
+            started=Exists(mine.filter(round_item__round_id=OuterRef("round_id"))),
+            locked=Exists(RoundSubmission.objects.filter(panelist_id=panelist.id, round_id=OuterRef("round_id"))),
+            prior_id=Subquery(
+                PriorResponse.objects.filter(panelist_id=panelist.id, round_item_id=OuterRef("pk")).values("id")[:1]
+            ),
+        )
+        .values_list(
+            "round_id", "item__content_hash", *_round_fields("round__"),
+            "answered_at", "started", "locked", "prior_id",
+        )
+        .first()
+    )
+    if row is None:
+        return None
+    feedback = cached_feedback(round_item_id)
+    feedback_at = parse_datetime(feedback["version"]) if feedback else None
+    return ("item", round_item_id, navigation_version(row[0]), feedback_at, *row)
+
+
+def round_page_version(panelist, round_id: int) -> Optional[tuple]:
+    """Version of one panelist's round overview, or None when the round is not in their study."""
+    mine = (
+        Response.objects.filter(panelist_id=panelist.id, round_item__round_id=OuterRef("pk"))
+        .order_by()
+        .values("panelist_id")
+    )
+    row = (
+        Round.objects.filter(id=round_id, study_id=panelist.study_id)
+        .annotate(
+            n_answered=Subquery(mine.annotate(n=Count("id")).values("n")),
+            answered_at=Subquery(mine.annotate(latest=Max("updated_at")).values("latest")),
+            locked=Exists(RoundSubmission.objects.filter(panelist_id=panelist.id, round_id=OuterRef("pk"))),
+        )
+        .values_list(*_round_fields(), "n_answered", "answered_at", "locked")
+        .first()
+    )
+    if row is None:
+        return None
+    return ("round", versioning.current(_items_key(panelist.study_id)), navigation_version(round_id), *row)
+
+
+def _etag(request, panelist, version: tuple) -> str:
+    payload = repr((version, astuple(panelist), request.COOKIES.get(settings.CSRF_COOKIE_NAME)))
+    return quote_etag(hashlib.sha256(payload.encode()).hexdigest()[:32])
+
+
+def conditional_page(version_func: Callable) -> Callable:
+    """
+    Answer GETs of a panelist page with 304 when its version is unchanged.
+
+    `version_func(panelist, **view_kwargs)` returns the version tuple; its
+    datetimes also give the Last-Modified header. Anonymous requests, other
+    methods and unknown objects go straight to the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, **kwargs)
+            panelist = get_panelist(request)
+            if panelist is None or not panelist.consent_given or len(messages.get_messages(request)):
+                return view(request, **kwargs)
+            version = version_func(panelist, **kwargs)
+            if version is None:
+                return view(request, **kwargs)
+
+            etag = _etag(request, panelist, version)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view(request, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response["ETag"] = etag
+            last_modified = _latest(*(v for v in version if hasattr(v, "timestamp")))
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified.timestamp())
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
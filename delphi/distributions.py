@@ -0,0 +1,123 @@
+"""
+Per-option answer distributions for multiple, checkbox, yesno and matrix items.
+
+Stored `Response.value` formats by item type:
+
+- yesno:    "yes" / "no"
+- multiple: an option code ("A".."F"), or "Other: <text>" for the "other" option
+- checkbox: comma-joined option codes, with "Other: <text>" in place of the other option
+- matrix:   JSON object {row label: {"answer": "Yes"|"No", "classification": <column>|null}}
+
+A value is parsed into tokens: (row, code) pairs, where row is None for option
+items. Distributions are {code: count} for option items and {row: {column: count}}
+for matrix items, plus a list of the free-text "Other" answers.
+"""
+from __future__ import annotations
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+OPTION_CODES = ["A", "B", "C", "D", "E", "F"]
+
+LIKERT_LEVELS = [1, 2, 3, 4, 5]
+
+DISTRIBUTION_TYPES = ("yesno", "multiple", "checkbox", "matrix")
+
+OTHER_PREFIX = "Other:"
+
+Token = Tuple[Optional[str], str]
+
+
+def other_option_code(item) -> Optional[str]:
+    """Code of the option whose label mentions "other", if any."""
+    if hasattr(item, "other_code"):
+        # An ItemSchema carries it precomputed
+        return item.other_code
+    # Reads the option fields directly, so historical models in migrations work too
+    for code in OPTION_CODES:
+        label = getattr(item, f"option_{code.lower()}", "")
+        if label and "other" in label.lower():
+            return code
+    return None
+
+
+def _other_text(part: str) -> str:
+    return part[len(OTHER_PREFIX):].strip()
+
+
+def likert_level(value) -> Optional[int]:
+    """Parse a stored likert value; None for anything outside 1-5."""
+    try:
+        level = int(value)
+    except (TypeError, ValueError):
+        return None
+    return level if level in LIKERT_LEVELS else None
+
+
+def response_tokens(item, value: Optional[str]) -> Tuple[List[Token], List[str]]:
+    """Parse one stored value into (tokens, other_texts)."""
+    if not value:
+        return [], []
+
+    item_type = item.item_type
+    if item_type == "yesno":
+        return [(None, value.strip().lower())], []
+
+    if item_type == "multiple":
+        if value.startswith(OTHER_PREFIX):
+            return [(None, other_option_code(item) or "Other")], [_other_text(value)]
+        return [(None, value)], []
+
+    if item_type == "checkbox":
+        tokens: List[Token] = []
+        others: List[str] = []
+        in_other = False
+        for part in value.split(","):
+            if part.startswith(OTHER_PREFIX):
+                tokens.append((None, other_option_code(item) or "Other"))
+                others.append(_other_text(part))
+                in_other = True
+            elif in_other and part.strip() not in OPTION_CODES:
+                # Free text may itself contain commas
+                others[-1] = f"{others[-1]},{part}"
+            else:
+                tokens.append((None, part.strip()))
+                in_other = False
+        return tokens, [o.strip() for o in others]
+
+    if item_type == "matrix":
+        try:
+            cells = json.loads(value)
+        except (TypeError, ValueError):
+            return [], []
+        if not isinstance(cells, dict):
+            return [], []
+        tokens = []
+        for row, cell in cells.items():
+            if not isinstance(cell, dict):
+                continue
+            for key in ("answer", "classification"):
+                if cell.get(key):
+                    tokens.append((row, str(cell[key])))
+        return tokens, []
+
+    return [], []
+
+
+def add_tokens(distribution: Dict, tokens: List[Token], weight: int = 1) -> None:
+    """Add `weight` (negative to remove) to each token's count, dropping empty buckets."""
+    for row, code in tokens:
+        bucket = distribution.setdefault(row, {}) if row is not None else distribution
+        count = bucket.get(code, 0) + weight
+        if count > 0:
+            bucket[code] = count
+        else:
+            bucket.pop(code, None)
+        if row is not None and not bucket:
+            distribution.pop(row, None)
+
+
+def remove_texts(texts: List[str], removed: List[str]) -> None:
+    for text in removed:
+        if text in texts:
+            texts.remove(text)
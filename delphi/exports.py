@@ -0,0 +1,275 @@
+"""
+Streaming response exports.
+
+Rows are read with `.values_list(...).iterator(chunk_size)`, which uses a
+server-side cursor on PostgreSQL and chunked fetches elsewhere, and written
+out as they arrive, so memory stays flat however many responses a study has.
+
+The long layout has one row per response. The wide layout has one row per
+panelist and one or more columns per round item, built in a single pass over
+responses ordered by panelist; checkbox and matrix cells are read from their
+ResponseChoice rows (delphi.choices) in the same order.
+"""
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import numpy as np
+
+from .choices import item_selections
+from .distributions import OTHER_PREFIX, response_tokens
+from .models import Response, RoundItem
+from .schema import MATRIX_ANSWERS, item_schema
+
+# (output column, Response lookup)
+LONG_COLUMNS = [
+    ("study_id", "panelist__study_id"),
+    ("round_number", "round_item__round__number"),
+    ("round_item_id", "round_item_id"),
+    ("item_id", "round_item__item_id"),
+    ("item_order", "round_item__order"),
+    ("item_type", "round_item__item__item_type"),
+    ("domain", "round_item__item__domain"),
+    ("prompt", "round_item__item__prompt"),
+    ("panelist_id", "panelist_id"),
+    ("panelist_email", "panelist__email"),
+    ("value", "value"),
+    ("comment", "comment"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+]
+
+FORMATS = ("csv", "jsonl")
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def iter_responses(study_id: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple]:
+    """Stream a study's responses as tuples in LONG_COLUMNS order."""
+    return (
+        Response.objects.filter(panelist__study_id=study_id)
+        .order_by("round_item__round__number", "round_item__order", "round_item_id", "panelist_id")
+        .values_list(*(lookup for _, lookup in LONG_COLUMNS))
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def guess_format(path: Path) -> str:
+    suffixes = [s.lower() for s in path.suffixes if s.lower() != ".gz"]
+    return "jsonl" if suffixes and suffixes[-1] in (".jsonl", ".ndjson") else "csv"
+
+
+def open_output(path: Path, compress: bool) -> TextIO:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return path.open("w", encoding="utf-8", newline="")
+
+
+def _cell(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+class Progress:
+    """Calls `report(rows, rows_per_sec)` at most every `interval` seconds."""
+
+    def __init__(self, report: Callable[[int, float], None], interval: float = 2.0):
+        self.report = report
+        self.interval = interval
+        self.rows = 0
+        self.start = self.last = time.perf_counter()
+
+    def tick(self):
+        self.rows += 1
+        if not self.rows % 1000:
+            now = time.perf_counter()
+            if now - self.last >= self.interval:
+                self.last = now
+                self.report(self.rows, self.rate(now))
+
+    def rate(self, now: Optional[float] = None) -> float:
+        elapsed = (now or time.perf_counter()) - self.start
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+
+def write_rows(rows, f: TextIO, fmt: str, progress: Progress) -> int:
+    """Write `rows` (tuples in LONG_COLUMNS order) to `f`; returns the row count."""
+    header = [name for name, _ in LONG_COLUMNS]
+    if fmt == "csv":
+        w = csv.writer(f)
+        w.writerow(header)
+        for row in rows:
+            w.writerow([_cell(v) for v in row])
+            progress.tick()
+    else:
+        for row in rows:
+            f.write(json.dumps(dict(zip(header, map(_cell, row))), ensure_ascii=False))
+            f.write("\n")
+            progress.tick()
+    return progress.rows
+
+
+# Key for a matrix row's Yes/No answer column, distinct from any column label
+ANSWER = object()
+
+
+def _slug(label: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_") or "col"
+
+
+class WideLayout:
+    """
+    Column layout for the wide export, ordered by round number then RoundItem.order.
+
+    Each round item gets the prefix r<round>_q<position>. Checkbox items expand
+    into one-hot columns per option plus an "other" text column. Matrix items
+    expand into an answer column per row and one-hot columns per (row, column)
+    cell. Other items get one column with the stored value. One-hot columns are
+    0/1 for panelists who answered the item and blank otherwise.
+    """
+
+    def __init__(self, study_id: int):
+        self.columns: List[str] = ["panelist_id", "panelist_email"]
+        self.round_items: Dict[int, RoundItem] = {}
+        self.value_column: Dict[int, int] = {}
+        self.token_column: Dict[Tuple[int, Optional[str], object], int] = {}
+        self.other_column: Dict[int, int] = {}
+        self.expanded: Dict[int, List[int]] = {}
+        self.likert_columns: List[int] = []
+        self.likert_round_items: List[int] = []
+
+        positions: Dict[int, int] = {}
+        round_items = (
+            RoundItem.objects.filter(round__study_id=study_id)
+            .select_related("round", "item")
+            .order_by("round__number", "order", "id")
+        )
+        for ri in round_items:
+            positions[ri.round_id] = positions.get(ri.round_id, 0) + 1
+            self._add(ri, f"r{ri.round.number}_q{positions[ri.round_id]}")
+
+    def _column(self, name: str) -> int:
+        self.columns.append(name)
+        return len(self.columns) - 1
+
+    def _add(self, ri: RoundItem, prefix: str):
+        schema = item_schema(ri.item)
+        self.round_items[ri.id] = ri
+        if schema.item_type == "checkbox":
+            cols = [self._column(f"{prefix}_{code}") for code, _ in schema.options]
+            for (code, _), col in zip(schema.options, cols):
+                self.token_column[(ri.id, None, code)] = col
+            self.expanded[ri.id] = cols
+            self.other_column[ri.id] = self._column(f"{prefix}_other_text")
+        elif schema.item_type == "matrix":
+            cols = []
+            for r, row in enumerate(schema.matrix_rows, start=1):
+                self.token_column[(ri.id, row, ANSWER)] = self._column(f"{prefix}_r{r}_answer")
+                # The answer has its own column, so "Yes"/"No" get no one-hot column
+                for label in schema.classifications:
+                    col = self._column(f"{prefix}_r{r}_{_slug(label)}")
+                    self.token_column[(ri.id, row, label)] = col
+                    cols.append(col)
+            self.expanded[ri.id] = cols
+        else:
+            col = self._column(prefix)
+            self.value_column[ri.id] = col
+            if schema.item_type == "likert5":
+                self.likert_columns.append(col)
+                self.likert_round_items.append(ri.id)
+
+    def fill(self, row: list, round_item_id: int, value: str):
+        """Write one response into a panelist's row; its one-hot and matrix answer cells come from mark()."""
+        if round_item_id in self.value_column:
+            row[self.value_column[round_item_id]] = value
+            return
+        if round_item_id not in self.expanded:
+            return
+        for col in self.expanded[round_item_id]:
+            row[col] = 0
+        other = self.other_column.get(round_item_id)
+        if other is not None and OTHER_PREFIX in value:
+            _, others = response_tokens(item_schema(self.round_items[round_item_id].item), value)
+            if others:
+                row[other] = "; ".join(others)
+
+    def mark(self, row: list, round_item_id: int, row_key: str, code: str):
+        """Write one ResponseChoice: a selected option, or a matrix row's answer or classification."""
+        if row_key and code in MATRIX_ANSWERS:
+            col, value = self.token_column.get((round_item_id, row_key, ANSWER)), code
+        else:
+            col, value = self.token_column.get((round_item_id, row_key or None, code)), 1
+        if col is not None:
+            row[col] = value
+
+
+def write_wide(study_id: int, f: TextIO, progress: Progress, npz_path: Optional[Path] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Write the one-row-per-panelist CSV in a single streaming pass; returns the panelist count.
+
+    With `npz_path`, also saves the numeric likert block as an int8 panelist x item
+    matrix (0 = missing) with its panelist ids, column names and round item ids.
+    """
+    layout = WideLayout(study_id)
+    w = csv.writer(f)
+    w.writerow(layout.columns)
+
+    likert_rows: List[np.ndarray] = []
+    panelist_ids: List[int] = []
+    panelists = 0
+
+    # Expanded items' cells come from their choice rows, streamed alongside in the same panelist order
+    selections = item_selections(layout.expanded).iterator(chunk_size=chunk_size)
+    pending = next(selections, None)
+
+    def flush(row):
+        nonlocal pending
+        while pending is not None and pending[0] <= row[0]:
+            if pending[0] == row[0]:
+                layout.mark(row, *pending[1:])
+            pending = next(selections, None)
+        w.writerow(row)
+        if npz_path is not None:
+            block = np.zeros(len(layout.likert_columns), dtype=np.int8)
+            for j, col in enumerate(layout.likert_columns):
+                if row[col] in ("1", "2", "3", "4", "5"):
+                    block[j] = int(row[col])
+            likert_rows.append(block)
+            panelist_ids.append(row[0])
+
+    responses = (
+        Response.objects.filter(panelist__study_id=study_id)
+        .order_by("panelist_id")
+        .values_list("panelist_id", "panelist__email", "round_item_id", "value")
+        .iterator(chunk_size=chunk_size)
+    )
+    row = None
+    for panelist_id, email, round_item_id, value in responses:
+        if row is None or row[0] != panelist_id:
+            if row is not None:
+                flush(row)
+                panelists += 1
+            row = [panelist_id, email] + [""] * (len(layout.columns) - 2)
+        layout.fill(row, round_item_id, value)
+        progress.tick()
+    if row is not None:
+        flush(row)
+        panelists += 1
+
+    if npz_path is not None:
+        npz_path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            npz_path,
+            likert=np.stack(likert_rows) if likert_rows else np.zeros((0, len(layout.likert_columns)), dtype=np.int8),
+            panelist_ids=np.array(panelist_ids, dtype=np.int64),
+            columns=np.array([layout.columns[c] for c in layout.likert_columns]),
+            round_item_ids=np.array(layout.likert_round_items, dtype=np.int64),
+        )
+    return panelists
@@ -0,0 +1,66 @@
+"""
+Group feedback as panelists see it: display rows, the rendered feedback card
+and the JSON payload pushed to live streams.
+
+item_detail renders the card inline; the feedback streams (delphi.live) send
+the same card, rendered once per aggregate change, to every subscriber.
+"""
+from __future__ import annotations
+
+from django.template.loader import render_to_string
+
+from .models import Response
+from .schema import item_schema
+
+FEEDBACK_TEMPLATE = "delphi/_group_feedback.html"
+
+
+def feedback_rows(item, agg):
+    """Display rows (label, count, percent of respondents) for an option or matrix distribution."""
+    def row(label, count):
+        return {"label": label, "count": count, "percent": round(100 * count / agg.n) if agg.n else 0}
+
+    dist = agg.distribution
+    schema = item_schema(item)
+    if item.item_type == "yesno":
+        return [row("Yes", dist.get("yes", 0)), row("No", dist.get("no", 0))]
+    if item.item_type in ("multiple", "checkbox"):
+        return [row(label, dist.get(code, 0)) for code, label in schema.options]
+    if item.item_type == "matrix":
+        return [
+            {"label": r, "cells": [row(col, dist.get(r, {}).get(col, 0)) for col in schema.matrix_columns]}
+            for r in schema.matrix_rows
+        ]
+    return []
+
+
+def feedback_allowed(panelist_id: int, round_obj) -> bool:
+    """Round 1 hides group feedback until the panelist has answered something, unless the round says otherwise."""
+    if round_obj.number == 1 and not round_obj.show_feedback_immediately:
+        return Response.objects.filter(panelist_id=panelist_id, round_item__round=round_obj).exists()
+    return True
+
+
+def render_feedback(item, agg) -> str:
+    """The group feedback card for an aggregate (its round item's `item` passed in)."""
+    return render_to_string(
+        FEEDBACK_TEMPLATE, {"item": item, "aggregate": agg, "feedback_rows": feedback_rows(item, agg)}
+    )
+
+
+def feedback_payload(agg, html: bool = True) -> dict:
+    """JSON-ready summary of an aggregate with its round item's item loaded; `html` adds the rendered card."""
+    item = agg.round_item.item
+    payload = {
+        "round_item_id": agg.round_item_id,
+        "version": agg.computed_at.isoformat(),
+        "n": agg.n,
+        "mean": agg.mean,
+        "pct_agree": agg.pct_agree,
+        "pct_disagree": agg.pct_disagree,
+        "consensus_reached": agg.consensus_reached,
+        "rows": feedback_rows(item, agg),
+    }
+    if html:
+        payload["html"] = render_feedback(item, agg)
+    return payload
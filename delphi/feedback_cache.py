@@ -0,0 +1,152 @@
+"""
+Stale-while-revalidate cache of each round item's group feedback.
+
+When a round opens, hundreds of panelists load item pages within minutes,
+and each would otherwise read the item's aggregate and render its feedback
+card. cached_feedback() keeps the rendered payload (delphi.feedback) in
+Django's cache:
+
+- fresh for DELPHI_FEEDBACK_MAX_AGE seconds: served as is (a hit);
+- then stale: still served at once, while the first request to see it takes
+  a lock with cache.add() and reloads it (a refresh). Concurrent requests
+  keep getting the stale payload instead of piling onto the database;
+- dropped DELPHI_FEEDBACK_STALE_TTL seconds after going stale; the next
+  request loads it again (a miss).
+
+Hit, stale, miss and refresh counts are kept in process memory and added to
+counters in the same cache at most every STATS_FLUSH_INTERVAL seconds, so a
+page view does not write to the cache (see stats() and the
+feedback_cache_stats command). With a cache shared by all workers (file- or
+database-backed, see settings.CACHES) one worker refreshes an item for
+everyone; with the default local-memory cache, one per process. The
+file-based backend's add() is not atomic across processes, so there a
+refresh can occasionally run twice; incr() is a read then a write on both
+the file and database backends, so concurrent flushes can lose counts.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .feedback import feedback_payload
+from .models import FeedbackAggregate
+
+COUNTERS = ("hits", "stale", "misses", "refreshes")
+
+# A refresh that takes longer than this (or crashed) no longer blocks others
+LOCK_TIMEOUT = 10
+
+STATS_FLUSH_INTERVAL = 30
+
+_counts: Counter = Counter()
+_counts_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def _cache():
+    return caches[getattr(settings, "DELPHI_FEEDBACK_CACHE", "default")]
+
+
+def _key(round_item_id: int) -> str:
+    return f"delphi:feedback:{round_item_id}"
+
+
+def _counter_key(name: str) -> str:
+    return f"delphi:feedback:stats:{name}"
+
+
+def _take_counts() -> Dict[str, int]:
+    global _flushed_at
+    with _counts_lock:
+        pending = dict(_counts)
+        _counts.clear()
+        _flushed_at = time.monotonic()
+    return pending
+
+
+def _flush(pending: Dict[str, int]) -> None:
+    cache = _cache()
+    for name, n in pending.items():
+        key = _counter_key(name)
+        if cache.add(key, n, None):
+            continue
+        try:
+            cache.incr(key, n)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, n, None)
+
+
+def _count(name: str) -> None:
+    with _counts_lock:
+        _counts[name] += 1
+        due = time.monotonic() - _flushed_at >= STATS_FLUSH_INTERVAL
+    if due:
+        _flush(_take_counts())
+
+
+def load_feedback(round_item_id: int) -> Optional[dict]:
+    """The item's feedback payload from the database; None before anyone has answered."""
+    agg = (
+        FeedbackAggregate.objects.filter(round_item_id=round_item_id, n__gt=0)
+        .select_related("round_item__item")
+        .first()
+    )
+    return feedback_payload(agg) if agg else None
+
+
+def remember_feedback(round_item_id: int, payload: Optional[dict]) -> None:
+    """Store a freshly built payload, e.g. one the live feedback publisher has just rendered."""
+    max_age = settings.DELPHI_FEEDBACK_MAX_AGE
+    _cache().set(
+        _key(round_item_id), (time.time() + max_age, payload), max_age + settings.DELPHI_FEEDBACK_STALE_TTL
+    )
+
+
+def cached_feedback(round_item_id: int) -> Optional[dict]:
+    """The item's feedback payload (see delphi.feedback), possibly up to the staleness budget old."""
+    cache = _cache()
+    entry = cache.get(_key(round_item_id))
+    if entry is None:
+        _count("misses")
+        payload = load_feedback(round_item_id)
+        remember_feedback(round_item_id, payload)
+        return payload
+
+    fresh_until, payload = entry
+    if time.time() < fresh_until:
+        _count("hits")
+        return payload
+
+    lock = f"{_key(round_item_id)}:lock"
+    if not cache.add(lock, 1, LOCK_TIMEOUT):
+        # Another request is refreshing it
+        _count("stale")
+        return payload
+    try:
+        _count("refreshes")
+        payload = load_feedback(round_item_id)
+        remember_feedback(round_item_id, payload)
+    finally:
+        cache.delete(lock)
+    return payload
+
+
+def stats() -> Dict[str, int]:
+    """
+    Counts of hits, stale hits, misses and refreshes since the last reset: this
+    process's up to now, other processes' as of their last flush.
+    """
+    _flush(_take_counts())
+    found = _cache().get_many([_counter_key(name) for name in COUNTERS])
+    return {name: found.get(_counter_key(name), 0) for name in COUNTERS}
+
+
+def reset_stats() -> None:
+    _take_counts()
+    _cache().delete_many([_counter_key(name) for name in COUNTERS])
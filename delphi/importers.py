@@ -0,0 +1,447 @@
+"""
+Bulk importers for item CSVs, question bank files and panelist CSVs.
+
+Imports run in one transaction with batched bulk statements, so the query count
+depends on the number of batches rather than the number of rows.
+
+Item rows are all validated before anything is written. Items are keyed by
+(stable_code, version) and re-importing an unchanged row is a no-op thanks to
+Item.content_hash.
+
+Older CSV headers are accepted: stem_text -> prompt, response_type -> item_type,
+domain_tag -> domain, with enum-style types such as LIKERT_5; display_name -> name,
+affiliation -> institution for panelists.
+
+Question banks (JSON, or YAML when PyYAML is installed) describe a study, a
+round and its questions; loading one diffs the questions against the database
+and applies only the differences.
+
+Panelist lists are read in chunks and upserted on (study, normalized email), with
+one SELECT and one INSERT ... ON CONFLICT per chunk. Stored emails are matched
+case-insensitively, so rows saved before normalization are updated in place.
+"""
+from __future__ import annotations
+
+import json
+import uuid
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .conditional import invalidate_study_items
+from .models import Item, Panelist, Round, RoundItem, Study
+from .navigation import invalidate_navigation
+from .progress import round_items_added
+from .sessions import invalidate_study_panelists
+
+BATCH_SIZE = 500
+
+PANELIST_CHUNK_SIZE = 1000
+
+QUESTION_BANK_DIR = Path(__file__).resolve().parent / "question_banks"
+
+DEFAULT_QUESTION_BANK = QUESTION_BANK_DIR / "pep_round1.json"
+
+ITEM_COLUMN_ALIASES = {
+    "stem_text": "prompt",
+    "response_type": "item_type",
+    "domain_tag": "domain",
+}
+
+PANELIST_COLUMN_ALIASES = {
+    "display_name": "name",
+    "affiliation": "institution",
+}
+
+PANELIST_FIELDS = ["name", "institution", "is_active"]
+
+ITEM_TYPE_ALIASES = {
+    "likert_5": "likert5",
+    "likert": "likert5",
+    "yes_no": "yesno",
+    "either_or": "multiple",
+    "multiple_choice": "multiple",
+    "free_text": "text",
+}
+
+ITEM_TYPES = {value for value, _ in Item.SCALE_CHOICES}
+
+OPTION_FIELDS = ["option_a", "option_b", "option_c", "option_d", "option_e", "option_f"]
+
+OPTION_MAX_LENGTH = Item._meta.get_field("option_a").max_length
+
+
+class ImportValidationError(ValueError):
+    """Raised with every problem found in the input; nothing has been written."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("\n".join(errors))
+
+
+def _labels(raw: str) -> List[str]:
+    """Matrix rows/columns as a JSON list or a "|"-separated string."""
+    raw = raw.strip()
+    if not raw:
+        return []
+    if raw.startswith("["):
+        labels = json.loads(raw)
+        if not isinstance(labels, list):
+            raise ValueError("expected a JSON list")
+        return [str(label).strip() for label in labels]
+    return [label.strip() for label in raw.split("|") if label.strip()]
+
+
+def _int(raw: Optional[str], default: int) -> int:
+    raw = (raw or "").strip()
+    value = int(raw) if raw else default
+    if value < 0:
+        raise ValueError("must not be negative")
+    return value
+
+
+def parse_item_row(row: Dict[str, str], where: str, errors: List[str]) -> Optional[Item]:
+    """Build an unsaved Item from one row of strings, appending any problems (prefixed by `where`) to `errors`."""
+    row = {ITEM_COLUMN_ALIASES.get(k.strip(), k.strip()): (v or "") for k, v in row.items() if k}
+    problems = []
+
+    stable_code = row.get("stable_code", "").strip()
+    prompt = row.get("prompt", "").strip()
+    if not stable_code:
+        problems.append("stable_code is required")
+    if not prompt:
+        problems.append("prompt is required")
+
+    item_type = row.get("item_type", "").strip() or "likert5"
+    item_type = ITEM_TYPE_ALIASES.get(item_type.lower(), item_type.lower())
+    if item_type not in ITEM_TYPES:
+        problems.append(f"unknown item_type {row.get('item_type')!r}")
+
+    fields = {}
+    for name, default in (("version", 1), ("order_index", 0)):
+        try:
+            fields[name] = _int(row.get(name), default)
+        except ValueError:
+            problems.append(f"{name} must be a non-negative integer")
+    if fields.get("version") == 0:
+        problems.append("version must be at least 1")
+
+    options = {f: row.get(f, "").strip() for f in OPTION_FIELDS}
+    for name, value in options.items():
+        if len(value) > OPTION_MAX_LENGTH:
+            problems.append(f"{name} is longer than {OPTION_MAX_LENGTH} characters")
+    if item_type in ("multiple", "checkbox") and sum(bool(v) for v in options.values()) < 2:
+        problems.append(f"{item_type} items need at least two options")
+
+    matrix = {}
+    for name in ("matrix_rows", "matrix_columns"):
+        try:
+            matrix[name] = _labels(row.get(name, ""))
+        except ValueError:
+            problems.append(f"{name} is not a JSON list or |-separated labels")
+            matrix[name] = []
+    if item_type == "matrix" and not (matrix["matrix_rows"] and matrix["matrix_columns"]):
+        problems.append("matrix items need matrix_rows and matrix_columns")
+
+    if problems:
+        errors.extend(f"{where}: {p}" for p in problems)
+        return None
+
+    item = Item(
+        stable_code=stable_code,
+        prompt=prompt,
+        item_type=item_type,
+        domain=row.get("domain", "").strip(),
+        matrix_rows=json.dumps(matrix["matrix_rows"], ensure_ascii=False) if matrix["matrix_rows"] else "",
+        matrix_columns=json.dumps(matrix["matrix_columns"], ensure_ascii=False) if matrix["matrix_columns"] else "",
+        **options,
+        **fields,
+    )
+    item.content_hash = item.compute_content_hash()
+    return item
+
+
+def parse_item_rows(rows: Iterable[Dict[str, str]], label: str = "line", start: int = 2) -> List[Item]:
+    """Validate every row (CSV header is line 1); raises ImportValidationError listing all problems."""
+    items, errors, seen = [], [], {}
+    for n, row in enumerate(rows, start=start):
+        where = f"{label} {n}"
+        item = parse_item_row(row, where, errors)
+        if item is None:
+            continue
+        key = (item.stable_code, item.version)
+        if key in seen:
+            errors.append(f"{where}: duplicate of {seen[key]} ({item.stable_code} v{item.version})")
+            continue
+        seen[key] = where
+        items.append(item)
+    if errors:
+        raise ImportValidationError(errors)
+    return items
+
+
+class ItemPlan:
+    """
+    What importing `items` would change: computed with reads only, applied by apply_item_plan.
+
+    Items are matched by (stable_code, version). With `rnd`, items not yet in the
+    round are attached; with `reorder`, round items whose order differs from the
+    item's order_index are moved; with `adopt_uncoded`, an uncoded item already
+    in the round with the same prompt (e.g. loaded before codes existed) is given
+    the code instead of being duplicated.
+    """
+
+    def __init__(self, study: Study, items: List[Item], rnd: Optional[Round] = None,
+                 reorder: bool = False, adopt_uncoded: bool = False):
+        if rnd is not None and rnd.study_id != study.id:
+            raise ImportValidationError([f"Round {rnd.id} does not belong to study {study.id}"])
+        self.study, self.rnd, self.items = study, rnd, items
+        self.to_create: List[Item] = []
+        self.to_update: List[Item] = []
+        self.unchanged: List[Item] = []
+        self.to_reorder: List[RoundItem] = []
+        self.to_attach = 0
+
+        existing = {
+            (code, version): (pk, content_hash)
+            for pk, code, version, content_hash in Item.objects.filter(study=study)
+            .exclude(stable_code="")
+            .values_list("id", "stable_code", "version", "content_hash")
+        }
+        in_round: Dict[int, tuple] = {}
+        uncoded: Dict[str, int] = {}
+        if rnd is not None:
+            for ri_id, item_id, order, code, prompt in RoundItem.objects.filter(round=rnd).values_list(
+                "id", "item_id", "order", "item__stable_code", "item__prompt"
+            ):
+                in_round[item_id] = (ri_id, order)
+                if adopt_uncoded and not code:
+                    uncoded.setdefault(prompt.strip(), item_id)
+
+        for item in items:
+            item.study = study
+            current = existing.get((item.stable_code, item.version))
+            if current is None and item.prompt in uncoded:
+                item.pk = uncoded.pop(item.prompt)
+                self.to_update.append(item)
+            elif current is None:
+                self.to_create.append(item)
+            elif current[1] == item.content_hash:
+                item.pk = current[0]
+                self.unchanged.append(item)
+            else:
+                item.pk = current[0]
+                self.to_update.append(item)
+
+            if rnd is None:
+                continue
+            if item.pk not in in_round:
+                self.to_attach += 1
+            elif reorder and in_round[item.pk][1] != item.order_index:
+                self.to_reorder.append(RoundItem(id=in_round[item.pk][0], order=item.order_index))
+        self.in_round = set(in_round)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "created": len(self.to_create),
+            "updated": len(self.to_update),
+            "unchanged": len(self.unchanged),
+            "attached": self.to_attach,
+            "reordered": len(self.to_reorder),
+        }
+
+    def has_changes(self) -> bool:
+        return bool(self.to_create or self.to_update or self.to_attach or self.to_reorder)
+
+
+def apply_item_plan(plan: ItemPlan) -> Dict[str, int]:
+    """Write a plan with bulk statements in one transaction; returns its counts."""
+    if not plan.has_changes():
+        return plan.counts()
+
+    with transaction.atomic():
+        Item.objects.bulk_create(plan.to_create, batch_size=BATCH_SIZE)
+        Item.objects.bulk_update(
+            plan.to_update, [*Item.CONTENT_FIELDS, "stable_code", "version", "content_hash"], batch_size=BATCH_SIZE
+        )
+        if plan.to_update:
+            invalidate_study_items(plan.study.id)
+        if plan.rnd is not None:
+            attached = RoundItem.objects.bulk_create(
+                [
+                    RoundItem(round=plan.rnd, item_id=item.pk, order=item.order_index)
+                    for item in plan.items
+                    if item.pk not in plan.in_round
+                ],
+                batch_size=BATCH_SIZE,
+            )
+            RoundItem.objects.bulk_update(plan.to_reorder, ["order"], batch_size=BATCH_SIZE)
+            round_items_added(plan.rnd.id, len(attached))
+            if plan.to_attach or plan.to_reorder:
+                invalidate_navigation(plan.rnd.id)
+    return plan.counts()
+
+
+def import_items(study: Study, items: List[Item], rnd: Optional[Round] = None) -> Dict[str, int]:
+    """
+    Insert new (stable_code, version) items, update changed ones and skip unchanged ones.
+
+    With `rnd`, every imported item not yet in the round is attached to it, ordered
+    by order_index, in the same transaction. Returns counts per outcome.
+    """
+    return apply_item_plan(ItemPlan(study, items, rnd))
+
+
+def read_question_bank(path: Path) -> Dict:
+    """Read a question bank file; .yaml/.yml needs PyYAML, anything else is parsed as JSON."""
+    with Path(path).open("r", encoding="utf-8") as f:
+        if Path(path).suffix.lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportValidationError(["PyYAML is required to read YAML question banks"])
+            bank = yaml.safe_load(f)
+        else:
+            bank = json.load(f)
+    if not isinstance(bank, dict) or not isinstance(bank.get("study"), dict) or not bank["study"].get("name"):
+        raise ImportValidationError(["question bank needs a study with a name"])
+    if not isinstance(bank.get("questions"), list):
+        raise ImportValidationError(["question bank needs a list of questions"])
+    return bank
+
+
+def parse_questions(questions: List[Dict]) -> List[Item]:
+    """Validate question definitions; list order becomes order_index (1-based)."""
+    rows = []
+    for position, question in enumerate(questions, start=1):
+        row = {k: v if isinstance(v, str) else json.dumps(v, ensure_ascii=False) for k, v in question.items()}
+        row["stable_code"] = row.pop("code", row.get("stable_code", ""))
+        row["order_index"] = str(position)
+        rows.append(row)
+    return parse_item_rows(rows, label="question", start=1)
+
+
+def load_question_bank(path: Path = DEFAULT_QUESTION_BANK, dry_run: bool = False) -> Dict:
+    """
+    Create or update a bank's study, round and questions, writing only what differs.
+
+    Returns the plan counts plus a list of human-readable changes. With
+    `dry_run`, nothing is written.
+    """
+    bank = read_question_bank(path)
+    items = parse_questions(bank["questions"])
+    study_def = bank["study"]
+    round_def = {"number": 1, **bank.get("round", {})}
+    changes: List[str] = []
+
+    with transaction.atomic():
+        study = Study.objects.filter(name=study_def["name"]).order_by("id").first()
+        rnd = None if study is None else Round.objects.filter(study=study, number=round_def["number"]).first()
+        if study is None:
+            changes.append(f"create study {study_def['name']!r}")
+        elif "description" in study_def and study.description != study_def["description"]:
+            changes.append("update study description")
+        if rnd is None:
+            changes.append(f"create round {round_def['number']}")
+
+        if dry_run and rnd is None:
+            changes.extend(f"create {item.stable_code}: {item.prompt[:60]}" for item in items)
+            n = len(items)
+            return {"created": n, "updated": 0, "unchanged": 0, "attached": n, "reordered": 0, "changes": changes}
+
+        if not dry_run:
+            if study is None:
+                study = Study.objects.create(name=study_def["name"], description=study_def.get("description", ""))
+            elif "description" in study_def and study.description != study_def["description"]:
+                study.description = study_def["description"]
+                study.save(update_fields=["description"])
+            if rnd is None:
+                rnd = Round.objects.create(study=study, **round_def)
+
+        plan = ItemPlan(study, items, rnd, reorder=True, adopt_uncoded=True)
+        changes.extend(f"create {item.stable_code}: {item.prompt[:60]}" for item in plan.to_create)
+        changes.extend(f"update {item.stable_code}: {item.prompt[:60]}" for item in plan.to_update)
+        if plan.to_reorder:
+            changes.append(f"reorder {len(plan.to_reorder)} round item(s)")
+        counts = plan.counts() if dry_run else apply_item_plan(plan)
+    return {**counts, "changes": changes}
+
+
+def normalize_email(raw: Optional[str]) -> str:
+    return (raw or "").strip().lower()
+
+
+def _chunks(rows: Iterable, size: int) -> Iterator[list]:
+    it = iter(rows)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def import_panelists(study: Study, rows: Iterable[Dict[str, str]], chunk_size: int = PANELIST_CHUNK_SIZE) -> Dict:
+    """
+    Upsert panelists by normalized email, minting tokens for new rows and rows without one.
+
+    Rows with a missing or invalid email are skipped and reported by line number.
+    Returns counts per outcome plus the list of skipped-row messages.
+    """
+    counts = {"created": 0, "updated": 0, "unchanged": 0, "skipped": []}
+    lines = enumerate(rows, start=2)
+
+    with transaction.atomic():
+        for chunk in _chunks(lines, chunk_size):
+            incoming: Dict[str, Panelist] = {}
+            for line, row in chunk:
+                row = {PANELIST_COLUMN_ALIASES.get(k.strip(), k.strip()): (v or "") for k, v in row.items() if k}
+                email = normalize_email(row.get("email"))
+                try:
+                    validate_email(email)
+                except ValidationError:
+                    counts["skipped"].append(f"line {line}: invalid email {row.get('email', '')!r}")
+                    continue
+                # A repeated email within the file: the later row wins
+                incoming[email] = Panelist(
+                    study=study,
+                    email=email,
+                    name=row.get("name", "").strip()[:255],
+                    institution=row.get("institution", "").strip()[:255],
+                    is_active=True,
+                )
+
+            # Rows stored before emails were normalized keep their spelling, so match them case-insensitively
+            existing = {
+                p.email_lower: p
+                for p in Panelist.objects.annotate(email_lower=Lower("email"))
+                .filter(study=study, email_lower__in=list(incoming))
+                .only("email", "token", *PANELIST_FIELDS)
+            }
+            changed = []
+            for email, panelist in incoming.items():
+                current = existing.get(email)
+                if current is None:
+                    panelist.token = uuid.uuid4()
+                    counts["created"] += 1
+                elif current.token and all(getattr(current, f) == getattr(panelist, f) for f in PANELIST_FIELDS):
+                    counts["unchanged"] += 1
+                    continue
+                else:
+                    panelist.token = current.token or uuid.uuid4()
+                    # Upsert onto the stored row's spelling of the email
+                    panelist.email = current.email
+                    counts["updated"] += 1
+                changed.append(panelist)
+
+            Panelist.objects.bulk_create(
+                changed,
+                batch_size=BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=["study", "email"],
+                update_fields=[*PANELIST_FIELDS, "token"],
+            )
+    if counts["updated"]:
+        invalidate_study_panelists(study.id)
+    return counts
@@ -0,0 +1,184 @@
+"""
+Live group feedback over Server-Sent Events.
+
+Each worker process runs one FeedbackPublisher on its event loop. While at
+least one stream is open it polls FeedbackAggregate for rows whose
+`computed_at` moved since the last poll on the items and rounds its streams
+follow (one query per POLL_INTERVAL, however many panelists are connected),
+renders each changed aggregate once
+with delphi.feedback, stores it in the feedback cache and hands it to every
+subscriber of that round item or its round.
+
+A Subscriber keeps only the latest pending payload per round item, so a
+slow or idle client holds at most one payload per item it follows and open
+connections cost a fixed amount of memory each. Polling stops when the
+last stream closes.
+
+Streams need an ASGI server (config.asgi): under WSGI, Django buffers an
+async streaming body until it ends, so an endless stream would send nothing
+and hold a worker for good. They are served only when DELPHI_LIVE_FEEDBACK is
+on and the request came in through ASGI (live_enabled).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .feedback import feedback_payload
+from .feedback_cache import remember_feedback
+from .models import FeedbackAggregate
+
+POLL_INTERVAL = 1.0
+
+# Comment lines sent on idle streams so proxies keep the connection open
+KEEPALIVE_INTERVAL = 15.0
+
+# Rows are re-read this far back, so a transaction that committed after a poll
+# with an earlier computed_at is still picked up; unchanged versions are skipped.
+POLL_OVERLAP = timedelta(seconds=5)
+
+# Browser reconnect delay announced to EventSource clients, in milliseconds
+RETRY_MS = 5000
+
+Topic = Tuple[str, int]  # ("item", round_item_id) or ("round", round_id)
+
+
+def live_enabled(request) -> bool:
+    """Whether feedback streams can be offered to this request."""
+    return settings.DELPHI_LIVE_FEEDBACK and isinstance(request, ASGIRequest)
+
+
+class Subscriber:
+    """One open stream: the topics it follows and the latest unsent payload per round item."""
+
+    def __init__(self, topics: Iterable[Topic]):
+        self.topics = frozenset(topics)
+        self.pending: Dict[int, Tuple[str, str]] = {}
+        self.ready = asyncio.Event()
+
+    def offer(self, round_item_id: int, version: str, data: str) -> None:
+        self.pending[round_item_id] = (version, data)
+        self.ready.set()
+
+    def drain(self) -> List[Tuple[str, str]]:
+        payloads = list(self.pending.values())
+        self.pending.clear()
+        self.ready.clear()
+        return payloads
+
+
+def changed_aggregates(
+    since, topics: Set[Topic], seen: Optional[Dict[int, str]] = None
+) -> List[Tuple[int, int, str, str]]:
+    """
+    (round_item_id, round_id, version, payload JSON) for aggregates of `topics` computed after `since`.
+
+    Aggregates whose version is already in `seen` ({round_item_id: version}) are skipped before rendering.
+    """
+    item_ids = [pk for kind, pk in topics if kind == "item"]
+    round_ids = [pk for kind, pk in topics if kind == "round"]
+    aggs = (
+        FeedbackAggregate.objects.filter(computed_at__gt=since)
+        .filter(Q(round_item_id__in=item_ids) | Q(round_item__round_id__in=round_ids))
+        .select_related("round_item__item")
+    )
+    changed = []
+    for agg in aggs:
+        if seen and seen.get(agg.round_item_id) == agg.computed_at.isoformat():
+            continue
+        payload = feedback_payload(agg)
+        # Pages and the JSON endpoint get the same payload without reading it again
+        remember_feedback(agg.round_item_id, payload)
+        changed.append((agg.round_item_id, agg.round_item.round_id, payload["version"], json.dumps(payload)))
+    return changed
+
+
+class FeedbackPublisher:
+    """Polls aggregate changes for every open stream of this process and fans them out."""
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._subscribers: Dict[Topic, Set[Subscriber]] = {}
+        self._versions: Dict[int, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def connections(self) -> int:
+        return len({s for subscribers in self._subscribers.values() for s in subscribers})
+
+    def subscribe(self, topics: Iterable[Topic]) -> Subscriber:
+        subscriber = Subscriber(topics)
+        for topic in subscriber.topics:
+            self._subscribers.setdefault(topic, set()).add(subscriber)
+        if self._task is None or self._task.done() or self._task.get_loop() is not asyncio.get_running_loop():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        for topic in subscriber.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def publish(self, round_item_id: int, round_id: int, version: str, data: str) -> None:
+        """Deliver one changed aggregate to its item's and round's subscribers, once per version."""
+        if self._versions.get(round_item_id) == version:
+            return
+        self._versions[round_item_id] = version
+        for topic in (("item", round_item_id), ("round", round_id)):
+            for subscriber in self._subscribers.get(topic, ()):
+                subscriber.offer(round_item_id, version, data)
+
+    async def _run(self) -> None:
+        cursor = timezone.now()
+        while self._subscribers:
+            await asyncio.sleep(self.poll_interval)
+            polled_at = timezone.now()
+            changes = await sync_to_async(changed_aggregates)(
+                cursor - POLL_OVERLAP, set(self._subscribers), dict(self._versions)
+            )
+            for change in changes:
+                self.publish(*change)
+            cursor = polled_at
+        self._versions.clear()
+
+
+publisher = FeedbackPublisher()
+
+
+def _event(version: str, data: str) -> str:
+    # The version doubles as the event id, which browsers send back as Last-Event-ID on reconnect
+    return f"id: {version}\nevent: feedback\ndata: {data}\n\n"
+
+
+async def event_stream(topics: Iterable[Topic], backlog: Iterable[Tuple[str, str]] = ()):
+    """SSE body for one connection: the `backlog` (version, payload) pairs, then each change until the client leaves."""
+    subscriber = publisher.subscribe(topics)
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        # The stream reads only through the publisher, so give back the database connection the
+        # request's thread opened (for the session and access check) instead of holding it open
+        await sync_to_async(connections.close_all)()
+        for version, data in backlog:
+            yield _event(version, data)
+        while True:
+            try:
+                await asyncio.wait_for(subscriber.ready.wait(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            for version, data in subscriber.drain():
+                yield _event(version, data)
+    finally:
+        publisher.unsubscribe(subscriber)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from delphi.models import Round
+from delphi.rounds import carry_forward_round
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the next round from a round's non-consensus items, "
+        "copying each panelist's answers as 'your previous answer'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--round_id", type=int, required=True)
+        parser.add_argument(
+            "--no_recompute", action="store_true",
+            help="Use the stored aggregates instead of recomputing the round's feedback first.",
+        )
+
+    def handle(self, *args, **options):
+        round_id = options["round_id"]
+        if not Round.objects.filter(id=round_id).exists():
+            raise CommandError(f"Round {round_id} not found.")
+
+        try:
+            result = carry_forward_round(round_id, recompute=not options["no_recompute"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        rnd = result["round"]
+        self.stdout.write(self.style.SUCCESS(
+            f"Created round {rnd.number} (id {rnd.id}, closed) with {result['items']} items "
+            f"and {result['prior_responses']} previous answers."
+        ))
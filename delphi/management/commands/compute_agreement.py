@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from delphi.agreement import compute_agreement_for_round
+
+
+class Command(BaseCommand):
+    help = "Compute Fleiss' kappa, Krippendorff's alpha (ordinal) and Kendall's W for a round, overall and per domain."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--round_id", type=int, required=True)
+        parser.add_argument("--out", type=str, help="Optional CSV path to export the metrics to.")
+
+    def handle(self, *args, **options):
+        round_id = options["round_id"]
+        metrics = compute_agreement_for_round(round_id)
+
+        columns = ["domain", "n_items", "n_panelists", "n_complete", "fleiss_kappa", "krippendorff_alpha", "kendall_w"]
+        for m in metrics:
+            self.stdout.write(
+                f"{m.domain or 'All items':<30} items={m.n_items:<4} panelists={m.n_panelists:<5} "
+                f"kappa={_fmt(m.fleiss_kappa)} alpha={_fmt(m.krippendorff_alpha)} W={_fmt(m.kendall_w)}"
+            )
+
+        if options["out"]:
+            out_path = Path(options["out"])
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            with out_path.open("w", encoding="utf-8", newline="") as f:
+                w = csv.writer(f)
+                w.writerow(["round_id", *columns])
+                for m in metrics:
+                    w.writerow([round_id, *(getattr(m, c) for c in columns)])
+
+        self.stdout.write(self.style.SUCCESS(f"Stored agreement metrics for round {round_id} ({len(metrics)} rows)."))
+
+
+def _fmt(value):
+    return "n/a" if value is None else f"{value:.3f}"
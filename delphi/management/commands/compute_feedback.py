@@ -11,9 +11,21 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("--round_id", type=int, required=True)
         parser.add_argument("--overwrite", action="store_true")
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Also recompute likert descriptive statistics (median, SD, IQR, mode) with the vectorized NumPy pass.",
+        )
 
     def handle(self, *args, **options):
         round_id = options["round_id"]
         overwrite = bool(options["overwrite"])
+
         n = compute_feedback_for_round(round_id, overwrite=overwrite)
         self.stdout.write(self.style.SUCCESS(f"Computed feedback for {n} items in round {round_id}."))
+
+        if options["stats"]:
+            from delphi.stats import compute_descriptive_stats
+
+            n = compute_descriptive_stats(round_id)
+            self.stdout.write(self.style.SUCCESS(f"Computed descriptive statistics for {n} likert items in round {round_id}."))
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from delphi.models import Round
+from delphi.stability import compute_stability
+
+
+class Command(BaseCommand):
+    help = "Compute per-item response stability between a round and the previous round of the same study."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--round_id", type=int, required=True, help="The later round.")
+        parser.add_argument("--previous_round_id", type=int, help="Defaults to the preceding round number.")
+
+    def handle(self, *args, **options):
+        round_id = options["round_id"]
+        if not Round.objects.filter(id=round_id).exists():
+            raise CommandError(f"Round {round_id} not found.")
+
+        stats = compute_stability(round_id, options["previous_round_id"])
+        if not stats:
+            raise CommandError(f"Round {round_id}: no earlier round or no shared items to compare.")
+
+        stable = sum(1 for s in stats if s.is_stable)
+        shifted = sum(1 for s in stats if s.shift_significant)
+        self.stdout.write(self.style.SUCCESS(
+            f"Round {round_id}: {len(stats)} shared items, {stable} stable (<=15% changed), "
+            f"{shifted} with a significant group-level shift."
+        ))
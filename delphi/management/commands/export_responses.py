@@ -1,69 +1,61 @@
 from __future__ import annotations
 
-import csv
 from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
 
-from delphi.models import Study, Response
+from delphi.exports import (
+    DEFAULT_CHUNK_SIZE, FORMATS, Progress, guess_format, iter_responses, open_output, write_rows, write_wide,
+)
+from delphi.models import Study
 
 
 class Command(BaseCommand):
-    help = "Export responses for a study to CSV."
+    help = (
+        "Stream a study's responses to CSV or JSON Lines (optionally gzip-compressed) in constant memory, "
+        "or pivot them to one row per panelist with --layout wide."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument("--study_id", type=int, required=True)
         parser.add_argument("--out", type=str, required=True)
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to jsonl for .jsonl/.ndjson paths, else csv.")
+        parser.add_argument("--gzip", action="store_true", help="Compress the output (implied by a .gz suffix).")
+        parser.add_argument("--chunk_size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            "--layout", choices=("long", "wide"), default="long",
+            help="long: one row per response; wide: one row per panelist, one or more columns per round item.",
+        )
+        parser.add_argument("--npz", type=str, help="Wide layout only: also save the likert block as a NumPy .npz.")
 
     def handle(self, *args, **options):
         study_id = options["study_id"]
         out_path = Path(options["out"])
-
-        study = Study.objects.get(id=study_id)
-
-        qs = (
-            Response.objects.filter(panelist__study=study)
-            .select_related("panelist", "round_item__round", "round_item__item")
-            .order_by("round_item__round__number", "round_item__item__order_index", "round_item__item__stable_code", "panelist__email")
-        )
-
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        with out_path.open("w", encoding="utf-8", newline="") as f:
-            w = csv.writer(f)
-            w.writerow([
-                "study_id",
-                "round_number",
-                "round_name",
-                "stable_code",
-                "item_version",
-                "domain_tag",
-                "stem_text",
-                "response_type",
-                "panelist_email",
-                "likert_value",
-                "either_or_value",
-                "comment",
-                "suggested_revision",
-                "updated_at",
-            ])
-            for r in qs:
-                item = r.round_item.item
-                rnd = r.round_item.round
-                w.writerow([
-                    study_id,
-                    rnd.number,
-                    rnd.name,
-                    item.stable_code,
-                    item.version,
-                    item.domain_tag,
-                    item.stem_text,
-                    item.response_type,
-                    r.panelist.email,
-                    r.likert_value or "",
-                    r.either_or_value or "",
-                    r.comment,
-                    r.suggested_revision,
-                    r.updated_at.isoformat(),
-                ])
-
-        self.stdout.write(self.style.SUCCESS(f"Exported {qs.count()} responses to {out_path}"))
+        if not Study.objects.filter(id=study_id).exists():
+            raise CommandError(f"Study {study_id} not found.")
+
+        fmt = options["format"] or guess_format(out_path)
+        compress = bool(options["gzip"]) or out_path.suffix.lower() == ".gz"
+        wide = options["layout"] == "wide"
+        if wide and fmt != "csv":
+            raise CommandError("The wide layout is only written as CSV.")
+        if options["npz"] and not wide:
+            raise CommandError("--npz requires --layout wide.")
+
+        progress = Progress(lambda rows, rate: self.stderr.write(f"  {rows} rows ({rate:,.0f} rows/sec)"))
+        if wide:
+            npz_path = Path(options["npz"]) if options["npz"] else None
+            with open_output(out_path, compress) as f:
+                panelists = write_wide(study_id, f, progress, npz_path, options["chunk_size"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Exported {panelists} panelists ({progress.rows} responses) to {out_path}"
+                + (f" and likert block to {npz_path}" if npz_path else "")
+            ))
+            return
+
+        with open_output(out_path, compress) as f:
+            n = write_rows(iter_responses(study_id, options["chunk_size"]), f, fmt, progress)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {n} responses to {out_path} ({fmt}{', gzip' if compress else ''}, {progress.rate():,.0f} rows/sec)"
+        ))
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from delphi.feedback_cache import reset_stats, stats
+
+
+class Command(BaseCommand):
+    help = "Show how group feedback has been served from the cache (hits, stale hits, misses, refreshes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing them.")
+
+    def handle(self, *args, **options):
+        counts = stats()
+        for name, count in counts.items():
+            self.stdout.write(f"{name:<10} {count}")
+        served = sum(counts.values())
+        cached = counts["hits"] + counts["stale"]
+        if served:
+            self.stdout.write(f"{'hit ratio':<10} {cached / served:.1%}")
+        if options["reset"]:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
@@ -5,15 +5,21 @@ from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
 
-from delphi.models import Study, Item
+from delphi.importers import ImportValidationError, import_items, parse_item_rows
+from delphi.models import Round, Study
 
 
 class Command(BaseCommand):
-    help = "Import items from CSV with columns: stable_code,domain_tag,stem_text,response_type,option_a,option_b,order_index"
+    help = (
+        "Import or update items from CSV with columns: stable_code,version,prompt,item_type,domain,"
+        "option_a..option_f,matrix_rows,matrix_columns,order_index "
+        "(stem_text/response_type/domain_tag are accepted as older names)."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument("--study_id", type=int, required=True)
         parser.add_argument("--csv", type=str, required=True)
+        parser.add_argument("--round_id", type=int, help="Also attach the imported items to this round.")
 
     def handle(self, *args, **options):
         study_id = options["study_id"]
@@ -21,28 +27,25 @@ class Command(BaseCommand):
         if not csv_path.exists():
             raise CommandError(f"CSV not found: {csv_path}")
 
-        study = Study.objects.get(id=study_id)
-
-        created = 0
-        with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                stable_code = (row.get("stable_code") or "").strip()
-                stem_text = (row.get("stem_text") or "").strip()
-                if not stable_code or not stem_text:
-                    continue
-
-                item = Item.objects.create(
-                    study=study,
-                    stable_code=stable_code,
-                    domain_tag=(row.get("domain_tag") or "").strip(),
-                    stem_text=stem_text,
-                    response_type=(row.get("response_type") or Item.ResponseType.LIKERT_5).strip() or Item.ResponseType.LIKERT_5,
-                    option_a=(row.get("option_a") or "").strip(),
-                    option_b=(row.get("option_b") or "").strip(),
-                    order_index=int(row.get("order_index") or 0),
-                    version=int(row.get("version") or 1),
-                )
-                created += 1
-
-        self.stdout.write(self.style.SUCCESS(f"Imported {created} items into study {study_id}."))
+        try:
+            study = Study.objects.get(id=study_id)
+        except Study.DoesNotExist:
+            raise CommandError(f"Study {study_id} not found.")
+
+        rnd = None
+        if options["round_id"] is not None:
+            rnd = Round.objects.filter(id=options["round_id"], study=study).first()
+            if rnd is None:
+                raise CommandError(f"Round {options['round_id']} not found in study {study_id}.")
+
+        try:
+            with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
+                items = parse_item_rows(csv.DictReader(f))
+            counts = import_items(study, items, rnd)
+        except ImportValidationError as e:
+            raise CommandError(f"{len(e.errors)} invalid row(s), nothing imported:\n{e}")
+
+        summary = f"created={counts['created']}, updated={counts['updated']}, unchanged={counts['unchanged']}"
+        if rnd is not None:
+            summary += f", attached to round {rnd.number}={counts['attached']}"
+        self.stdout.write(self.style.SUCCESS(f"Items {summary} for study {study_id}."))
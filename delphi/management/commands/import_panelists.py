@@ -5,15 +5,20 @@ from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
 
-from delphi.models import Study, Panelist
+from delphi.importers import PANELIST_CHUNK_SIZE, import_panelists
+from delphi.models import Study
 
 
 class Command(BaseCommand):
-    help = "Import panelists from CSV with columns: email,display_name,affiliation"
+    help = (
+        "Import or update panelists from CSV with columns: email,name,institution "
+        "(display_name/affiliation are accepted as older names)."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument("--study_id", type=int, required=True)
         parser.add_argument("--csv", type=str, required=True)
+        parser.add_argument("--chunk_size", type=int, default=PANELIST_CHUNK_SIZE)
 
     def handle(self, *args, **options):
         study_id = options["study_id"]
@@ -21,27 +26,17 @@ class Command(BaseCommand):
         if not csv_path.exists():
             raise CommandError(f"CSV not found: {csv_path}")
 
-        study = Study.objects.get(id=study_id)
+        try:
+            study = Study.objects.get(id=study_id)
+        except Study.DoesNotExist:
+            raise CommandError(f"Study {study_id} not found.")
 
-        created, updated = 0, 0
         with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                email = (row.get("email") or "").strip().lower()
-                if not email:
-                    continue
-                obj, was_created = Panelist.objects.update_or_create(
-                    study=study,
-                    email=email,
-                    defaults={
-                        "display_name": (row.get("display_name") or "").strip(),
-                        "affiliation": (row.get("affiliation") or "").strip(),
-                        "is_active": True,
-                    },
-                )
-                if was_created:
-                    created += 1
-                else:
-                    updated += 1
-
-        self.stdout.write(self.style.SUCCESS(f"Panelists created={created}, updated={updated} for study {study_id}."))
+            counts = import_panelists(study, csv.DictReader(f), options["chunk_size"])
+
+        for message in counts["skipped"]:
+            self.stderr.write(f"  skipped {message}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Panelists created={counts['created']}, updated={counts['updated']}, "
+            f"unchanged={counts['unchanged']}, skipped={len(counts['skipped'])} for study {study_id}."
+        ))
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import math
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from delphi.choices import likert_means, option_counts, write_choices
+from delphi.models import Response, ResponseChoice, RoundItem
+from delphi.services import round_aggregates
+
+
+class Command(BaseCommand):
+    help = "Rewrite the normalized choice rows of stored responses, e.g. after responses were edited with update()."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--round_id", type=int, help="Only rebuild this round's responses (default: all).")
+        parser.add_argument("--chunk_size", type=int, default=2000)
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Only report items whose choice rows disagree with their responses; needs --round_id.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            if not options["round_id"]:
+                raise CommandError("--check needs --round_id.")
+            return self.check_round(options["round_id"])
+
+        responses = Response.objects.select_related("round_item__item").order_by("id")
+        choices = ResponseChoice.objects.all()
+        if options["round_id"]:
+            responses = responses.filter(round_item__round_id=options["round_id"])
+            choices = choices.filter(round_item__round_id=options["round_id"])
+
+        written = 0
+        with transaction.atomic():
+            choices.delete()
+            batch = []
+            for response in responses.iterator(options["chunk_size"]):
+                batch.append((response.id, response.panelist_id, response.round_item, response.value))
+                if len(batch) >= options["chunk_size"]:
+                    written += write_choices(batch, replace=False)
+                    batch = []
+            written += write_choices(batch, replace=False)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} choice rows."))
+
+    def check_round(self, round_id: int) -> None:
+        """Compare the counts and likert means grouped from the choice rows with feedback rebuilt from the responses."""
+        counts = option_counts(round_id)
+        means = likert_means(round_id)
+        item_types = dict(RoundItem.objects.filter(round_id=round_id).values_list("id", "item__item_type"))
+
+        drifted = []
+        for agg in round_aggregates(round_id):
+            ri_id = agg.round_item_id
+            if item_types[ri_id] == "likert5":
+                expected = {str(k): n for k, n in agg.likert_counts().items() if n}
+                n, mean = means.get(ri_id, (0, None))
+                if n != agg.n or (mean is not None and not math.isclose(mean, agg.mean)):
+                    drifted.append((ri_id, f"n/mean {n}/{mean} != {agg.n}/{agg.mean}"))
+                    continue
+            else:
+                expected = agg.distribution
+            if counts.get(ri_id, {}) != expected:
+                drifted.append((ri_id, "option counts differ"))
+
+        for ri_id, detail in drifted:
+            self.stdout.write(f"  round_item {ri_id}: {detail}")
+        if drifted:
+            raise CommandError(f"Round {round_id}: choice rows of {len(drifted)} item(s) drifted.")
+        self.stdout.write(self.style.SUCCESS(f"Round {round_id}: all choice rows match."))
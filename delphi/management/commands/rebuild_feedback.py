@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from delphi.models import FeedbackAggregate
+from delphi.services import COUNTER_FIELDS, compute_feedback_for_round, round_aggregates
+
+
+class Command(BaseCommand):
+    help = "Check the incrementally maintained feedback counters of a round against its responses and rebuild them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--round_id", type=int, required=True)
+        parser.add_argument("--check", action="store_true", help="Only report drift; do not rewrite counters.")
+
+    def handle(self, *args, **options):
+        round_id = options["round_id"]
+        check_only = bool(options["check"])
+
+        expected = {agg.round_item_id: agg for agg in round_aggregates(round_id)}
+        stored = {agg.round_item_id: agg for agg in FeedbackAggregate.objects.filter(round_item__round_id=round_id)}
+
+        drifted = []
+        for ri_id, want in expected.items():
+            have = stored.get(ri_id)
+            if have is None:
+                drifted.append((ri_id, "missing"))
+                continue
+            diffs = [
+                field
+                for field in ["n", *COUNTER_FIELDS, "distribution"]
+                if getattr(have, field) != getattr(want, field)
+            ]
+            if diffs:
+                drifted.append((ri_id, f"{', '.join(diffs)} differ"))
+
+        for ri_id, detail in drifted:
+            self.stdout.write(f"  round_item {ri_id}: {detail}")
+
+        if check_only:
+            if drifted:
+                raise CommandError(f"Round {round_id}: {len(drifted)} of {len(expected)} aggregates drifted.")
+            self.stdout.write(self.style.SUCCESS(f"Round {round_id}: all {len(expected)} aggregates match."))
+            return
+
+        n = compute_feedback_for_round(round_id, overwrite=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"Round {round_id}: rebuilt {n} aggregates ({len(drifted)} had drifted)."
+        ))
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from delphi.models import Round
+from delphi.progress import reconcile_progress
+
+
+class Command(BaseCommand):
+    help = "Check the incrementally maintained round progress counters against responses and items, and repair them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--round_id", type=int, help="Only this round (default: every round).")
+        parser.add_argument("--check", action="store_true", help="Only report drift; do not rewrite counters.")
+
+    def handle(self, *args, **options):
+        check_only = bool(options["check"])
+        rounds = Round.objects.order_by("study_id", "number")
+        if options["round_id"] is not None:
+            rounds = rounds.filter(id=options["round_id"])
+            if not rounds.exists():
+                raise CommandError(f"Round {options['round_id']} not found.")
+
+        drifted = 0
+        for round_id in rounds.values_list("id", flat=True):
+            result = reconcile_progress(round_id, dry_run=check_only)
+            for panelist_id, detail in result["created"] + result["updated"]:
+                self.stdout.write(f"  round {round_id}, panelist {panelist_id}: {detail}")
+            drifted += len(result["created"]) + len(result["updated"])
+
+        if check_only:
+            if drifted:
+                raise CommandError(f"{drifted} progress row(s) drifted.")
+            self.stdout.write(self.style.SUCCESS("All progress rows match."))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"Repaired {drifted} progress row(s)."))
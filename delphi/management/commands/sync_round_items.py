@@ -1,38 +1,44 @@
 from __future__ import annotations
 
-from collections import defaultdict
+from django.core.management.base import BaseCommand, CommandError
 
-from django.core.management.base import BaseCommand
+from delphi.models import Round
+from delphi.rounds import sync_round_items
 
-from delphi.models import Round, Item, RoundItem
+LABELS = [
+    ("added", "+"),
+    ("upgraded", "^"),
+    ("removed", "-"),
+    ("kept_answered", "="),
+]
 
 
 class Command(BaseCommand):
-    help = "Attach latest item versions in a study to a given round."
+    help = "Attach the latest version of every coded item in a study to a round, applying only the differences."
 
     def add_arguments(self, parser):
         parser.add_argument("--round_id", type=int, required=True)
-        parser.add_argument("--overwrite", action="store_true")
+        parser.add_argument(
+            "--overwrite", action="store_true",
+            help="Delete every round item (and its responses) and attach the latest versions from scratch.",
+        )
+        parser.add_argument("--prune", action="store_true", help="Remove unanswered items that are not a latest version.")
+        parser.add_argument("--dry-run", action="store_true", help="Report the changes without writing them.")
 
     def handle(self, *args, **options):
         round_id = options["round_id"]
-        overwrite = bool(options["overwrite"])
-
-        rnd = Round.objects.select_related("study").get(id=round_id)
-
-        if overwrite:
-            RoundItem.objects.filter(round=rnd).delete()
-
-        # pick latest version per stable_code
-        latest = {}
-        for item in Item.objects.filter(study=rnd.study).order_by("stable_code", "-version"):
-            if item.stable_code not in latest:
-                latest[item.stable_code] = item
-
-        created = 0
-        for code, item in sorted(latest.items(), key=lambda kv: (kv[1].order_index, kv[0])):
-            _, was_created = RoundItem.objects.get_or_create(round=rnd, item=item)
-            if was_created:
-                created += 1
-
-        self.stdout.write(self.style.SUCCESS(f"Round {round_id}: attached {created} items (latest versions)."))
+        try:
+            rnd = Round.objects.get(id=round_id)
+        except Round.DoesNotExist:
+            raise CommandError(f"Round {round_id} not found.")
+
+        diff = sync_round_items(rnd, overwrite=options["overwrite"], prune=options["prune"], dry_run=options["dry_run"])
+
+        for key, symbol in LABELS:
+            for code in diff[key]:
+                self.stdout.write(f"  {symbol} {code}")
+        summary = ", ".join(f"{key}={len(diff[key])}" for key, _ in LABELS)
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"Dry run, nothing written for round {round_id}: {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Round {round_id}: {summary}"))
@@ -0,0 +1,60 @@
+# Generated by Django 5.0.10 on 2026-10-17 02:06
+
+from django.db import migrations, models
+
+
+def backfill_likert_counters(apps, schema_editor):
+    FeedbackAggregate = apps.get_model("delphi", "FeedbackAggregate")
+    Response = apps.get_model("delphi", "Response")
+
+    rows = (
+        Response.objects.filter(
+            round_item__aggregate__isnull=False,
+            round_item__item__item_type="likert5",
+            value__in=["1", "2", "3", "4", "5"],
+        )
+        .values("round_item_id", "value")
+        .annotate(c=models.Count("id"))
+        .order_by()
+    )
+    counts = {}
+    for row in rows:
+        counts.setdefault(row["round_item_id"], {})[f"count_{row['value']}"] = row["c"]
+    for round_item_id, fields in counts.items():
+        FeedbackAggregate.objects.filter(round_item_id=round_item_id).update(**fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delphi', '0004_panelist_consent_given_panelist_consent_timestamp_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedbackaggregate',
+            name='count_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feedbackaggregate',
+            name='count_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feedbackaggregate',
+            name='count_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feedbackaggregate',
+            name='count_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feedbackaggregate',
+            name='count_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_likert_counters, migrations.RunPython.noop),
+    ]
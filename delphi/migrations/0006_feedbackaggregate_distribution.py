@@ -0,0 +1,33 @@
+# Generated by Django 5.0.10 on 2026-10-17 02:08
+
+from django.db import migrations, models
+
+
+def drop_stale_option_aggregates(apps, schema_editor):
+    # Rows for option/matrix items have no distribution yet; dropping them makes the
+    # next response write (or compute_feedback) rebuild them from the responses.
+    FeedbackAggregate = apps.get_model("delphi", "FeedbackAggregate")
+    FeedbackAggregate.objects.filter(
+        round_item__item__item_type__in=["yesno", "multiple", "checkbox", "matrix"]
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delphi', '0005_feedbackaggregate_likert_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedbackaggregate',
+            name='distribution',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='feedbackaggregate',
+            name='other_responses',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(drop_stale_option_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.10 on 2026-10-17 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delphi', '0006_feedbackaggregate_distribution'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedbackaggregate',
+            name='iqr',
+            field=models.FloatField(blank=True, help_text='Interquartile range (Q3 - Q1)', null=True),
+        ),
+        migrations.AddField(
+            model_name='feedbackaggregate',
+            name='mode',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Most frequent rating (lowest on ties)', null=True),
+        ),
+    ]
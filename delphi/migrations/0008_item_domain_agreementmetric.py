@@ -0,0 +1,38 @@
+# Generated by Django 5.0.10 on 2026-10-17 02:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delphi', '0007_feedbackaggregate_iqr_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='domain',
+            field=models.CharField(blank=True, help_text='Topic/domain used to group items in analyses', max_length=255),
+        ),
+        migrations.CreateModel(
+            name='AgreementMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(blank=True, max_length=255)),
+                ('n_items', models.PositiveIntegerField(default=0)),
+                ('n_panelists', models.PositiveIntegerField(default=0, help_text='Panelists who rated at least one item')),
+                ('n_complete', models.PositiveIntegerField(default=0, help_text="Panelists who rated every item (used for Kendall's W)")),
+                ('fleiss_kappa', models.FloatField(blank=True, null=True)),
+                ('krippendorff_alpha', models.FloatField(blank=True, help_text='Ordinal metric', null=True)),
+                ('kendall_w', models.FloatField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('round', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agreement_metrics', to='delphi.round')),
+            ],
+            options={
+                'ordering': ['round_id', 'domain'],
+                'unique_together': {('round', 'domain')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.10 on 2026-10-17 02:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delphi', '0008_item_domain_agreementmetric'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StabilityStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('n_paired', models.PositiveIntegerField(default=0, help_text='Panelists who answered the item in both rounds')),
+                ('n_changed', models.PositiveIntegerField(default=0)),
+                ('change_rate', models.FloatField(blank=True, null=True)),
+                ('mean_shift', models.FloatField(blank=True, help_text='Mean rating change (likert only)', null=True)),
+                ('test', models.CharField(blank=True, help_text='wilcoxon (likert) or mcnemar (yes/no)', max_length=20)),
+                ('statistic', models.FloatField(blank=True, help_text='Wilcoxon z or McNemar chi-square', null=True)),
+                ('p_value', models.FloatField(blank=True, null=True)),
+                ('is_stable', models.BooleanField(default=False, help_text='True if <=15% of panelists changed their answer')),
+                ('shift_significant', models.BooleanField(default=False, help_text='True if the group-level shift has p < 0.05')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('previous_round_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='delphi.rounditem')),
+                ('round_item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stability', to='delphi.rounditem')),
+            ],
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.10 on 2026-10-17 02:18
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+CONTENT_FIELDS = (
+    "prompt", "item_type", "domain", "option_a", "option_b", "option_c", "option_d", "option_e", "option_f",
+    "matrix_rows", "matrix_columns", "order_index",
+)
+
+
+def backfill_content_hash(apps, schema_editor):
+    Item = apps.get_model("delphi", "Item")
+    items = list(Item.objects.only(*CONTENT_FIELDS))
+    for item in items:
+        payload = json.dumps([getattr(item, f) for f in CONTENT_FIELDS], ensure_ascii=False)
+        item.content_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    Item.objects.bulk_update(items, ["content_hash"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delphi', '0009_stabilitystat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='order_index',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='stable_code',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddConstraint(
+            model_name='item',
+            constraint=models.UniqueConstraint(condition=models.Q(('stable_code', ''), _negated=True), fields=('study', 'stable_code', 'version'), name='unique_item_code_version'),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.10 on 2026-10-17 02:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delphi', '0010_item_stable_code_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriorResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.TextField()),
+                ('comment', models.TextField(blank=True, null=True)),
+                ('answered_at', models.DateTimeField()),
+                ('panelist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prior_responses', to='delphi.panelist')),
+                ('previous_round_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='delphi.rounditem')),
+                ('round_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prior_responses', to='delphi.rounditem')),
+            ],
+            options={
+                'unique_together': {('panelist', 'round_item')},
+            },
+        ),
+    ]
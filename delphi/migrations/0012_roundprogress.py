@@ -0,0 +1,58 @@
+# Generated by Django 5.0.10 on 2026-10-17 02:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_round_progress(apps, schema_editor):
+    Response = apps.get_model("delphi", "Response")
+    RoundItem = apps.get_model("delphi", "RoundItem")
+    RoundProgress = apps.get_model("delphi", "RoundProgress")
+    totals = dict(
+        RoundItem.objects.order_by().values("round_id").annotate(n=Count("id")).values_list("round_id", "n")
+    )
+    rows = (
+        Response.objects.order_by()
+        .values("panelist_id", "round_item__round_id")
+        .annotate(n=Count("id"), last=Max("updated_at"))
+    )
+    RoundProgress.objects.bulk_create(
+        [
+            RoundProgress(
+                panelist_id=row["panelist_id"],
+                round_id=row["round_item__round_id"],
+                answered_count=row["n"],
+                total_items=totals.get(row["round_item__round_id"], 0),
+                last_activity=row["last"],
+            )
+            for row in rows
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delphi', '0011_priorresponse'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoundProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answered_count', models.PositiveIntegerField(default=0)),
+                ('total_items', models.PositiveIntegerField(default=0)),
+                ('last_activity', models.DateTimeField(blank=True, null=True)),
+                ('panelist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='round_progress', to='delphi.panelist')),
+                ('round', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='delphi.round')),
+            ],
+            options={
+                'verbose_name_plural': 'round progress',
+                'unique_together': {('panelist', 'round')},
+            },
+        ),
+        migrations.RunPython(backfill_round_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.0.10 on 2026-10-17 02:39
+
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The value parsing of delphi.distributions as of this migration, kept here so later changes there cannot alter it
+OPTION_CODES = ["A", "B", "C", "D", "E", "F"]
+OTHER_PREFIX = "Other:"
+
+
+def _other_code(item):
+    for code in OPTION_CODES:
+        label = getattr(item, f"option_{code.lower()}", "")
+        if label and "other" in label.lower():
+            return code
+    return "Other"
+
+
+def _choice_rows(item, value):
+    """(row_key, option_code, numeric_value) for each selection in a stored value."""
+    if not value:
+        return []
+    if item.item_type == "likert5":
+        try:
+            level = int(value)
+        except (TypeError, ValueError):
+            return []
+        return [("", str(level), level)] if 1 <= level <= 5 else []
+    if item.item_type == "yesno":
+        return [("", value.strip().lower(), None)]
+    if item.item_type == "multiple":
+        return [("", _other_code(item) if value.startswith(OTHER_PREFIX) else value, None)]
+    if item.item_type == "checkbox":
+        rows, in_other = [], False
+        for part in value.split(","):
+            if part.startswith(OTHER_PREFIX):
+                rows.append(("", _other_code(item), None))
+                in_other = True
+            elif not (in_other and part.strip() not in OPTION_CODES):
+                rows.append(("", part.strip(), None))
+                in_other = False
+        return rows
+    if item.item_type == "matrix":
+        try:
+            cells = json.loads(value)
+        except (TypeError, ValueError):
+            return []
+        if not isinstance(cells, dict):
+            return []
+        return [
+            (row, str(cell[key]), None)
+            for row, cell in cells.items() if isinstance(cell, dict)
+            for key in ("answer", "classification") if cell.get(key)
+        ]
+    return []
+
+
+def backfill_response_choices(apps, schema_editor):
+    Response = apps.get_model("delphi", "Response")
+    ResponseChoice = apps.get_model("delphi", "ResponseChoice")
+    batch = []
+    for response in Response.objects.select_related("round_item__item").order_by("id").iterator(2000):
+        batch.extend(
+            ResponseChoice(
+                response_id=response.id,
+                round_item_id=response.round_item_id,
+                panelist_id=response.panelist_id,
+                row_key=row_key,
+                option_code=option_code,
+                numeric_value=numeric_value,
+            )
+            for row_key, option_code, numeric_value in _choice_rows(response.round_item.item, response.value)
+        )
+        if len(batch) >= 2000:
+            ResponseChoice.objects.bulk_create(batch, batch_size=1000)
+            batch = []
+    ResponseChoice.objects.bulk_create(batch, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delphi', '0012_roundprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponseChoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_key', models.CharField(blank=True, max_length=500)),
+                ('option_code', models.CharField(max_length=255)),
+                ('numeric_value', models.SmallIntegerField(blank=True, null=True)),
+                ('panelist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='delphi.panelist')),
+                ('response', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='choices', to='delphi.response')),
+                ('round_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='delphi.rounditem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['round_item', 'row_key', 'option_code'], name='choice_item_option_idx'), models.Index(fields=['round_item', 'numeric_value'], name='choice_item_numeric_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_response_choices, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+import hashlib
+import json
 import uuid
 from django.db import models
 from django.utils import timezone
@@ -42,6 +44,7 @@ class Item(models.Model):
     study = models.ForeignKey(Study, on_delete=models.CASCADE, related_name="items")
     prompt = models.TextField(help_text="The question or statement to present to panelists")
     item_type = models.CharField(max_length=20, choices=SCALE_CHOICES, default="likert5")
+    domain = models.CharField(max_length=255, blank=True, help_text="Topic/domain used to group items in analyses")
 
     # Custom options for multiple choice questions
     option_a = models.CharField(max_length=5000, blank=True, help_text="Option A (for multiple choice)")
@@ -56,11 +59,42 @@ class Item(models.Model):
     # For matrix questions - stores JSON list of column headers
     matrix_columns = models.TextField(blank=True, help_text="JSON list of column headers for matrix questions")
 
+    # Identity for imported question banks: one row per (stable_code, version)
+    stable_code = models.CharField(max_length=64, blank=True, db_index=True)
+    version = models.PositiveIntegerField(default=1)
+    order_index = models.PositiveIntegerField(default=0)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    CONTENT_FIELDS = (
+        "prompt", "item_type", "domain", "option_a", "option_b", "option_c", "option_d", "option_e", "option_f",
+        "matrix_rows", "matrix_columns", "order_index",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["study", "stable_code", "version"],
+                condition=~models.Q(stable_code=""),
+                name="unique_item_code_version",
+            ),
+        ]
+
     def __str__(self):
         return f"[{self.study.name}] {self.prompt[:50]}..."
 
+    def compute_content_hash(self):
+        """SHA-256 over the fields that define what panelists see; used to skip unchanged rows on import."""
+        payload = json.dumps([getattr(self, f) for f in self.CONTENT_FIELDS], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.content_hash = self.compute_content_hash()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "content_hash"}
+        super().save(*args, **kwargs)
+
     def get_options(self):
         """Returns a list of non-empty options for multiple choice questions."""
         options = []
@@ -80,14 +114,12 @@ class Item(models.Model):
 
     def get_matrix_rows(self):
         """Returns list of row labels for matrix questions."""
-        import json
         if self.matrix_rows:
             return json.loads(self.matrix_rows)
         return []
 
     def get_matrix_columns(self):
         """Returns list of column headers for matrix questions."""
-        import json
         if self.matrix_columns:
             return json.loads(self.matrix_columns)
         return []
@@ -167,6 +199,32 @@ class Response(models.Model):
         return f"{self.panelist.email} — R{self.round_item.round.number} item {self.round_item_id}"
 
 
+class ResponseChoice(models.Model):
+    """
+    One selected option, likert level or matrix cell of a Response, kept in step with its value.
+
+    Likert answers have option_code "1".."5" and numeric_value 1..5; option items
+    have the option code ("A".."F", "yes"/"no"); matrix cells have row_key set to
+    the row label and option_code to the answer or classification.
+    """
+    response = models.ForeignKey(Response, on_delete=models.CASCADE, related_name="choices")
+    round_item = models.ForeignKey(RoundItem, on_delete=models.CASCADE, related_name="+")
+    panelist = models.ForeignKey(Panelist, on_delete=models.CASCADE, related_name="+")
+    row_key = models.CharField(max_length=500, blank=True)
+    option_code = models.CharField(max_length=255)
+    numeric_value = models.SmallIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["round_item", "row_key", "option_code"], name="choice_item_option_idx"),
+            models.Index(fields=["round_item", "numeric_value"], name="choice_item_numeric_idx"),
+        ]
+
+    def __str__(self):
+        cell = f"{self.row_key}: " if self.row_key else ""
+        return f"Response {self.response_id} — {cell}{self.option_code}"
+
+
 class RoundSubmission(models.Model):
     """Marks a panelist's round as final/locked."""
     panelist = models.ForeignKey(Panelist, on_delete=models.CASCADE, related_name="round_submissions")
@@ -181,17 +239,111 @@ class RoundSubmission(models.Model):
         return f"{self.panelist.email} — submitted R{self.round.number}"
 
 
+class RoundProgress(models.Model):
+    """A panelist's answered count in a round, kept in step with Response and RoundItem writes."""
+    panelist = models.ForeignKey(Panelist, on_delete=models.CASCADE, related_name="round_progress")
+    round = models.ForeignKey(Round, on_delete=models.CASCADE, related_name="progress")
+    answered_count = models.PositiveIntegerField(default=0)
+    total_items = models.PositiveIntegerField(default=0)
+    last_activity = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("panelist", "round")
+        verbose_name_plural = "round progress"
+
+    def __str__(self):
+        return f"{self.panelist.email} — R{self.round.number} {self.answered_count}/{self.total_items}"
+
+    @property
+    def is_complete(self):
+        return self.total_items > 0 and self.answered_count >= self.total_items
+
+
 class FeedbackAggregate(models.Model):
     """Stores summary stats per (RoundItem) after round is closed or after submissions."""
     round_item = models.OneToOneField(RoundItem, on_delete=models.CASCADE, related_name="aggregate")
     mean = models.FloatField(null=True, blank=True)
     median = models.FloatField(null=True, blank=True)
     std_dev = models.FloatField(null=True, blank=True)
+    iqr = models.FloatField(null=True, blank=True, help_text="Interquartile range (Q3 - Q1)")
+    mode = models.PositiveSmallIntegerField(null=True, blank=True, help_text="Most frequent rating (lowest on ties)")
     n = models.PositiveIntegerField(default=0)
     pct_agree = models.FloatField(null=True, blank=True, help_text="Percentage of 4 or 5 ratings")
     pct_disagree = models.FloatField(null=True, blank=True, help_text="Percentage of 1 or 2 ratings")
     consensus_reached = models.BooleanField(default=False, help_text="True if >=75% agreement")
+
+    # Likert level counters, kept in step with every response write
+    count_1 = models.PositiveIntegerField(default=0)
+    count_2 = models.PositiveIntegerField(default=0)
+    count_3 = models.PositiveIntegerField(default=0)
+    count_4 = models.PositiveIntegerField(default=0)
+    count_5 = models.PositiveIntegerField(default=0)
+
+    # Multiple/checkbox/yesno: {option code: count}; matrix: {row: {column: count}}
+    distribution = models.JSONField(default=dict, blank=True)
+    # Free-text answers given with an "Other" option
+    other_responses = models.JSONField(default=list, blank=True)
+
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Agg for RoundItem {self.round_item_id}"
+
+    def likert_counts(self):
+        """Returns {level: count} for likert levels 1-5."""
+        return {k: getattr(self, f"count_{k}") for k in range(1, 6)}
+
+
+class AgreementMetric(models.Model):
+    """Inter-rater agreement over a round's likert items, for the whole round (domain "") or one domain."""
+    round = models.ForeignKey(Round, on_delete=models.CASCADE, related_name="agreement_metrics")
+    domain = models.CharField(max_length=255, blank=True)
+    n_items = models.PositiveIntegerField(default=0)
+    n_panelists = models.PositiveIntegerField(default=0, help_text="Panelists who rated at least one item")
+    n_complete = models.PositiveIntegerField(default=0, help_text="Panelists who rated every item (used for Kendall's W)")
+    fleiss_kappa = models.FloatField(null=True, blank=True)
+    krippendorff_alpha = models.FloatField(null=True, blank=True, help_text="Ordinal metric")
+    kendall_w = models.FloatField(null=True, blank=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("round", "domain")
+        ordering = ["round_id", "domain"]
+
+    def __str__(self):
+        return f"Agreement for {self.round} ({self.domain or 'all items'})"
+
+
+class StabilityStat(models.Model):
+    """Response stability for an item between the previous round and this round item's round."""
+    round_item = models.OneToOneField(RoundItem, on_delete=models.CASCADE, related_name="stability")
+    previous_round_item = models.ForeignKey(RoundItem, on_delete=models.CASCADE, related_name="+")
+    n_paired = models.PositiveIntegerField(default=0, help_text="Panelists who answered the item in both rounds")
+    n_changed = models.PositiveIntegerField(default=0)
+    change_rate = models.FloatField(null=True, blank=True)
+    mean_shift = models.FloatField(null=True, blank=True, help_text="Mean rating change (likert only)")
+    test = models.CharField(max_length=20, blank=True, help_text="wilcoxon (likert) or mcnemar (yes/no)")
+    statistic = models.FloatField(null=True, blank=True, help_text="Wilcoxon z or McNemar chi-square")
+    p_value = models.FloatField(null=True, blank=True)
+    is_stable = models.BooleanField(default=False, help_text="True if <=15% of panelists changed their answer")
+    shift_significant = models.BooleanField(default=False, help_text="True if the group-level shift has p < 0.05")
     computed_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"Agg for RoundItem {self.round_item_id}"
\ No newline at end of file
+        return f"Stability for RoundItem {self.round_item_id}"
+
+
+class PriorResponse(models.Model):
+    """A panelist's answer to the same item in the previous round, copied when a round is carried forward."""
+    panelist = models.ForeignKey(Panelist, on_delete=models.CASCADE, related_name="prior_responses")
+    round_item = models.ForeignKey(RoundItem, on_delete=models.CASCADE, related_name="prior_responses")
+    previous_round_item = models.ForeignKey(RoundItem, on_delete=models.CASCADE, related_name="+")
+    value = models.TextField()
+    comment = models.TextField(blank=True, null=True)
+    answered_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("panelist", "round_item")
+
+    def __str__(self):
+        return f"{self.panelist.email} — prior answer for RoundItem {self.round_item_id}"
@@ -0,0 +1,80 @@
+"""
+Cached per-round navigation index for item pages.
+
+A round's item ids in display order, plus an id -> position map, are stored in
+Django's cache under a key that includes a per-round version counter. Any change
+to a round's RoundItems bumps the counter (post_save/post_delete signals, and
+explicit calls from bulk code paths that bypass signals), so stale indexes are
+never read and simply expire. See delphi.versioning: with the default
+per-process cache, other workers see a change within its LOCAL_TIMEOUT.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from django.core.cache import cache
+
+from . import versioning
+from .models import RoundItem
+
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def _version_key(round_id: int) -> str:
+    return f"delphi:nav:{round_id}:version"
+
+
+def _index_key(round_id: int, version: int) -> str:
+    return f"delphi:nav:{round_id}:v{version}"
+
+
+@dataclass(frozen=True)
+class NavigationIndex:
+    round_id: int
+    ids: Tuple[int, ...]
+    positions: Dict[int, int] = field(compare=False)
+
+    @classmethod
+    def build(cls, round_id: int) -> "NavigationIndex":
+        ids = tuple(RoundItem.objects.filter(round_id=round_id).order_by("order", "id").values_list("id", flat=True))
+        return cls(round_id, ids, {ri_id: i for i, ri_id in enumerate(ids)})
+
+    @property
+    def total(self) -> int:
+        return len(self.ids)
+
+    def position(self, round_item_id: int) -> Optional[int]:
+        return self.positions.get(round_item_id)
+
+    def previous_id(self, round_item_id: int) -> Optional[int]:
+        i = self.positions.get(round_item_id)
+        return self.ids[i - 1] if i else None
+
+    def next_id(self, round_item_id: int) -> Optional[int]:
+        i = self.positions.get(round_item_id)
+        return self.ids[i + 1] if i is not None and i + 1 < len(self.ids) else None
+
+    def progress_percent(self, round_item_id: int) -> int:
+        i = self.positions.get(round_item_id)
+        return int((i + 1) / len(self.ids) * 100) if i is not None else 0
+
+
+def get_navigation(round_id: int) -> NavigationIndex:
+    """The round's navigation index; one query on a cache miss, none on a hit."""
+    key = _index_key(round_id, navigation_version(round_id))
+    index = cache.get(key)
+    if index is None:
+        index = NavigationIndex.build(round_id)
+        cache.set(key, index, CACHE_TIMEOUT)
+    return index
+
+
+def navigation_version(round_id: int) -> int:
+    """The round's current navigation version; changes whenever its round items do."""
+    return versioning.current(_version_key(round_id))
+
+
+def invalidate_navigation(round_id: int) -> None:
+    """Bump the round's version so the next read rebuilds the index."""
+    versioning.bump(_version_key(round_id))
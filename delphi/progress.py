@@ -0,0 +1,177 @@
+"""
+Per-panelist round progress.
+
+Each (panelist, round) has a RoundProgress row holding the answered count, the
+round's item total and the last activity time. The row is created on the
+panelist's first answer in the round and then kept in step incrementally:
+save_response counts first answers, and RoundItem signals (or explicit calls
+from bulk code paths that bypass signals) adjust the totals; bulk deletes
+recount the round with recount_progress instead. Deleting a single Response is
+not tracked; reconcile_progress repairs any drift from the responses, as
+rebuild_feedback does for aggregates.
+
+Pages read progress as correlated subqueries on Round (or an EXISTS on
+RoundItem), so they cost the same number of queries however many rounds or
+items there are.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Response, Round, RoundItem, RoundProgress, RoundSubmission
+
+BATCH_SIZE = 500
+
+
+def _count(queryset, group_by: str):
+    return Coalesce(
+        Subquery(queryset.order_by().values(group_by).annotate(c=Count("id")).values("c")[:1], output_field=IntegerField()),
+        Value(0),
+    )
+
+
+def with_submission(rounds, panelist_id: int):
+    """Annotate rounds with the panelist's `submitted_at` (None if not submitted)."""
+    return rounds.annotate(
+        submitted_at=Subquery(
+            RoundSubmission.objects.filter(panelist_id=panelist_id, round_id=OuterRef("pk")).values("submitted_at")[:1]
+        ),
+    )
+
+
+def with_progress(rounds, panelist_id: int):
+    """Annotate rounds with `total` items, the panelist's `answered` count and their `submitted_at`."""
+    progress = RoundProgress.objects.filter(panelist_id=panelist_id, round_id=OuterRef("pk"))
+    return with_submission(rounds, panelist_id).annotate(
+        answered=Coalesce(Subquery(progress.values("answered_count")[:1]), Value(0)),
+        # Rounds the panelist has not started have no progress row yet
+        total=Coalesce(
+            Subquery(progress.values("total_items")[:1]),
+            _count(RoundItem.objects.filter(round_id=OuterRef("pk")), "round_id"),
+        ),
+    )
+
+
+def open_rounds(study_id: int, panelist_id: int):
+    return with_progress(
+        Round.objects.filter(study_id=study_id, is_open=True).select_related("study").order_by("number"),
+        panelist_id,
+    )
+
+
+def round_items_with_answers(round_id: int, panelist_id: int):
+    """The round's items in display order, each with an `answered` flag for the panelist."""
+    return (
+        RoundItem.objects.filter(round_id=round_id)
+        .select_related("item")
+        .annotate(answered=Exists(Response.objects.filter(panelist_id=panelist_id, round_item_id=OuterRef("pk"))))
+        .order_by("order", "id")
+    )
+
+
+def get_progress(panelist_id: int, round_id: int) -> Optional[RoundProgress]:
+    return RoundProgress.objects.filter(panelist_id=panelist_id, round_id=round_id).first()
+
+
+def record_answers(panelist_id: int, round_id: int, new_answers: int) -> None:
+    """
+    Count `new_answers` first answers (0 for revisions) in a panelist's round
+    progress. Must run inside the transaction that writes the Responses; a
+    single UPDATE unless these are the panelist's first answers in the round.
+    """
+    fields = {"last_activity": timezone.now()}
+    if new_answers:
+        fields["answered_count"] = F("answered_count") + new_answers
+    rows = RoundProgress.objects.filter(panelist_id=panelist_id, round_id=round_id)
+    if rows.update(**fields):
+        return
+
+    # No row yet: start it from the database, which already holds these answers
+    _, created = RoundProgress.objects.get_or_create(
+        panelist_id=panelist_id,
+        round_id=round_id,
+        defaults={
+            "answered_count": Response.objects.filter(panelist_id=panelist_id, round_item__round_id=round_id).count(),
+            "total_items": RoundItem.objects.filter(round_id=round_id).count(),
+            "last_activity": fields["last_activity"],
+        },
+    )
+    if not created:
+        rows.update(**fields)
+
+
+def round_items_added(round_id: int, count: int = 1) -> None:
+    if count:
+        RoundProgress.objects.filter(round_id=round_id).update(total_items=F("total_items") + count)
+
+
+def round_item_removed(round_item: RoundItem) -> None:
+    """Uncount a round item and its answers; call before the item (and its responses) is deleted."""
+    answered_by = Response.objects.filter(round_item_id=round_item.id).values("panelist_id")
+    RoundProgress.objects.filter(round_id=round_item.round_id, panelist_id__in=answered_by).update(
+        answered_count=Greatest(F("answered_count") - 1, Value(0))
+    )
+    RoundProgress.objects.filter(round_id=round_item.round_id).update(
+        total_items=Greatest(F("total_items") - 1, Value(0))
+    )
+
+
+def recount_progress(round_id: int) -> int:
+    """
+    Recount the answered and total items of a round's existing progress rows in
+    one UPDATE, e.g. after round items were deleted in bulk. Returns the rows updated.
+    """
+    answered = Response.objects.filter(round_item__round_id=round_id, panelist_id=OuterRef("panelist_id"))
+    return RoundProgress.objects.filter(round_id=round_id).update(
+        answered_count=_count(answered, "panelist_id"),
+        total_items=_count(RoundItem.objects.filter(round_id=round_id), "round_id"),
+    )
+
+
+def reconcile_progress(round_id: int, dry_run: bool = False) -> Dict[str, List]:
+    """
+    Rebuild a round's progress rows from its responses and items.
+
+    Returns {"created": [...], "updated": [...]} as (panelist_id, detail) pairs;
+    with `dry_run` nothing is written.
+    """
+    total = RoundItem.objects.filter(round_id=round_id).count()
+    answered = {
+        panelist_id: (n, last)
+        for panelist_id, n, last in Response.objects.filter(round_item__round_id=round_id)
+        .order_by()
+        .values("panelist_id")
+        .annotate(n=Count("id"), last=Max("updated_at"))
+        .values_list("panelist_id", "n", "last")
+    }
+    stored = {row.panelist_id: row for row in RoundProgress.objects.filter(round_id=round_id)}
+
+    result: Dict[str, List] = {"created": [], "updated": []}
+    to_create, to_update = [], []
+    for panelist_id, (n, last) in answered.items():
+        if panelist_id not in stored:
+            to_create.append(
+                RoundProgress(
+                    panelist_id=panelist_id, round_id=round_id, answered_count=n, total_items=total, last_activity=last
+                )
+            )
+            result["created"].append((panelist_id, f"missing, {n}/{total}"))
+    for panelist_id, row in stored.items():
+        n = answered.get(panelist_id, (0, None))[0]
+        if (row.answered_count, row.total_items) != (n, total):
+            result["updated"].append(
+                (panelist_id, f"{row.answered_count}/{row.total_items} -> {n}/{total}")
+            )
+            row.answered_count, row.total_items = n, total
+            to_update.append(row)
+
+    if not dry_run and (to_create or to_update):
+        with transaction.atomic():
+            RoundProgress.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+            RoundProgress.objects.bulk_update(to_update, ["answered_count", "total_items"], batch_size=BATCH_SIZE)
+    return result
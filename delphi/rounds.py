@@ -0,0 +1,201 @@
+"""
+Set-based maintenance of a round's item list.
+
+The latest version of each stable_code is selected in the database with a NOT
+EXISTS subquery, compared with the round's current RoundItems in Python, and
+the difference is applied with bulk statements. Removed round items and the
+rows that depend on them are deleted with one DELETE per table, bypassing the
+per-row RoundItem signals; progress is then recounted and navigation
+invalidated once for the round. The number of queries does not depend on the
+size of the item bank.
+
+Carrying a round forward copies its non-consensus items and every panelist's
+answers to them into the next round with two INSERT ... SELECT statements, so
+no rows pass through Python.
+"""
+from __future__ import annotations
+
+from typing import Dict, List
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+
+from .models import (
+    FeedbackAggregate, Item, PriorResponse, Response, ResponseChoice, Round, RoundItem, StabilityStat,
+)
+from .navigation import invalidate_navigation
+from .progress import recount_progress
+from .services import compute_feedback_for_round
+
+BATCH_SIZE = 500
+
+
+def latest_items(study_id: int):
+    """Items that are the highest version of their stable_code, in order_index then code order."""
+    newer = Item.objects.filter(
+        study_id=OuterRef("study_id"), stable_code=OuterRef("stable_code"), version__gt=OuterRef("version")
+    )
+    return (
+        Item.objects.filter(study_id=study_id)
+        .exclude(stable_code="")
+        .filter(~Exists(newer))
+        .order_by("order_index", "stable_code")
+    )
+
+
+def sync_round_items(rnd: Round, overwrite: bool = False, prune: bool = False, dry_run: bool = False) -> Dict[str, List]:
+    """
+    Make `rnd` hold the latest version of every coded item in its study.
+
+    - codes missing from the round are appended after the current last item
+    - a round item on an older version is repointed to the latest version in
+      place (keeping its id) if nobody has answered it yet, otherwise kept
+    - with `prune`, other unanswered round items whose item is not a latest
+      coded version (e.g. uncoded items added by hand) are removed
+    - with `overwrite`, all round items (and their responses) are deleted and
+      the latest versions attached in order
+
+    Returns the diff as lists of stable codes (or item ids for uncoded items).
+    """
+    latest = list(latest_items(rnd.study_id).values_list("id", "stable_code"))
+    diff: Dict[str, List] = {"added": [], "upgraded": [], "removed": [], "kept_answered": []}
+
+    if overwrite:
+        diff["removed"] = [
+            code or f"item {item_id}"
+            for item_id, code in RoundItem.objects.filter(round=rnd).values_list("item_id", "item__stable_code")
+        ]
+        diff["added"] = [code for _, code in latest]
+        if not dry_run:
+            with transaction.atomic():
+                _delete_round_items(RoundItem.objects.filter(round=rnd))
+                RoundItem.objects.bulk_create(
+                    [RoundItem(round=rnd, item_id=item_id, order=i) for i, (item_id, _) in enumerate(latest, start=1)],
+                    batch_size=BATCH_SIZE,
+                )
+                recount_progress(rnd.id)
+                invalidate_navigation(rnd.id)
+        return diff
+
+    current = list(
+        RoundItem.objects.filter(round=rnd)
+        .annotate(answered=Exists(Response.objects.filter(round_item_id=OuterRef("id"))))
+        .values_list("id", "item_id", "item__stable_code", "order", "answered")
+    )
+    latest_id = {code: item_id for item_id, code in latest}
+    latest_ids = set(latest_id.values())
+    current_item_ids = {item_id for _, item_id, _, _, _ in current}
+    in_round = {code for _, _, code, _, _ in current if code}
+    last = max((order for _, _, _, order, _ in current), default=0)
+
+    to_repoint: List[RoundItem] = []
+    repointed = set()
+    to_delete: List[int] = []
+    for ri_id, item_id, code, _, answered in current:
+        if item_id in latest_ids:
+            continue
+        label = code or f"item {item_id}"
+        # Repoint unless the latest version is already in the round alongside this one
+        if code and code in latest_id and latest_id[code] not in current_item_ids:
+            if answered:
+                diff["kept_answered"].append(label)
+            elif code not in repointed:
+                repointed.add(code)
+                to_repoint.append(RoundItem(id=ri_id, item_id=latest_id[code]))
+                diff["upgraded"].append(label)
+        elif prune:
+            if answered:
+                diff["kept_answered"].append(label)
+            else:
+                to_delete.append(ri_id)
+                diff["removed"].append(label)
+
+    # A code whose older version is kept because it was answered is not added again
+    additions = [(item_id, code) for item_id, code in latest if code not in in_round]
+    diff["added"] = [code for _, code in additions]
+
+    if dry_run or not (additions or to_repoint or to_delete):
+        return diff
+
+    with transaction.atomic():
+        if to_delete:
+            _delete_round_items(RoundItem.objects.filter(id__in=to_delete))
+        RoundItem.objects.bulk_update(to_repoint, ["item"], batch_size=BATCH_SIZE)
+        RoundItem.objects.bulk_create(
+            [RoundItem(round=rnd, item_id=item_id, order=last + i) for i, (item_id, _) in enumerate(additions, start=1)],
+            batch_size=BATCH_SIZE,
+        )
+        recount_progress(rnd.id)
+        invalidate_navigation(rnd.id)
+    return diff
+
+
+def _tables(*models):
+    return [connection.ops.quote_name(m._meta.db_table) for m in models]
+
+
+def _delete_round_items(round_items) -> None:
+    """
+    Delete a queryset of round items and every row that cascades from them, one
+    DELETE per table and without RoundItem signals: callers recount progress
+    and invalidate navigation themselves.
+    """
+    ids, params = round_items.order_by().values("id").query.sql_with_params()
+    choice, response, aggregate, stability, prior, round_item = _tables(
+        ResponseChoice, Response, FeedbackAggregate, StabilityStat, PriorResponse, RoundItem
+    )
+    with connection.cursor() as cursor:
+        for table, columns in [
+            (choice, ["round_item_id"]),
+            (response, ["round_item_id"]),
+            (aggregate, ["round_item_id"]),
+            (stability, ["round_item_id", "previous_round_item_id"]),
+            (prior, ["round_item_id", "previous_round_item_id"]),
+            (round_item, ["id"]),
+        ]:
+            where = " OR ".join(f"{column} IN ({ids})" for column in columns)
+            cursor.execute(f"DELETE FROM {table} WHERE {where}", list(params) * len(columns))
+
+
+def carry_forward_round(round_id: int, recompute: bool = True) -> Dict:
+    """
+    Create the next round holding the items of `round_id` that have not reached consensus.
+
+    Items keep their order. Each panelist's answer from `round_id` is copied into
+    PriorResponse for the new round item so it can be shown as "your previous
+    answer". With `recompute`, the source round's aggregates are rebuilt first so
+    consensus reflects every saved response. The new round starts closed.
+    """
+    source = Round.objects.get(id=round_id)
+    if Round.objects.filter(study_id=source.study_id, number=source.number + 1).exists():
+        raise ValueError(f"Round {source.number + 1} already exists in this study.")
+
+    q = connection.ops.quote_name
+    round_item, aggregate, response, prior = _tables(RoundItem, FeedbackAggregate, Response, PriorResponse)
+    with transaction.atomic():
+        if recompute:
+            compute_feedback_for_round(round_id)
+        target = Round.objects.create(study_id=source.study_id, number=source.number + 1, is_open=False)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {round_item} (round_id, item_id, {q('order')}) "
+                f"SELECT %s, ri.item_id, ri.{q('order')} FROM {round_item} ri "
+                f"LEFT JOIN {aggregate} fa ON fa.round_item_id = ri.id "
+                f"WHERE ri.round_id = %s AND (fa.id IS NULL OR fa.consensus_reached = %s)",
+                [target.id, round_id, False],
+            )
+            items = cursor.rowcount
+            cursor.execute(
+                f"INSERT INTO {prior} (panelist_id, round_item_id, previous_round_item_id, value, comment, answered_at) "
+                f"SELECT r.panelist_id, tri.id, sri.id, r.value, r.comment, r.updated_at "
+                f"FROM {round_item} tri "
+                f"JOIN {round_item} sri ON sri.item_id = tri.item_id AND sri.round_id = %s "
+                f"JOIN {response} r ON r.round_item_id = sri.id "
+                f"WHERE tri.round_id = %s",
+                [round_id, target.id],
+            )
+            priors = cursor.rowcount
+        invalidate_navigation(target.id)
+
+    return {"round": target, "items": items, "prior_responses": priors}
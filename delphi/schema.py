@@ -0,0 +1,116 @@
+"""
+Compiled, read-only view of what an item asks and accepts (ItemSchema).
+
+Item keeps options in six columns and matrix rows/columns as JSON text, so
+get_options() and get_matrix_rows() rebuild lists and re-parse JSON on every
+call, and finding the "Other" option means scanning the labels. item_schema()
+does that work once per item version and keeps the result in a process-wide
+dict keyed by (item id, content_hash): a saved edit changes the hash, so it
+compiles to a new entry, and a post_save receiver drops the item's old ones.
+
+Rendering (item_detail, the whole-round form, feedback rows) and answer
+validation (delphi.answers) read the schema. It can also be passed wherever a
+function expects an item for parsing stored values (e.g. response_tokens).
+Code that edits option or matrix columns with queryset update() leaves
+content_hash unchanged and must call invalidate_item itself.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from .distributions import OPTION_CODES, other_option_code, response_tokens
+
+LIKERT_VALUES = ("1", "2", "3", "4", "5")
+
+YESNO_VALUES = ("yes", "no")
+
+MATRIX_ANSWERS = ("Yes", "No")
+
+# Compiled schemas kept per process; the dict is emptied when it reaches this size
+MAX_SCHEMAS = 5000
+
+_schemas: Dict[Tuple[int, str], "ItemSchema"] = {}
+
+
+@dataclass(frozen=True)
+class ItemSchema:
+    item_type: str
+    options: Tuple[Tuple[str, str], ...]
+    other_code: Optional[str]
+    matrix_rows: Tuple[str, ...]
+    matrix_columns: Tuple[str, ...]
+    # Values a single-valued item accepts (likert levels, yes/no, option codes); empty for free text
+    accepted: FrozenSet[str]
+
+    @property
+    def codes(self) -> FrozenSet[str]:
+        return frozenset(code for code, _ in self.options)
+
+    @property
+    def classifications(self) -> Tuple[str, ...]:
+        """Matrix columns a row answered "Yes" can be classified as (the bank also lists the answers there)."""
+        return tuple(label for label in self.matrix_columns if label not in MATRIX_ANSWERS)
+
+    def selection(self, value: Optional[str]) -> Tuple[List[str], str]:
+        """(selected option codes, "Other" text) of a stored multiple or checkbox value."""
+        tokens, others = response_tokens(self, value)
+        return [code for _, code in tokens], ", ".join(others)
+
+    def matrix_cells(self, value: Optional[str]) -> Dict[str, dict]:
+        """{row: {"answer", "classification"}} of a stored matrix value, ignoring unreadable ones."""
+        try:
+            cells = json.loads(value) if value else {}
+        except json.JSONDecodeError:
+            return {}
+        if not isinstance(cells, dict):
+            return {}
+        return {row: cell for row, cell in cells.items() if isinstance(cell, dict)}
+
+
+def _json_list(text: str) -> Tuple[str, ...]:
+    return tuple(json.loads(text)) if text else ()
+
+
+def compile_schema(item) -> ItemSchema:
+    """Build the schema of `item` without the cache."""
+    options = tuple(
+        (code, label) for code in OPTION_CODES if (label := getattr(item, f"option_{code.lower()}"))
+    )
+    if item.item_type == "likert5":
+        accepted = frozenset(LIKERT_VALUES)
+    elif item.item_type == "yesno":
+        accepted = frozenset(YESNO_VALUES)
+    elif item.item_type in ("multiple", "checkbox"):
+        accepted = frozenset(code for code, _ in options)
+    else:
+        accepted = frozenset()
+    return ItemSchema(
+        item_type=item.item_type,
+        options=options,
+        other_code=other_option_code(item),
+        matrix_rows=_json_list(item.matrix_rows) if item.item_type == "matrix" else (),
+        matrix_columns=_json_list(item.matrix_columns) if item.item_type == "matrix" else (),
+        accepted=accepted,
+    )
+
+
+def item_schema(item) -> ItemSchema:
+    """The compiled schema of a saved item, from the process cache when this version was seen before."""
+    if item.pk is None or not item.content_hash:
+        return compile_schema(item)
+    key = (item.pk, item.content_hash)
+    schema = _schemas.get(key)
+    if schema is None:
+        if len(_schemas) >= MAX_SCHEMAS:
+            _schemas.clear()
+        schema = _schemas[key] = compile_schema(item)
+    return schema
+
+
+def invalidate_item(item_id: int) -> None:
+    """Drop every cached version of an item's schema."""
+    for key in list(_schemas):
+        if key[0] == item_id:
+            _schemas.pop(key, None)
@@ -1,65 +1,388 @@
 from __future__ import annotations
 
-from collections import Counter
-from typing import Dict, Tuple
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from django.db.models import Q
+from django.db import connection, transaction
+from django.db.models import Count
 from django.utils import timezone
 
-from .models import RoundItem, Response, FeedbackStat, Item
+from .distributions import (
+    DISTRIBUTION_TYPES, LIKERT_LEVELS, add_tokens, likert_level, remove_texts, response_tokens,
+)
+from .choices import write_choices
+from .models import FeedbackAggregate, Response, RoundItem, RoundSubmission
+from .progress import get_progress, record_answers
+from .schema import item_schema
 
 
-LIKERT_LEVELS = [1, 2, 3, 4, 5]
+# Protocol: consensus if either agreement or disagreement reaches 75%
+CONSENSUS_THRESHOLD = 0.75
 
+COUNTER_FIELDS = [f"count_{k}" for k in LIKERT_LEVELS]
 
-def compute_feedback_for_round_item(round_item: RoundItem, overwrite: bool = True) -> FeedbackStat:
-    """Compute group feedback for one item in one round using the latest response per panelist (enforced by unique constraint)."""
-    item = round_item.item
-    qs = Response.objects.filter(round_item=round_item)
+LIKERT_FIELDS = [
+    "mean", "median", "std_dev", "iqr", "mode", "n", "pct_agree", "pct_disagree", "consensus_reached",
+    *COUNTER_FIELDS, "computed_at",
+]
+
+AGGREGATE_FIELDS = [*LIKERT_FIELDS, "distribution", "other_responses"]
+
+
+def _nth_value(counts: Dict[int, int], index: int) -> int:
+    """Value at 0-based `index` of the sorted responses described by `counts`."""
+    seen = 0
+    for k in LIKERT_LEVELS:
+        seen += counts.get(k, 0)
+        if index < seen:
+            return k
+    return LIKERT_LEVELS[-1]
+
+
+def likert_quantile(counts: Dict[int, int], n: int, q: float) -> float:
+    """Quantile with linear interpolation (numpy's default method) from a level distribution."""
+    h = (n - 1) * q
+    lo = int(h)
+    lo_value = _nth_value(counts, lo)
+    return lo_value + (h - lo) * (_nth_value(counts, min(lo + 1, n - 1)) - lo_value)
+
+
+def likert_stats(counts: Dict[int, int]) -> dict:
+    """Summary stats for a likert item from its {level: count} distribution."""
+    n = sum(counts.get(k, 0) for k in LIKERT_LEVELS)
+    counters = {f"count_{k}": counts.get(k, 0) for k in LIKERT_LEVELS}
+    if not n:
+        return {
+            "n": 0, "mean": None, "median": None, "std_dev": None, "iqr": None, "mode": None,
+            "pct_agree": None, "pct_disagree": None, "consensus_reached": False, **counters,
+        }
+
+    mean = sum(k * counts.get(k, 0) for k in LIKERT_LEVELS) / n
+    # Sample standard deviation (ddof=1)
+    std_dev = None
+    if n > 1:
+        sum_sq = sum(counts.get(k, 0) * (k - mean) ** 2 for k in LIKERT_LEVELS)
+        std_dev = (sum_sq / (n - 1)) ** 0.5
+    pct_agree = (counts.get(4, 0) + counts.get(5, 0)) / n
+    pct_disagree = (counts.get(1, 0) + counts.get(2, 0)) / n
+    return {
+        **counters,
+        "n": n,
+        "mean": mean,
+        "median": likert_quantile(counts, n, 0.5),
+        "std_dev": std_dev,
+        "iqr": likert_quantile(counts, n, 0.75) - likert_quantile(counts, n, 0.25),
+        # Ties resolve to the lowest level
+        "mode": max(LIKERT_LEVELS, key=lambda k: (counts.get(k, 0), -k)),
+        "pct_agree": pct_agree,
+        "pct_disagree": pct_disagree,
+        "consensus_reached": pct_agree >= CONSENSUS_THRESHOLD or pct_disagree >= CONSENSUS_THRESHOLD,
+    }
+
+
+def choice_stats(counts: Dict[str, int]) -> dict:
+    """Summary stats for a single-choice item: pct_agree is the share of the majority option."""
+    n = sum(counts.values())
+    if not n:
+        return {"n": 0, "mean": None, "pct_agree": None, "pct_disagree": None, "consensus_reached": False}
+
+    pct_majority = max(counts.values()) / n
+    return {
+        "n": n,
+        "mean": None,
+        "pct_agree": pct_majority,
+        "pct_disagree": None,
+        "consensus_reached": pct_majority >= CONSENSUS_THRESHOLD,
+    }
+
+
+def item_stats(item, value_counts: Dict[str, int]) -> dict:
+    """Summary stats for one item from its {stored value: count} rows."""
+    if item.item_type == "likert5":
+        counts = defaultdict(int)
+        for value, c in value_counts.items():
+            level = likert_level(value)
+            if level is not None:
+                counts[level] += c
+        return likert_stats(counts)
+
+    stats = {"n": sum(value_counts.values())}
+    if item.item_type in DISTRIBUTION_TYPES:
+        # Each distinct stored value is parsed once and weighted by its count
+        distribution, others = {}, []
+        schema = item_schema(item)
+        for value, c in value_counts.items():
+            tokens, texts = response_tokens(schema, value)
+            add_tokens(distribution, tokens, c)
+            others.extend(texts * c)
+        stats.update(distribution_stats(item.item_type, distribution))
+        stats["distribution"] = distribution
+        stats["other_responses"] = others
+    return stats
 
-    if item.response_type == Item.ResponseType.LIKERT_5:
-        vals = [r.likert_value for r in qs if r.likert_value is not None]
-        n = len(vals)
-        dist = Counter(vals)
-        dist_json = {str(k): int(dist.get(k, 0)) for k in LIKERT_LEVELS}
-        mean = (sum(vals) / n) if n else None
 
-        agree = sum(dist.get(k, 0) for k in (4, 5))
-        disagree = sum(dist.get(k, 0) for k in (1, 2))
-        pct_agree = (agree / n) if n else None
-        pct_disagree = (disagree / n) if n else None
+def distribution_stats(item_type: str, distribution: Dict) -> dict:
+    """Majority-share stats for single-choice items; other distribution types carry counts only."""
+    if item_type in ("yesno", "multiple"):
+        stats = choice_stats(distribution)
+        stats.pop("n")
+        return stats
+    return {"mean": None, "pct_agree": None, "pct_disagree": None, "consensus_reached": False}
 
-        # Protocol: consensus if either agreement or disagreement exceeds 75%
-        consensus = bool(n) and (pct_agree >= 0.75 or pct_disagree >= 0.75)
 
+def _grouped_value_counts(responses) -> Dict[int, Dict[str, int]]:
+    """One GROUP BY (round_item_id, value) query -> {round_item_id: {value: count}}."""
+    grouped: Dict[int, Dict[str, int]] = defaultdict(dict)
+    rows = responses.values("round_item_id", "value").annotate(c=Count("id")).order_by()
+    for row in rows:
+        grouped[row["round_item_id"]][row["value"]] = row["c"]
+    return grouped
+
+
+def _write_aggregates(aggregates: List[FeedbackAggregate], overwrite: bool) -> None:
+    if overwrite:
+        FeedbackAggregate.objects.bulk_create(
+            aggregates,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["round_item"],
+            update_fields=AGGREGATE_FIELDS,
+        )
     else:
-        vals = [r.either_or_value for r in qs if r.either_or_value in ("A", "B")]
-        n = len(vals)
-        dist = Counter(vals)
-        dist_json = {"A": int(dist.get("A", 0)), "B": int(dist.get("B", 0))}
-        mean = None
-        # Map consensus to % on majority option
-        maj = max(dist_json.values()) if n else 0
-        pct_agree = (maj / n) if n else None
-        pct_disagree = None
-        consensus = bool(n) and (pct_agree >= 0.75)
-
-    stat, created = FeedbackStat.objects.get_or_create(round_item=round_item)
-    if overwrite or created:
-        stat.n = n
-        stat.mean = mean
-        stat.pct_agree = pct_agree
-        stat.pct_disagree = pct_disagree
-        stat.consensus = consensus
-        stat.distribution_json = dist_json
-        stat.computed_at = timezone.now()
-        stat.save()
-    return stat
+        FeedbackAggregate.objects.bulk_create(aggregates, batch_size=500, ignore_conflicts=True)
+
+
+def build_aggregates(round_items: Iterable[RoundItem], responses) -> List[FeedbackAggregate]:
+    """
+    Build (unsaved) FeedbackAggregate rows for round items (with `item` loaded).
+
+    `responses` is a Response queryset covering those round items; it is read with
+    a single grouped query and every item's stats are computed in memory.
+    """
+    grouped = _grouped_value_counts(responses)
+    return [
+        FeedbackAggregate(round_item_id=ri.id, **item_stats(ri.item, grouped.get(ri.id, {})))
+        for ri in round_items
+    ]
+
+
+def round_aggregates(round_id: int) -> List[FeedbackAggregate]:
+    """Build (unsaved) FeedbackAggregate rows for every item in a round."""
+    round_items = RoundItem.objects.filter(round_id=round_id).select_related("item")
+    return build_aggregates(round_items, Response.objects.filter(round_item__round_id=round_id))
+
+
+def compute_feedback_for_round_item(round_item: RoundItem, overwrite: bool = True) -> FeedbackAggregate:
+    """Compute group feedback for one item in one round (latest response per panelist, enforced by unique constraint)."""
+    aggregates = build_aggregates([round_item], Response.objects.filter(round_item_id=round_item.id))
+    _write_aggregates(aggregates, overwrite)
+    return FeedbackAggregate.objects.get(round_item_id=round_item.id)
 
 
 def compute_feedback_for_round(round_id: int, overwrite: bool = True) -> int:
-    count = 0
-    for ri in RoundItem.objects.filter(round_id=round_id).select_related("item"):
-        compute_feedback_for_round_item(ri, overwrite=overwrite)
-        count += 1
-    return count
+    """Compute group feedback for every item in a round with one grouped query and one bulk upsert."""
+    aggregates = round_aggregates(round_id)
+    _write_aggregates(aggregates, overwrite)
+    return len(aggregates)
+
+
+def apply_response_delta(round_item: RoundItem, old_value: Optional[str], new_value: str) -> FeedbackAggregate:
+    """
+    Move one panelist's answer from `old_value` (None for a first answer) to `new_value`
+    in the item's aggregate, in O(1). Must run inside the transaction that writes the Response.
+
+    Likert items adjust the row's level counters; option and matrix items adjust
+    the stored distribution by parsing only the old and new value.
+    """
+    agg, created = FeedbackAggregate.objects.select_for_update().get_or_create(round_item_id=round_item.id)
+    if created:
+        # No counters yet: build this item from its responses
+        return compute_feedback_for_round_item(round_item)
+
+    item = round_item.item
+    if item.item_type == "likert5":
+        counts = agg.likert_counts()
+        old_level, new_level = likert_level(old_value), likert_level(new_value)
+        if old_level is not None:
+            counts[old_level] = max(counts[old_level] - 1, 0)
+        if new_level is not None:
+            counts[new_level] += 1
+        stats = likert_stats(counts)
+    else:
+        n = agg.n + (1 if old_value is None else 0)
+        stats = {"n": n}
+        if item.item_type in DISTRIBUTION_TYPES:
+            schema = item_schema(item)
+            old_tokens, old_texts = response_tokens(schema, old_value)
+            new_tokens, new_texts = response_tokens(schema, new_value)
+            add_tokens(agg.distribution, old_tokens, -1)
+            add_tokens(agg.distribution, new_tokens, 1)
+            remove_texts(agg.other_responses, old_texts)
+            agg.other_responses.extend(new_texts)
+            stats.update(distribution_stats(item.item_type, agg.distribution))
+
+    for field, value in stats.items():
+        setattr(agg, field, value)
+    agg.save()
+    return agg
+
+
+# save_response(expected_version=...) default: write whatever is stored
+UNCHECKED = object()
+
+# Attempts before giving up when other writes keep changing the same answer
+WRITE_ATTEMPTS = 5
+
+
+class StaleResponse(Exception):
+    """The stored answer changed since the version the client last saw."""
+
+    def __init__(self, current):
+        super().__init__("stale response")
+        self.current = current  # (value, comment, updated_at) or None
+
+
+class RoundLocked(Exception):
+    """The panelist has already submitted the round."""
+
+
+def upsert_response(
+    panelist_id: int, round_item: RoundItem, value: str, comment: Optional[str], base_version, now
+) -> Optional[Tuple[int, bool]]:
+    """
+    Write an answer with a single INSERT ... ON CONFLICT statement, valid on SQLite and PostgreSQL.
+
+    The row is written only if the panelist has not submitted the round and the
+    stored answer is still at `base_version` (its `updated_at`; None means no
+    answer may exist yet). Returns (response id, created), or None if nothing
+    was written.
+    """
+    q = connection.ops.quote_name
+    response, submission = q(Response._meta.db_table), q(RoundSubmission._meta.db_table)
+    adapt = connection.ops.adapt_datetimefield_value
+    params = [panelist_id, round_item.id, value, comment, adapt(now), adapt(now), panelist_id, round_item.round_id]
+    if base_version is None:
+        on_conflict = "DO NOTHING"
+    else:
+        on_conflict = (
+            "DO UPDATE SET value = excluded.value, comment = excluded.comment, updated_at = excluded.updated_at "
+            f"WHERE {response}.updated_at = %s"
+        )
+        params.append(adapt(base_version))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {response} (panelist_id, round_item_id, value, comment, created_at, updated_at) "
+            f"SELECT %s, %s, %s, %s, %s, %s "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {submission} WHERE panelist_id = %s AND round_id = %s) "
+            f"ON CONFLICT (panelist_id, round_item_id) {on_conflict} "
+            f"RETURNING id, created_at = updated_at",
+            params,
+        )
+        row = cursor.fetchone()
+    return (row[0], bool(row[1])) if row else None
+
+
+def save_response(
+    panelist_id: int,
+    round_item: RoundItem,
+    value: str,
+    comment: Optional[str] = None,
+    expected_version=UNCHECKED,
+) -> Response:
+    """
+    Create or revise a panelist's answer; its aggregate and round progress are updated in the same transaction.
+
+    The stored answer is read first and the write (see upsert_response) only
+    succeeds if it is unchanged, so the aggregate delta is always applied
+    against the value actually replaced; a concurrent change is retried. The
+    write is the transaction's first statement, so on SQLite it takes the
+    write lock directly instead of upgrading a read lock.
+
+    Raises RoundLocked if the round has been submitted. With `expected_version`
+    (the `updated_at` the client last saw, or None for "not answered yet"),
+    raises StaleResponse if the stored answer has changed since. StaleResponse
+    is also raised, with or without it, when other writes keep changing the
+    answer for WRITE_ATTEMPTS tries.
+    """
+    for _ in range(WRITE_ATTEMPTS):
+        current = (
+            Response.objects.filter(panelist_id=panelist_id, round_item=round_item)
+            .values_list("value", "comment", "updated_at")
+            .first()
+        )
+        base_version = current[2] if current else None
+        if expected_version is not UNCHECKED and base_version != expected_version:
+            raise StaleResponse(current)
+
+        now = timezone.now()
+        with transaction.atomic():
+            written = upsert_response(panelist_id, round_item, value, comment, base_version, now)
+            if written is not None:
+                response_id, created = written
+                write_choices([(response_id, panelist_id, round_item, value)], replace=not created)
+                apply_response_delta(round_item, current[0] if current else None, value)
+                record_answers(panelist_id, round_item.round_id, int(created))
+                return Response(
+                    id=response_id, panelist_id=panelist_id, round_item=round_item, value=value, comment=comment,
+                    updated_at=now,
+                )
+
+        if RoundSubmission.objects.filter(panelist_id=panelist_id, round_id=round_item.round_id).exists():
+            raise RoundLocked(round_item.round_id)
+        # Otherwise another write changed the answer since it was read: read it again
+
+    raise StaleResponse(current)
+
+
+def save_round_responses(
+    panelist_id: int, round_id: int, answers: Dict[RoundItem, Tuple[str, Optional[str]]], submit: bool = False
+) -> dict:
+    """
+    Save many answers in one round at once: {round item: (value, comment)}.
+
+    Responses (and their choice rows) are written with bulk statements, the touched items' aggregates
+    are rebuilt with one grouped query and one upsert, and the panelist's
+    progress is updated, all in one transaction. With `submit`, the round is
+    locked in the same transaction if every item is now answered. Raises
+    RoundLocked if the round was already submitted.
+    """
+    with transaction.atomic():
+        if RoundSubmission.objects.filter(panelist_id=panelist_id, round_id=round_id).exists():
+            raise RoundLocked(round_id)
+
+        ids = [ri.id for ri in answers]
+        if ids:
+            answered_before = set(
+                Response.objects.select_for_update()
+                .filter(panelist_id=panelist_id, round_item_id__in=ids)
+                .values_list("round_item_id", flat=True)
+            )
+            # On conflict the upsert still returns the existing row's id
+            written = Response.objects.bulk_create(
+                [
+                    Response(panelist_id=panelist_id, round_item=ri, value=value, comment=comment)
+                    for ri, (value, comment) in answers.items()
+                ],
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=["panelist", "round_item"],
+                update_fields=["value", "comment", "updated_at"],
+            )
+            write_choices([(r.pk, panelist_id, r.round_item, r.value) for r in written])
+            _write_aggregates(
+                build_aggregates(list(answers), Response.objects.filter(round_item_id__in=ids)), overwrite=True
+            )
+            record_answers(panelist_id, round_id, len(set(ids) - answered_before))
+
+        progress = get_progress(panelist_id, round_id)
+        submitted = bool(submit and progress is not None and progress.is_complete)
+        if submitted:
+            RoundSubmission.objects.create(panelist_id=panelist_id, round_id=round_id)
+
+    return {
+        "saved": len(ids),
+        "answered": progress.answered_count if progress else 0,
+        "total": progress.total_items if progress else 0,
+        "submitted": submitted,
+    }
@@ -0,0 +1,98 @@
+"""
+Per-session snapshot of the logged-in panelist.
+
+Panelist pages only need a handful of fields (id, study, consent, active flag,
+name), so the first request after login stores them in the session as a
+frozen PanelistSnapshot and later requests read them from there instead of
+querying Panelist and Study.
+
+Each snapshot records a version read from the cache, made of a per-panelist and
+a per-study counter. Saving or deleting a Panelist or Study (signals) or a bulk
+update of a study's panelists bumps a counter (see delphi.versioning), and any
+snapshot with an older version is reloaded from the database on its next use.
+
+The snapshot decides who may use the site, so it is only trusted when the cache
+is shared by every worker: with the default per-process cache, deactivating a
+panelist in one worker would not reach the others. There the panelist is loaded
+on every request.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from . import versioning
+from .models import Panelist
+
+SESSION_KEY = "panelist_snapshot"
+
+
+@dataclass(frozen=True)
+class PanelistSnapshot:
+    id: int
+    study_id: int
+    study_name: str
+    email: str
+    name: str
+    is_active: bool
+    consent_given: bool
+
+
+def _panelist_key(panelist_id: int) -> str:
+    return f"delphi:panelist:{panelist_id}:version"
+
+
+def _study_key(study_id: int) -> str:
+    return f"delphi:study:{study_id}:panelists_version"
+
+
+def _version(panelist_id: int, study_id: int) -> list:
+    keys = [_panelist_key(panelist_id), _study_key(study_id)]
+    found = versioning.current_many(keys)
+    return [found[key] for key in keys]
+
+
+def _load(panelist_id: int) -> Optional[PanelistSnapshot]:
+    row = (
+        Panelist.objects.filter(id=panelist_id)
+        .values_list("id", "study_id", "study__name", "email", "name", "is_active", "consent_given")
+        .first()
+    )
+    return PanelistSnapshot(*row) if row else None
+
+
+def get_panelist(request) -> Optional[PanelistSnapshot]:
+    """The session's active panelist, from the session snapshot while it is current."""
+    panelist_id = request.session.get("panelist_id")
+    if not panelist_id:
+        return None
+
+    if not versioning.is_shared():
+        snapshot = _load(panelist_id)
+        return snapshot if snapshot is not None and snapshot.is_active else None
+
+    stored = request.session.get(SESSION_KEY)
+    if stored and stored["panelist"]["id"] == panelist_id:
+        snapshot = PanelistSnapshot(**stored["panelist"])
+        if stored["version"] == _version(panelist_id, snapshot.study_id):
+            return snapshot if snapshot.is_active else None
+
+    # Read the panelist's version before loading, so an edit made meanwhile is not recorded as seen
+    panelist_version = versioning.current(_panelist_key(panelist_id))
+    snapshot = _load(panelist_id)
+    if snapshot is None:
+        request.session.pop(SESSION_KEY, None)
+        return None
+    version = [panelist_version, versioning.current(_study_key(snapshot.study_id))]
+    request.session[SESSION_KEY] = {"panelist": asdict(snapshot), "version": version}
+    return snapshot if snapshot.is_active else None
+
+
+def invalidate_panelist(panelist_id: int) -> None:
+    """Make sessions reload this panelist on their next request."""
+    versioning.bump(_panelist_key(panelist_id))
+
+
+def invalidate_study_panelists(study_id: int) -> None:
+    """Make sessions of every panelist in the study reload, e.g. after a bulk update."""
+    versioning.bump(_study_key(study_id))
@@ -0,0 +1,52 @@
+"""
+Cache invalidation (navigation, sessions, item schemas and versions), round progress and
+response choice receivers, connected in DelphiConfig.ready().
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .choices import write_choices
+from .conditional import invalidate_study_items
+from .models import Item, Panelist, Response, RoundItem, Study
+from .navigation import invalidate_navigation
+from .progress import round_item_removed, round_items_added
+from .schema import invalidate_item
+from .sessions import invalidate_panelist, invalidate_study_panelists
+
+
+@receiver([post_save, post_delete], sender=RoundItem)
+def round_item_changed(sender, instance, **kwargs):
+    invalidate_navigation(instance.round_id)
+
+
+@receiver(post_save, sender=RoundItem)
+def round_item_created(sender, instance, created, **kwargs):
+    if created:
+        round_items_added(instance.round_id)
+
+
+@receiver(pre_delete, sender=RoundItem)
+def round_item_deleting(sender, instance, **kwargs):
+    round_item_removed(instance)
+
+
+@receiver([post_save, post_delete], sender=Item)
+def item_changed(sender, instance, **kwargs):
+    invalidate_item(instance.id)
+    invalidate_study_items(instance.study_id)
+
+
+@receiver([post_save, post_delete], sender=Panelist)
+def panelist_changed(sender, instance, **kwargs):
+    invalidate_panelist(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Study)
+def study_changed(sender, instance, **kwargs):
+    invalidate_study_panelists(instance.id)
+
+
+@receiver(post_save, sender=Response)
+def response_saved(sender, instance, created, **kwargs):
+    # save_response and save_round_responses write choices themselves; this covers Model.save()
+    write_choices([(instance.id, instance.panelist_id, instance.round_item, instance.value)], replace=not created)
@@ -0,0 +1,166 @@
+"""
+Cross-round response stability.
+
+Each panelist's answer in a round is paired with their answer to the same Item
+in the previous round (RoundItems sharing an item_id) using one set-based
+query. Per-item statistics are then computed with array operations:
+
+- change rate: share of paired panelists whose stored answer changed
+- likert items: mean shift and the Wilcoxon signed-rank test (normal
+  approximation, zero differences dropped, tie-corrected variance)
+- yes/no items: McNemar's test with continuity correction
+"""
+from __future__ import annotations
+
+import math
+from typing import List, Optional
+
+import numpy as np
+from django.db.models import OuterRef, Subquery
+
+from .models import Response, Round, RoundItem, StabilityStat
+
+# Delphi convention: answers are stable when no more than 15% of panelists change them
+STABILITY_THRESHOLD = 0.15
+
+SIGNIFICANCE = 0.05
+
+
+def _two_sided_p(z: float) -> float:
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def wilcoxon(idx: np.ndarray, diff: np.ndarray, n_items: int):
+    """Signed-rank z per item (NaN when untestable) for integer differences `diff` grouped by item `idx`."""
+    nonzero = diff != 0
+    idx, diff = idx[nonzero], diff[nonzero]
+    magnitude = np.abs(diff)
+    levels = int(magnitude.max()) + 1 if len(magnitude) else 1
+
+    # Differences take few distinct magnitudes, so average ranks come from per-item magnitude counts
+    counts = np.bincount(idx * levels + magnitude, minlength=n_items * levels).reshape(n_items, levels)
+    positive = np.bincount(
+        idx[diff > 0] * levels + magnitude[diff > 0], minlength=n_items * levels
+    ).reshape(n_items, levels)
+    below = np.cumsum(counts, axis=1) - counts
+    rank = below + (counts + 1) / 2
+
+    n_r = counts.sum(axis=1).astype(np.float64)
+    w_plus = (rank * positive).sum(axis=1)
+    mean = n_r * (n_r + 1) / 4
+    var = n_r * (n_r + 1) * (2 * n_r + 1) / 24 - (counts ** 3 - counts).sum(axis=1) / 48
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(var > 0, (w_plus - mean) / np.sqrt(var), np.nan)
+    return z
+
+
+def mcnemar(b: np.ndarray, c: np.ndarray):
+    """Continuity-corrected chi-square per item from discordant pair counts b (yes->no) and c (no->yes)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(b + c > 0, (np.abs(b - c) - 1).clip(min=0) ** 2 / (b + c), np.nan)
+
+
+def previous_round(rnd: Round) -> Optional[Round]:
+    return Round.objects.filter(study_id=rnd.study_id, number__lt=rnd.number).order_by("-number").first()
+
+
+def compute_stability(round_id: int, previous_round_id: Optional[int] = None) -> List[StabilityStat]:
+    """Compare a round with the previous one (or `previous_round_id`) and store per-item stability."""
+    rnd = Round.objects.get(id=round_id)
+    if previous_round_id is None:
+        prev = previous_round(rnd)
+        if prev is None:
+            return []
+        previous_round_id = prev.id
+
+    previous_ri = dict(RoundItem.objects.filter(round_id=previous_round_id).values_list("item_id", "id"))
+    shared = [
+        (ri_id, item_type, previous_ri[item_id])
+        for ri_id, item_id, item_type in RoundItem.objects.filter(round_id=round_id).values_list(
+            "id", "item_id", "item__item_type"
+        )
+        if item_id in previous_ri
+    ]
+    position = {ri_id: i for i, (ri_id, _, _) in enumerate(shared)}
+
+    earlier = Response.objects.filter(
+        panelist_id=OuterRef("panelist_id"),
+        round_item__round_id=previous_round_id,
+        round_item__item_id=OuterRef("round_item__item_id"),
+    ).values("value")[:1]
+    pairs = list(
+        Response.objects.filter(round_item__round_id=round_id)
+        .annotate(previous_value=Subquery(earlier))
+        .filter(previous_value__isnull=False)
+        .values_list("round_item_id", "value", "previous_value")
+    )
+
+    n_items = len(shared)
+    if pairs:
+        ri_col, new_col, old_col = zip(*pairs)
+        idx = np.array([position[ri_id] for ri_id in ri_col], dtype=np.intp)
+        new_values = np.array(new_col, dtype=object)
+        old_values = np.array(old_col, dtype=object)
+    else:
+        idx = np.empty(0, dtype=np.intp)
+        new_values = old_values = np.empty(0, dtype=object)
+
+    n_paired = np.bincount(idx, minlength=n_items)
+    n_changed = np.bincount(idx, weights=new_values != old_values, minlength=n_items).astype(int)
+
+    types = np.array([item_type for _, item_type, _ in shared], dtype=object)
+    item_type_of = types[idx] if len(idx) else np.empty(0, dtype=object)
+
+    # Likert: integer differences for the Wilcoxon test and mean shift
+    likert = (item_type_of == "likert5") & np.isin(new_values, list("12345")) & np.isin(old_values, list("12345"))
+    diff = new_values[likert].astype(int) - old_values[likert].astype(int)
+    likert_n = np.bincount(idx[likert], minlength=n_items)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_shift = np.bincount(idx[likert], weights=diff, minlength=n_items) / likert_n
+    z = wilcoxon(idx[likert], diff, n_items)
+
+    # Yes/no: discordant pairs for McNemar
+    yesno = item_type_of == "yesno"
+    b = np.bincount(idx[yesno & (old_values == "yes") & (new_values == "no")], minlength=n_items)
+    c = np.bincount(idx[yesno & (old_values == "no") & (new_values == "yes")], minlength=n_items)
+    chi2 = mcnemar(b, c)
+
+    stats = []
+    for i, (ri_id, item_type, prev_ri_id) in enumerate(shared):
+        stat = StabilityStat(
+            round_item_id=ri_id,
+            previous_round_item_id=prev_ri_id,
+            n_paired=int(n_paired[i]),
+            n_changed=int(n_changed[i]),
+            change_rate=float(n_changed[i] / n_paired[i]) if n_paired[i] else None,
+        )
+        if item_type == "likert5":
+            stat.test = "wilcoxon"
+            stat.mean_shift = None if np.isnan(mean_shift[i]) else float(mean_shift[i])
+            # No non-zero differences means no shift at all
+            stat.statistic = 0.0 if np.isnan(z[i]) else float(z[i])
+            stat.p_value = 1.0 if np.isnan(z[i]) else _two_sided_p(z[i])
+        elif item_type == "yesno":
+            stat.test = "mcnemar"
+            stat.statistic = 0.0 if np.isnan(chi2[i]) else float(chi2[i])
+            stat.p_value = 1.0 if np.isnan(chi2[i]) else _two_sided_p(math.sqrt(chi2[i]))
+        if not n_paired[i]:
+            stat.statistic = stat.p_value = None
+        stat.is_stable = stat.change_rate is not None and stat.change_rate <= STABILITY_THRESHOLD
+        stat.shift_significant = stat.p_value is not None and stat.p_value < SIGNIFICANCE
+        stats.append(stat)
+
+    StabilityStat.objects.filter(round_item__round_id=round_id).exclude(
+        round_item_id__in=[ri_id for ri_id, _, _ in shared]
+    ).delete()
+    StabilityStat.objects.bulk_create(
+        stats,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["round_item"],
+        update_fields=[
+            "previous_round_item", "n_paired", "n_changed", "change_rate", "mean_shift", "test",
+            "statistic", "p_value", "is_stable", "shift_significant", "computed_at",
+        ],
+    )
+    return stats
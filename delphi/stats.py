@@ -0,0 +1,123 @@
+"""
+Vectorized descriptive statistics for a round's likert items.
+
+A round's likert responses are loaded into one panelist x item int8 matrix
+(MISSING where a panelist has not answered) and every item's statistics are
+computed with array operations over that matrix.
+"""
+from __future__ import annotations
+
+import warnings
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .choices import likert_ratings
+from .models import FeedbackAggregate, RoundItem
+from .services import CONSENSUS_THRESHOLD, LIKERT_FIELDS, LIKERT_LEVELS
+
+MISSING = 0
+
+LEVELS = np.array(LIKERT_LEVELS)
+
+
+def likert_matrix(round_id: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns (panelist_ids, round_item_ids, matrix) for a round's likert items.
+
+    Columns follow RoundItem order; matrix[p, i] is panelist p's rating of item i,
+    or MISSING. Ratings come from ResponseChoice (delphi.choices). Costs two
+    queries regardless of round size.
+    """
+    round_item_ids = np.array(
+        RoundItem.objects.filter(round_id=round_id, item__item_type="likert5").values_list("id", flat=True),
+        dtype=np.int64,
+    )
+    rows = list(likert_ratings(round_id))
+    if not rows:
+        return np.empty(0, dtype=np.int64), round_item_ids, np.zeros((0, len(round_item_ids)), dtype=np.int8)
+
+    panelist_col, item_col, value_col = zip(*rows)
+    panelist_ids, p_idx = np.unique(np.array(panelist_col, dtype=np.int64), return_inverse=True)
+
+    order = np.argsort(round_item_ids)
+    i_idx = order[np.searchsorted(round_item_ids, np.array(item_col, dtype=np.int64), sorter=order)]
+
+    matrix = np.full((len(panelist_ids), len(round_item_ids)), MISSING, dtype=np.int8)
+    matrix[p_idx, i_idx] = np.array(value_col, dtype=np.int8)
+    return panelist_ids, round_item_ids, matrix
+
+
+def level_counts(matrix: np.ndarray) -> np.ndarray:
+    """(len(LEVELS), items) array of how many panelists gave each rating to each item."""
+    return np.stack([(matrix == k).sum(axis=0) for k in LIKERT_LEVELS])
+
+
+def describe(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """Per-item statistics (one array entry per column); NaN where an item has no ratings."""
+    counts = level_counts(matrix)
+    n = counts.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (LEVELS @ counts) / n
+        sum_sq = ((LEVELS[:, None] - mean[None, :]) ** 2 * counts).sum(axis=0)
+        std_dev = np.sqrt(sum_sq / (n - 1))
+        top_box = (counts[3] + counts[4]) / n
+        bottom_box = (counts[0] + counts[1]) / n
+    std_dev[n < 2] = np.nan
+
+    values = np.where(matrix == MISSING, np.nan, matrix.astype(np.float64))
+    with warnings.catch_warnings():
+        # Items nobody has rated yet produce an all-NaN column
+        warnings.simplefilter("ignore", RuntimeWarning)
+        q1, median, q3 = np.nanpercentile(values, [25, 50, 75], axis=0)
+
+    # argmax picks the first maximum, i.e. the lowest level on ties
+    mode = np.where(n > 0, LEVELS[counts.argmax(axis=0)], 0)
+    return {
+        "n": n,
+        "counts": counts,
+        "mean": mean,
+        "median": median,
+        "std_dev": std_dev,
+        "iqr": q3 - q1,
+        "mode": mode,
+        "top_box": top_box,
+        "bottom_box": bottom_box,
+    }
+
+
+def _value(x):
+    return None if np.isnan(x) else float(x)
+
+
+def compute_descriptive_stats(round_id: int) -> int:
+    """Compute likert statistics for a whole round from the matrix and write them in one bulk upsert."""
+    _, round_item_ids, matrix = likert_matrix(round_id)
+    stats = describe(matrix)
+
+    aggregates: List[FeedbackAggregate] = []
+    for i, ri_id in enumerate(round_item_ids.tolist()):
+        n = int(stats["n"][i])
+        top, bottom = _value(stats["top_box"][i]), _value(stats["bottom_box"][i])
+        aggregates.append(FeedbackAggregate(
+            round_item_id=ri_id,
+            n=n,
+            mean=_value(stats["mean"][i]),
+            median=_value(stats["median"][i]),
+            std_dev=_value(stats["std_dev"][i]),
+            iqr=_value(stats["iqr"][i]),
+            mode=int(stats["mode"][i]) or None,
+            pct_agree=top,
+            pct_disagree=bottom,
+            consensus_reached=bool(n) and (top >= CONSENSUS_THRESHOLD or bottom >= CONSENSUS_THRESHOLD),
+            **{f"count_{k}": int(stats["counts"][j][i]) for j, k in enumerate(LIKERT_LEVELS)},
+        ))
+
+    FeedbackAggregate.objects.bulk_create(
+        aggregates,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["round_item"],
+        update_fields=LIKERT_FIELDS,
+    )
+    return len(aggregates)
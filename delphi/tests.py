@@ -1,3 +1,1157 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import (
+    AgreementMetric, FeedbackAggregate, Item, Panelist, PriorResponse, Response, ResponseChoice, Round, RoundItem,
+    RoundProgress, RoundSubmission, StabilityStat, Study,
+)
+from . import feedback_cache
+from .choices import likert_means, option_counts
+from .live import changed_aggregates, publisher
+from .rounds import sync_round_items
+from .schema import item_schema
+from .services import (
+    RoundLocked, compute_feedback_for_round, save_response, save_round_responses, upsert_response,
+)
+from .stats import likert_matrix
+
+
+# The panelist snapshot is only trusted with a cache every worker shares
+SHARED_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(tempfile.gettempdir(), "delphi-test-cache"),
+    }
+}
+
+
+def later(seconds):
+    """Move the feedback cache's clock forward, as if `seconds` had passed."""
+    return mock.patch.object(feedback_cache.time, "time", return_value=time.time() + seconds)
+
+
+@override_settings(STORAGES={
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+})
+class DelphiTestCase(TestCase):
+    def setUp(self):
+        # Ids are reused between tests, so cached per-round data must not leak across them
+        cache.clear()
+        self.study = Study.objects.create(name="Study")
+        self.round = Round.objects.create(study=self.study, number=1)
+        self.panelists = [
+            Panelist.objects.create(study=self.study, email=f"p{i}@example.com", consent_given=True)
+            for i in range(4)
+        ]
+
+    def add_item(self, item_type="likert5", order=1, **fields):
+        item = Item.objects.create(study=self.study, prompt=f"Item {order}", item_type=item_type, **fields)
+        return RoundItem.objects.create(round=self.round, item=item, order=order)
+
+    def login(self, panelist):
+        session = self.client.session
+        session["panelist_id"] = panelist.id
+        session.save()
+
+    def answer(self, ri, values):
+        for panelist, value in zip(self.panelists, values):
+            Response.objects.create(panelist=panelist, round_item=ri, value=value)
+
+
+class ComputeFeedbackTests(DelphiTestCase):
+    def test_round_aggregates_in_constant_queries(self):
+        likert = self.add_item("likert5", 1)
+        choice = self.add_item("multiple", 2, option_a="Yes", option_b="Other (please specify)")
+        self.answer(likert, ["4", "5", "5", "2"])
+        self.answer(choice, ["A", "A", "A", "Other: something"])
+
+        with self.assertNumQueries(3):
+            self.assertEqual(compute_feedback_for_round(self.round.id), 2)
+
+        agg = FeedbackAggregate.objects.get(round_item=likert)
+        self.assertEqual(agg.n, 4)
+        self.assertAlmostEqual(agg.mean, 4.0)
+        self.assertAlmostEqual(agg.pct_agree, 0.75)
+        self.assertTrue(agg.consensus_reached)
+
+        agg = FeedbackAggregate.objects.get(round_item=choice)
+        self.assertAlmostEqual(agg.pct_agree, 0.75)
+
+    def test_upsert_assigns_each_column_once(self):
+        self.add_item()
+        with mock.patch.object(
+            FeedbackAggregate.objects, "bulk_create", wraps=FeedbackAggregate.objects.bulk_create
+        ) as bulk_create:
+            compute_feedback_for_round(self.round.id)
+        # PostgreSQL rejects an ON CONFLICT update that assigns a column twice
+        update_fields = bulk_create.call_args.kwargs["update_fields"]
+        self.assertEqual(len(update_fields), len(set(update_fields)))
+        self.assertIn("computed_at", update_fields)
+
+    def test_recompute_updates_existing_rows(self):
+        ri = self.add_item()
+        self.answer(ri, ["1", "1"])
+        compute_feedback_for_round(self.round.id)
+        Response.objects.filter(round_item=ri).update(value="5")
+        compute_feedback_for_round(self.round.id)
+        self.assertEqual(FeedbackAggregate.objects.count(), 1)
+        self.assertAlmostEqual(FeedbackAggregate.objects.get().mean, 5.0)
+
+
+class IncrementalFeedbackTests(DelphiTestCase):
+    def test_revision_moves_count_between_levels(self):
+        ri = self.add_item()
+        save_response(self.panelists[0].id, ri, "5")
+        save_response(self.panelists[1].id, ri, "4")
+        save_response(self.panelists[1].id, ri, "1")
+
+        agg = FeedbackAggregate.objects.get(round_item=ri)
+        self.assertEqual(agg.likert_counts(), {1: 1, 2: 0, 3: 0, 4: 0, 5: 1})
+        self.assertEqual(agg.n, 2)
+        self.assertAlmostEqual(agg.mean, 3.0)
+        self.assertAlmostEqual(agg.pct_agree, 0.5)
+        self.assertAlmostEqual(agg.pct_disagree, 0.5)
+
+    def test_rebuild_command_detects_and_repairs_drift(self):
+        ri = self.add_item()
+        save_response(self.panelists[0].id, ri, "5")
+        FeedbackAggregate.objects.filter(round_item=ri).update(count_5=7, n=7)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_feedback", round_id=self.round.id, check=True, stdout=StringIO())
+        call_command("rebuild_feedback", round_id=self.round.id, stdout=StringIO())
+        call_command("rebuild_feedback", round_id=self.round.id, check=True, stdout=StringIO())
+        self.assertEqual(FeedbackAggregate.objects.get(round_item=ri).count_5, 1)
+
+    def test_item_detail_post_updates_feedback(self):
+        ri = self.add_item()
+        self.login(self.panelists[0])
+        self.client.post(f"/item/{ri.id}/", {"value": "4"})
+        response = self.client.get(f"/item/{ri.id}/")
+
+        self.assertEqual(response.context["feedback"]["n"], 1)
+        self.assertContains(response, "Group Feedback")
+
+
+class DistributionTests(DelphiTestCase):
+    def test_checkbox_and_matrix_distributions(self):
+        checkbox = self.add_item("checkbox", 1, option_a="Amylase", option_b="Lipase", option_c="Other (please specify)")
+        matrix = self.add_item("matrix", 2, matrix_rows='["Age", "Sex"]', matrix_columns='["Yes", "No", "Major"]')
+        save_response(self.panelists[0].id, checkbox, "A,Other: CRP, procalcitonin")
+        save_response(self.panelists[1].id, checkbox, "A,B")
+        save_response(self.panelists[0].id, matrix, '{"Age": {"answer": "Yes", "classification": "Major"}}')
+        save_response(self.panelists[1].id, matrix, '{"Age": {"answer": "No", "classification": null}}')
+
+        agg = FeedbackAggregate.objects.get(round_item=checkbox)
+        self.assertEqual(agg.distribution, {"A": 2, "B": 1, "C": 1})
+        self.assertEqual(agg.other_responses, ["CRP, procalcitonin"])
+        agg = FeedbackAggregate.objects.get(round_item=matrix)
+        self.assertEqual(agg.distribution, {"Age": {"Yes": 1, "Major": 1, "No": 1}})
+
+    def test_revision_matches_bulk_recompute(self):
+        ri = self.add_item("multiple", 1, option_a="Cotton", option_b="Atlanta", option_c="Other (please specify)")
+        save_response(self.panelists[0].id, ri, "A")
+        save_response(self.panelists[1].id, ri, "Other: local criteria")
+        save_response(self.panelists[1].id, ri, "B")
+        save_response(self.panelists[2].id, ri, "B")
+
+        incremental = FeedbackAggregate.objects.get(round_item=ri)
+        self.assertEqual(incremental.distribution, {"A": 1, "B": 2})
+        self.assertEqual(incremental.other_responses, [])
+        compute_feedback_for_round(self.round.id)
+        rebuilt = FeedbackAggregate.objects.get(round_item=ri)
+        self.assertEqual(rebuilt.distribution, incremental.distribution)
+        self.assertAlmostEqual(rebuilt.pct_agree, 2 / 3)
+
+    def test_item_detail_renders_option_feedback(self):
+        ri = self.add_item("multiple", 1, option_a="Cotton", option_b="Atlanta")
+        self.login(self.panelists[0])
+        self.client.post(f"/item/{ri.id}/", {"value": "B"})
+        response = self.client.get(f"/item/{ri.id}/")
+        self.assertEqual(response.context["feedback"]["rows"][1], {"label": "Atlanta", "count": 1, "percent": 100})
+
+
+class DescriptiveStatsTests(DelphiTestCase):
+    def test_numpy_pass_matches_incremental_counters(self):
+        from .stats import compute_descriptive_stats
+
+        first, second, empty = self.add_item(order=1), self.add_item(order=2), self.add_item(order=3)
+        for ri, values in ((first, ["1", "2", "4", "4"]), (second, ["5", "3", "3"])):
+            for panelist, value in zip(self.panelists, values):
+                save_response(panelist.id, ri, value)
+        incremental = {a.round_item_id: a for a in FeedbackAggregate.objects.all()}
+
+        self.assertEqual(compute_descriptive_stats(self.round.id), 3)
+        for ri in (first, second):
+            want, got = incremental[ri.id], FeedbackAggregate.objects.get(round_item=ri)
+            for field in ("n", "mean", "median", "std_dev", "iqr", "mode", "pct_agree", "pct_disagree"):
+                self.assertAlmostEqual(getattr(got, field), getattr(want, field), msg=field)
+
+        agg = FeedbackAggregate.objects.get(round_item=first)
+        self.assertEqual((agg.median, agg.iqr, agg.mode), (3.0, 2.25, 4))
+        agg = FeedbackAggregate.objects.get(round_item=empty)
+        self.assertEqual((agg.n, agg.median, agg.mode), (0, None, None))
+
+
+class AgreementTests(DelphiTestCase):
+    def test_metrics_stored_per_round_and_domain(self):
+        from .agreement import compute_agreement_for_round
+
+        ratings = [["5", "4", "1"], ["5", "4", "2"], ["4", "5", "1"], ["5", "4", "1"]]
+        ris = [self.add_item(order=i, domain="Risk" if i < 2 else "Design") for i in range(3)]
+        for panelist, row in zip(self.panelists, ratings):
+            for ri, value in zip(ris, row):
+                Response.objects.create(panelist=panelist, round_item=ri, value=value)
+
+        metrics = {m.domain: m for m in compute_agreement_for_round(self.round.id)}
+        self.assertEqual(set(metrics), {"", "Design", "Risk"})
+        overall = AgreementMetric.objects.get(round=self.round, domain="")
+        self.assertEqual((overall.n_items, overall.n_panelists, overall.n_complete), (3, 4, 4))
+        self.assertGreater(overall.krippendorff_alpha, 0.5)
+        self.assertGreater(overall.kendall_w, 0.5)
+        self.assertIsNone(metrics["Design"].kendall_w)
+
+
+class StabilityTests(DelphiTestCase):
+    def test_pairs_answers_across_rounds_by_item(self):
+        from .stability import compute_stability
+
+        likert = self.add_item("likert5", 1)
+        yesno = self.add_item("yesno", 2)
+        round2 = Round.objects.create(study=self.study, number=2)
+        likert2 = RoundItem.objects.create(round=round2, item=likert.item, order=1)
+        yesno2 = RoundItem.objects.create(round=round2, item=yesno.item, order=2)
+
+        self.answer(likert, ["2", "3", "4", "5"])
+        self.answer(yesno, ["yes", "yes", "no", "no"])
+        for panelist, l2, y2 in zip(self.panelists, ["3", "3", "5", "5"], ["no", "yes", "no", "no"]):
+            Response.objects.create(panelist=panelist, round_item=likert2, value=l2)
+            Response.objects.create(panelist=panelist, round_item=yesno2, value=y2)
+
+        stats = {s.round_item_id: s for s in compute_stability(round2.id)}
+        s = stats[likert2.id]
+        self.assertEqual((s.previous_round_item_id, s.n_paired, s.n_changed), (likert.id, 4, 2))
+        self.assertAlmostEqual(s.mean_shift, 0.5)
+        self.assertEqual(s.test, "wilcoxon")
+        self.assertFalse(s.is_stable)
+        s = stats[yesno2.id]
+        self.assertEqual((s.test, s.n_changed, s.statistic), ("mcnemar", 1, 0.0))
+        self.assertFalse(s.shift_significant)
+        self.assertEqual(StabilityStat.objects.count(), 2)
+
+
+class ExportTests(DelphiTestCase):
+    def test_streams_jsonl_gzip(self):
+        import gzip
+        import json
+        import tempfile
+        from pathlib import Path
+
+        ri = self.add_item()
+        self.answer(ri, ["4", "5"])
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "responses.jsonl.gz"
+            call_command("export_responses", study_id=self.study.id, out=str(out), stdout=StringIO())
+            with gzip.open(out, "rt", encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f]
+
+        self.assertEqual([r["value"] for r in rows], ["4", "5"])
+        self.assertEqual(rows[0]["round_number"], 1)
+        self.assertEqual(rows[0]["panelist_email"], "p0@example.com")
+
+    def test_wide_layout_pivots_per_panelist(self):
+        import csv
+        import json
+        import tempfile
+        from pathlib import Path
+
+        import numpy as np
+
+        likert = self.add_item("likert5", 1)
+        boxes = self.add_item("checkbox", 2, option_a="Red", option_b="Blue", option_c="Other")
+        grid = self.add_item(
+            "matrix", 3, matrix_rows=json.dumps(["Speed"]),
+            matrix_columns=json.dumps(["Yes", "No", "Core", "Optional"]),
+        )
+        self.answer(likert, ["4", "", "2"])
+        self.answer(boxes, ["A,Other: x, y"])
+        self.answer(grid, ["", json.dumps({"Speed": {"answer": "Yes", "classification": "Optional"}})])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out, npz = Path(tmp) / "wide.csv", Path(tmp) / "likert.npz"
+            call_command(
+                "export_responses", study_id=self.study.id, out=str(out), layout="wide", npz=str(npz),
+                stdout=StringIO(),
+            )
+            with out.open(newline="") as f:
+                header, *rows = list(csv.reader(f))
+            with np.load(npz) as data:
+                matrix, panelist_ids, columns = data["likert"], data["panelist_ids"], data["columns"]
+
+        self.assertEqual(header, [
+            "panelist_id", "panelist_email", "r1_q1", "r1_q2_A", "r1_q2_B", "r1_q2_C", "r1_q2_other_text",
+            "r1_q3_r1_answer", "r1_q3_r1_core", "r1_q3_r1_optional",
+        ])
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0][2:7], ["4", "1", "0", "1", "x, y"])
+        self.assertEqual(rows[1][7:], ["Yes", "0", "1"])
+        self.assertEqual(rows[2][3:], [""] * 7)
+        self.assertEqual(matrix.tolist(), [[4], [0], [2]])
+        self.assertEqual(panelist_ids.tolist(), [p.id for p in self.panelists[:3]])
+        self.assertEqual(columns.tolist(), ["r1_q1"])
+
+    def test_wide_layout_rejects_jsonl(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                "export_responses", study_id=self.study.id, out="wide.jsonl", layout="wide", stdout=StringIO(),
+            )
+
+
+class ImportItemsTests(DelphiTestCase):
+    HEADER = "stable_code,version,stem_text,response_type,domain_tag,option_a,option_b,matrix_rows,matrix_columns,order_index\n"
+
+    def write_csv(self, tmp, body):
+        from pathlib import Path
+
+        path = Path(tmp) / "items.csv"
+        path.write_text(self.HEADER + body, encoding="utf-8")
+        return str(path)
+
+    def test_bulk_import_is_idempotent(self):
+        import tempfile
+
+        rows = (
+            "Q1,1,Access matters,LIKERT_5,Access,,,,,1\n"
+            "Q2,1,Pick one,EITHER_OR,,Yes,No,,,2\n"
+            "Q3,1,Grid,matrix,,,,Speed|Cost,Core|Optional,3\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.write_csv(tmp, rows)
+            with self.assertNumQueries(9):
+                call_command("import_items", study_id=self.study.id, csv=path, round_id=self.round.id, stdout=StringIO())
+
+            out = StringIO()
+            with self.assertNumQueries(4):
+                call_command("import_items", study_id=self.study.id, csv=path, round_id=self.round.id, stdout=out)
+            self.assertIn("created=0, updated=0, unchanged=3", out.getvalue())
+
+            path = self.write_csv(tmp, rows.replace("Access matters", "Access matters a lot"))
+            out = StringIO()
+            call_command("import_items", study_id=self.study.id, csv=path, stdout=out)
+            self.assertIn("created=0, updated=1, unchanged=2", out.getvalue())
+
+        self.assertEqual(Item.objects.filter(study=self.study).count(), 3)
+        q1 = Item.objects.get(stable_code="Q1")
+        self.assertEqual((q1.prompt, q1.item_type, q1.domain), ("Access matters a lot", "likert5", "Access"))
+        self.assertEqual(q1.content_hash, q1.compute_content_hash())
+        self.assertEqual(Item.objects.get(stable_code="Q2").item_type, "multiple")
+        self.assertEqual(Item.objects.get(stable_code="Q3").get_matrix_columns(), ["Core", "Optional"])
+        self.assertEqual(
+            list(RoundItem.objects.filter(round=self.round).values_list("item__stable_code", "order")),
+            [("Q1", 1), ("Q2", 2), ("Q3", 3)],
+        )
+
+    def test_validates_every_row_before_writing(self):
+        import tempfile
+
+        rows = "Q1,1,Fine,likert5,,,,,,1\n,1,No code,likert5,,,,,,2\nQ3,1,Bad,dropdown,,,,,,3\nQ1,1,Again,likert5,,,,,,4\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaisesMessage(CommandError, "3 invalid row(s)") as ctx:
+                call_command("import_items", study_id=self.study.id, csv=self.write_csv(tmp, rows), stdout=StringIO())
+        self.assertIn("line 3: stable_code is required", str(ctx.exception))
+        self.assertIn("line 5: duplicate of line 2", str(ctx.exception))
+        self.assertFalse(Item.objects.exists())
+
+
+class ImportPanelistsTests(DelphiTestCase):
+    def test_bulk_upsert_by_normalized_email(self):
+        import tempfile
+        from pathlib import Path
+
+        existing = self.panelists[0]
+        token = existing.token
+        Panelist.objects.filter(pk=self.panelists[1].pk).update(token=None)
+        # Stored before emails were normalized
+        Panelist.objects.filter(pk=self.panelists[2].pk).update(email="P2@Example.com")
+        body = (
+            "email,display_name,affiliation\n"
+            " P0@Example.com ,Ada,Uni A\n"
+            "p1@example.com,,\n"
+            "p2@example.com,Bo,\n"
+            "new@example.com,New Person,Uni B\n"
+            "not-an-email,,\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "panelists.csv"
+            path.write_text(body, encoding="utf-8")
+            out, err = StringIO(), StringIO()
+            # Study lookup, savepoint pair, then one SELECT and one upsert per chunk of 3
+            with self.assertNumQueries(7):
+                call_command(
+                    "import_panelists", study_id=self.study.id, csv=str(path), chunk_size=3, stdout=out, stderr=err,
+                )
+
+        self.assertIn("created=1, updated=3, unchanged=0, skipped=1", out.getvalue())
+        self.assertIn("line 6: invalid email", err.getvalue())
+        existing.refresh_from_db()
+        self.assertEqual((existing.name, existing.institution, existing.token), ("Ada", "Uni A", token))
+        self.assertIsNotNone(Panelist.objects.get(pk=self.panelists[1].pk).token)
+        self.assertEqual(Panelist.objects.get(study=self.study, email__iexact="p2@example.com").name, "Bo")
+        new = Panelist.objects.get(study=self.study, email="new@example.com")
+        self.assertEqual(new.institution, "Uni B")
+        self.assertIsNotNone(new.token)
+        self.assertEqual(Panelist.objects.filter(study=self.study).count(), 5)
+
+
+class LoadQuestionsTests(DelphiTestCase):
+    def write_bank(self, tmp, questions):
+        import json
+        from pathlib import Path
+
+        path = Path(tmp) / "bank.json"
+        bank = {"study": {"name": self.study.name}, "round": {"number": 1}, "questions": questions}
+        path.write_text(json.dumps(bank), encoding="utf-8")
+        return str(path)
+
+    def test_diffs_against_existing_items(self):
+        import tempfile
+
+        legacy = self.add_item("likert5", 1)
+        questions = [
+            {"code": "B-01", "prompt": legacy.item.prompt, "item_type": "likert5", "domain": "Risk"},
+            {"code": "B-02", "prompt": "Grid", "item_type": "matrix", "matrix_rows": ["A"], "matrix_columns": ["X", "Y"]},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.write_bank(tmp, questions)
+            out = StringIO()
+            call_command("load_questions", file=path, dry_run=True, stdout=out)
+            self.assertIn("created=1, updated=1", out.getvalue())
+            self.assertFalse(Item.objects.filter(stable_code="B-02").exists())
+
+            call_command("load_questions", file=path, stdout=StringIO())
+            with self.assertNumQueries(6):
+                call_command("load_questions", file=path, stdout=StringIO())
+
+            questions.reverse()
+            call_command("load_questions", file=self.write_bank(tmp, questions), stdout=StringIO())
+
+        legacy.item.refresh_from_db()
+        self.assertEqual((legacy.item.stable_code, legacy.item.domain), ("B-01", "Risk"))
+        self.assertEqual(Item.objects.filter(study=self.study).count(), 2)
+        self.assertEqual(
+            list(RoundItem.objects.filter(round=self.round).values_list("id", "item__stable_code")),
+            [(RoundItem.objects.get(item__stable_code="B-02").id, "B-02"), (legacy.id, "B-01")],
+        )
+
+    def test_rejects_invalid_bank(self):
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.write_bank(tmp, [{"code": "B-01", "prompt": "", "item_type": "likert5"}])
+            with self.assertRaisesMessage(CommandError, "question 1: prompt is required"):
+                call_command("load_questions", file=path, stdout=StringIO())
+
+
+class SyncRoundItemsTests(DelphiTestCase):
+    def coded(self, code, version=1, order_index=0):
+        return Item.objects.create(
+            study=self.study, prompt=f"{code} v{version}", stable_code=code, version=version, order_index=order_index,
+        )
+
+    def test_set_based_sync_keeps_existing_round_items(self):
+        a1 = self.coded("A", 1, 1)
+        a2 = self.coded("A", 2, 1)
+        b1 = self.coded("B", 1, 2)
+        b2 = self.coded("B", 2, 2)
+        self.coded("C", 1, 3)
+        manual = self.add_item("likert5", 9)
+        ri_a = RoundItem.objects.create(round=self.round, item=a1, order=1)
+        ri_b = RoundItem.objects.create(round=self.round, item=b1, order=2)
+        self.answer(ri_b, ["3"])
+
+        out = StringIO()
+        call_command("sync_round_items", round_id=self.round.id, prune=True, stdout=out)
+        self.assertIn("added=1, upgraded=1, removed=1, kept_answered=1", out.getvalue())
+
+        ri_a.refresh_from_db()
+        self.assertEqual(ri_a.item_id, a2.id)
+        self.assertEqual(RoundItem.objects.get(id=ri_b.id).item_id, b1.id)
+        self.assertFalse(RoundItem.objects.filter(id=manual.id).exists())
+        self.assertEqual(
+            list(RoundItem.objects.filter(round=self.round).values_list("item__stable_code", "order")),
+            [("A", 1), ("B", 2), ("C", 10)],
+        )
+        self.assertFalse(RoundItem.objects.filter(item=b2).exists())
+
+        out = StringIO()
+        with self.assertNumQueries(3):
+            call_command("sync_round_items", round_id=self.round.id, stdout=out)
+        self.assertIn("added=0, upgraded=0, removed=0, kept_answered=1", out.getvalue())
+
+    def bank_round(self, size):
+        """A round of `size` answered coded items and `size` unanswered uncoded ones, in a study of its own."""
+        study = Study.objects.create(name=f"Bank {size}")
+        rnd = Round.objects.create(study=study, number=1)
+        for i in range(size):
+            coded = Item.objects.create(study=study, prompt=f"A{i}", stable_code=f"A{i}", order_index=i)
+            ri = RoundItem.objects.create(round=rnd, item=coded, order=i)
+            Response.objects.create(panelist=self.panelists[0], round_item=ri, value="3")
+            manual = Item.objects.create(study=study, prompt=f"M{i}")
+            RoundItem.objects.create(round=rnd, item=manual, order=size + i)
+        RoundProgress.objects.create(
+            panelist=self.panelists[0], round=rnd, answered_count=size, total_items=2 * size, last_activity=timezone.now()
+        )
+        return rnd
+
+    def test_prune_and_overwrite_in_constant_queries(self):
+        for size in (3, 30):
+            with self.subTest(size=size):
+                rnd = self.bank_round(size)
+                with self.assertNumQueries(11):
+                    diff = sync_round_items(rnd, prune=True)
+                self.assertEqual(len(diff["removed"]), size)
+                progress = RoundProgress.objects.get(round=rnd)
+                self.assertEqual((progress.answered_count, progress.total_items), (size, size))
+
+                with self.assertNumQueries(12):
+                    diff = sync_round_items(rnd, overwrite=True)
+                self.assertEqual(len(diff["added"]), size)
+                self.assertFalse(Response.objects.filter(round_item__round=rnd).exists())
+                progress.refresh_from_db()
+                self.assertEqual((progress.answered_count, progress.total_items), (0, size))
+
+    def test_dry_run_writes_nothing(self):
+        self.coded("A", 1, 1)
+        out = StringIO()
+        call_command("sync_round_items", "--round_id", str(self.round.id), "--dry-run", stdout=out)
+        self.assertIn("added=1", out.getvalue())
+        self.assertFalse(RoundItem.objects.filter(round=self.round).exists())
+
+
+class CarryForwardTests(DelphiTestCase):
+    def test_carries_non_consensus_items_and_previous_answers(self):
+        agreed = self.add_item("likert5", 1)
+        split = self.add_item("likert5", 2)
+        choice = self.add_item("multiple", 3, option_a="Yes", option_b="Other (please specify)")
+        self.answer(agreed, ["4", "4", "5", "5"])
+        self.answer(split, ["1", "5", "3"])
+        self.answer(choice, ["A", "Other: it depends"])
+
+        call_command("carry_forward_round", round_id=self.round.id, stdout=StringIO())
+
+        round2 = Round.objects.get(study=self.study, number=2)
+        self.assertFalse(round2.is_open)
+        carried = list(round2.round_items.values_list("item_id", "order"))
+        self.assertEqual(carried, [(split.item_id, 2), (choice.item_id, 3)])
+        self.assertEqual(PriorResponse.objects.filter(round_item__round=round2).count(), 5)
+
+        ri = round2.round_items.get(item_id=choice.item_id)
+        self.login(self.panelists[1])
+        response = self.client.get(f"/item/{ri.id}/")
+        self.assertContains(response, "Your answer in Round 1")
+        self.assertContains(response, "Other: it depends")
+
+        with self.assertRaisesMessage(CommandError, "Round 2 already exists"):
+            call_command("carry_forward_round", round_id=self.round.id, stdout=StringIO())
+
+    def test_unreadable_prior_matrix_answer_is_shown_as_stored(self):
+        grid = self.add_item("matrix", 1, matrix_rows='["Age"]', matrix_columns='["Major"]')
+        PriorResponse.objects.create(
+            panelist=self.panelists[0], round_item=grid, previous_round_item=grid, value='["Age"]',
+            answered_at=timezone.now(),
+        )
+        self.login(self.panelists[0])
+        self.assertContains(self.client.get(f"/item/{grid.id}/"), "[&quot;Age&quot;]")
+
+
+class NavigationTests(DelphiTestCase):
+    def test_index_is_cached_and_invalidated(self):
+        from .navigation import get_navigation
+
+        first = self.add_item("likert5", 1)
+        third = self.add_item("likert5", 3)
+        nav = get_navigation(self.round.id)
+        self.assertEqual(nav.ids, (first.id, third.id))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_navigation(self.round.id).next_id(first.id), third.id)
+
+        second = self.add_item("likert5", 2)
+        nav = get_navigation(self.round.id)
+        self.assertEqual((nav.previous_id(second.id), nav.next_id(second.id)), (first.id, third.id))
+        self.assertEqual(nav.progress_percent(third.id), 100)
+
+        coded = Item.objects.create(study=self.study, prompt="Coded", stable_code="Q9")
+        call_command("sync_round_items", round_id=self.round.id, stdout=StringIO())  # bulk_create, no signals
+        self.assertEqual(get_navigation(self.round.id).ids[-1], RoundItem.objects.get(item=coded).id)
+
+        third.delete()
+        self.assertNotIn(third.id, get_navigation(self.round.id).ids)
+
+    def test_per_process_cache_versions_expire(self):
+        from . import versioning
+        from .navigation import navigation_version
+
+        version = navigation_version(self.round.id)
+        self.assertEqual(navigation_version(self.round.id), version)
+        with mock.patch.object(time, "time", return_value=time.time() + versioning.LOCAL_TIMEOUT + 1):
+            self.assertNotEqual(navigation_version(self.round.id), version)
+
+    def test_item_page_uses_cached_navigation(self):
+        first = self.add_item("likert5", 1)
+        second = self.add_item("likert5", 2)
+        self.login(self.panelists[0])
+        self.client.get(f"/item/{first.id}/")
+
+        response = self.client.post(f"/item/{first.id}/", {"value": "4"})
+        self.assertRedirects(response, f"/item/{second.id}/", fetch_redirect_response=False)
+        response = self.client.get(f"/item/{second.id}/")
+        self.assertContains(response, f'href="/item/{first.id}/"')
+        self.assertContains(response, "of 2")
+
+
+@override_settings(CACHES=SHARED_CACHE)
+class PanelistSnapshotTests(DelphiTestCase):
+    def panelist_queries(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        return response, [q["sql"] for q in ctx.captured_queries if 'FROM "delphi_panelist"' in q["sql"]]
+
+    def test_session_snapshot_replaces_panelist_lookup(self):
+        panelist = self.panelists[0]
+        self.login(panelist)
+        response, queries = self.panelist_queries("/dashboard/")
+        self.assertContains(response, self.study.name)
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self.panelist_queries("/dashboard/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+        panelist.is_active = False
+        panelist.save()
+        response, queries = self.panelist_queries("/dashboard/")
+        self.assertRedirects(response, "/", fetch_redirect_response=False)
+        self.assertEqual(len(queries), 1)
+
+    def test_deleted_panelist_is_logged_out(self):
+        self.login(self.panelists[0])
+        self.client.get("/dashboard/")
+        self.panelists[0].delete()
+        self.assertRedirects(self.client.get("/dashboard/"), "/", fetch_redirect_response=False)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_per_process_cache_loads_the_panelist_every_time(self):
+        self.login(self.panelists[0])
+        self.client.get("/dashboard/")
+        # Deactivated elsewhere (another worker's cache would not see a bump)
+        Panelist.objects.filter(id=self.panelists[0].id).update(is_active=False)
+        response, queries = self.panelist_queries("/dashboard/")
+        self.assertRedirects(response, "/", fetch_redirect_response=False)
+        self.assertEqual(len(queries), 1)
+
+    def test_consent_and_bulk_import_refresh_snapshot(self):
+        import tempfile
+        from pathlib import Path
+
+        panelist = self.panelists[0]
+        Panelist.objects.filter(id=panelist.id).update(consent_given=False)
+        self.login(panelist)
+        self.assertRedirects(self.client.get("/dashboard/"), "/consent/", fetch_redirect_response=False)
+
+        self.client.post("/consent/", {"action": "agree", "consent1": "1", "consent2": "1", "consent3": "1"})
+        self.assertEqual(self.client.get("/dashboard/").status_code, 200)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "panelists.csv"
+            path.write_text("email,name\np0@example.com,Renamed\n", encoding="utf-8")
+            call_command("import_panelists", study_id=self.study.id, csv=str(path), stdout=StringIO())
+        self.assertContains(self.client.get("/dashboard/"), "Renamed")
+
+
+@override_settings(CACHES=SHARED_CACHE)
+class PageQueryBudgetTests(DelphiTestCase):
+    def test_dashboard_and_overview_in_constant_queries(self):
+        panelist = self.panelists[0]
+        self.login(panelist)
+        rounds = [self.round] + [Round.objects.create(study=self.study, number=n) for n in (2, 3)]
+        ris = [self.add_item("likert5", 1)]
+        self.client.get("/dashboard/")  # stores the panelist snapshot in the session
+
+        # Session read plus one query per page, however many rounds or items there are
+        with self.assertNumQueries(2):
+            response = self.client.get("/dashboard/")
+        self.assertContains(response, "0 of 1 answered")
+        # The overview also reads its ETag version first
+        with self.assertNumQueries(4):
+            self.client.get(f"/round/{self.round.id}/")
+
+        for n in range(2, 6):
+            ris.append(self.add_item("likert5", n))
+        save_response(panelist.id, ris[0], "4")
+        for rnd in rounds[1:]:
+            RoundItem.objects.create(round=rnd, item=ris[1].item, order=1)
+
+        with self.assertNumQueries(2):
+            response = self.client.get("/dashboard/")
+        self.assertContains(response, "1 of 5 answered")
+        self.assertContains(response, "0 of 1 answered", count=2)
+        with self.assertNumQueries(4):
+            response = self.client.get(f"/round/{self.round.id}/")
+        self.assertContains(response, "1 of 5 completed")
+
+
+class RoundProgressTests(DelphiTestCase):
+    def progress(self, panelist):
+        return RoundProgress.objects.get(panelist=panelist, round=self.round)
+
+    def test_counters_follow_answers_and_round_items(self):
+        first, second = self.add_item(order=1), self.add_item(order=2)
+        panelist = self.panelists[0]
+        save_response(panelist.id, first, "4")
+        save_response(panelist.id, first, "5")  # a revision is not a new answer
+        progress = self.progress(panelist)
+        self.assertEqual((progress.answered_count, progress.total_items), (1, 2))
+        self.assertIsNotNone(progress.last_activity)
+
+        save_response(panelist.id, second, "3")
+        self.assertTrue(self.progress(panelist).is_complete)
+
+        third = self.add_item(order=3)
+        self.assertEqual(self.progress(panelist).total_items, 3)
+        third.delete()
+        first.delete()
+        progress = self.progress(panelist)
+        self.assertEqual((progress.answered_count, progress.total_items), (1, 1))
+
+    def test_submit_checks_progress_row(self):
+        first, second = self.add_item(order=1), self.add_item(order=2)
+        panelist = self.panelists[0]
+        self.login(panelist)
+        save_response(panelist.id, first, "4")
+        self.client.post(f"/round/{self.round.id}/submit/")
+        self.assertFalse(RoundSubmission.objects.exists())
+
+        save_response(panelist.id, second, "4")
+        self.client.post(f"/round/{self.round.id}/submit/")
+        self.assertTrue(RoundSubmission.objects.filter(panelist=panelist, round=self.round).exists())
+
+    def test_reconcile_command_detects_and_repairs_drift(self):
+        ri = self.add_item()
+        save_response(self.panelists[0].id, ri, "4")
+        # Written without save_response, so this panelist has no progress row
+        Response.objects.create(panelist=self.panelists[1], round_item=ri, value="5")
+        RoundProgress.objects.filter(panelist=self.panelists[0]).update(answered_count=3, total_items=5)
+
+        with self.assertRaises(CommandError):
+            call_command("reconcile_progress", round_id=self.round.id, check=True, stdout=StringIO())
+        call_command("reconcile_progress", stdout=StringIO())
+        call_command("reconcile_progress", round_id=self.round.id, check=True, stdout=StringIO())
+        for panelist in self.panelists[:2]:
+            progress = self.progress(panelist)
+            self.assertEqual((progress.answered_count, progress.total_items), (1, 1))
+
+
+class RoundFormTests(DelphiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.likert = self.add_item("likert5", 1)
+        self.multiple = self.add_item("multiple", 2, option_a="Clinic", option_b="Other (specify)")
+        self.checkbox = self.add_item("checkbox", 3, option_a="Cost", option_b="Time", option_c="Other")
+        self.matrix = self.add_item(
+            "matrix", 4, matrix_rows='["Speed", "Cost"]',
+            matrix_columns='["Yes", "No", "Major", "Minor", "I don\'t know"]'
+        )
+        self.text = self.add_item("text", 5)
+        self.panelist = self.panelists[0]
+        self.login(self.panelist)
+
+    def url(self):
+        return f"/round/{self.round.id}/answers/"
+
+    def test_form_saves_every_item_type_and_submits(self):
+        page = self.client.get(self.url())
+        self.assertContains(page, "Item 5")
+        # "Yes" only as each row's answer, not among the classifications
+        self.assertContains(page, 'value="Yes"', count=2)
+        response = self.client.post(self.url(), {
+            f"ri-{self.likert.id}-value": "4",
+            f"ri-{self.likert.id}-comment": "Mostly",
+            f"ri-{self.multiple.id}-value": "B",
+            f"ri-{self.multiple.id}-other_text": "Pharmacy",
+            f"ri-{self.checkbox.id}-checkbox_value": ["A", "C"],
+            f"ri-{self.checkbox.id}-cb_other_text": "Staff",
+            f"ri-{self.matrix.id}-matrix_answer_1": "Yes",
+            f"ri-{self.matrix.id}-matrix_class_1": "Major",
+            f"ri-{self.matrix.id}-matrix_answer_2": "No",
+            f"ri-{self.text.id}-value": "Free text",
+            "action": "submit",
+        })
+        self.assertRedirects(response, f"/round/{self.round.id}/", fetch_redirect_response=False)
+
+        values = dict(Response.objects.filter(panelist=self.panelist).values_list("round_item_id", "value"))
+        self.assertEqual(values[self.likert.id], "4")
+        self.assertEqual(values[self.multiple.id], "Other: Pharmacy")
+        self.assertEqual(values[self.checkbox.id], "A,Other: Staff")
+        self.assertEqual(
+            json.loads(values[self.matrix.id]),
+            {"Speed": {"answer": "Yes", "classification": "Major"}, "Cost": {"answer": "No", "classification": None}},
+        )
+        self.assertEqual(values[self.text.id], "Free text")
+        self.assertEqual(FeedbackAggregate.objects.get(round_item=self.likert).count_4, 1)
+        self.assertTrue(RoundSubmission.objects.filter(panelist=self.panelist, round=self.round).exists())
+
+    def test_json_batch_is_all_or_nothing_and_respects_the_lock(self):
+        def post(payload):
+            return self.client.post(self.url(), json.dumps(payload), content_type="application/json")
+
+        response = post({"answers": {str(self.likert.id): {"value": "9"}, str(self.text.id): {"value": "Hi"}}})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(self.likert.id), response.json()["errors"])
+        self.assertFalse(Response.objects.exists())
+
+        for cell in ({"answer": "No", "classification": "Major"}, {"answer": "Yes", "classification": "Yes"}):
+            response = post({"answers": {str(self.matrix.id): {"value": json.dumps({"Speed": cell})}}})
+            self.assertEqual(response.status_code, 400)
+
+        answers = {str(self.likert.id): {"value": "5"}, str(self.text.id): {"value": "Hi"}}
+        response = post({"answers": answers, "submit": True})
+        self.assertEqual(response.json(), {"saved": 2, "answered": 2, "total": 5, "submitted": False})
+        self.assertEqual(RoundProgress.objects.get(panelist=self.panelist).answered_count, 2)
+
+        RoundSubmission.objects.create(panelist=self.panelist, round=self.round)
+        self.assertEqual(post({"answers": {str(self.likert.id): {"value": "1"}}}).status_code, 409)
+        self.assertEqual(Response.objects.get(round_item=self.likert).value, "5")
+
+
+class AutosaveTests(DelphiTestCase):
+    def test_versioned_autosave_rejects_stale_writes(self):
+        ri = self.add_item()
+        panelist = self.panelists[0]
+        self.login(panelist)
+        url = f"/item/{ri.id}/autosave/"
+
+        def post(payload):
+            return self.client.post(url, json.dumps(payload), content_type="application/json")
+
+        response = post({"value": "3", "version": None})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.templates, [])
+        first = response.json()["version"]
+
+        second = post({"value": "4", "version": first}).json()["version"]
+        self.assertNotEqual(first, second)
+
+        stale = post({"value": "1", "version": first})
+        self.assertEqual(stale.status_code, 409)
+        self.assertEqual(stale.json()["value"], "4")
+        self.assertEqual(post({"value": "2", "version": None}).status_code, 409)
+        self.assertEqual(post({"value": "7", "version": second}).status_code, 400)
+
+        self.assertEqual(Response.objects.get(panelist=panelist, round_item=ri).value, "4")
+        self.assertEqual(FeedbackAggregate.objects.get(round_item=ri).likert_counts()[4], 1)
+        self.assertContains(self.client.get(f"/item/{ri.id}/"), f'data-version="{second}"')
+
+
+class ResponseWriteTests(DelphiTestCase):
+    def test_upsert_is_conditional_on_version_and_lock(self):
+        ri = self.add_item()
+        panelist = self.panelists[0]
+        saved = save_response(panelist.id, ri, "2")
+        self.assertEqual(Response.objects.get(id=saved.id).updated_at, saved.updated_at)
+
+        now = timezone.now()
+        # A write based on an older version, or a second "first answer", changes nothing
+        self.assertIsNone(upsert_response(panelist.id, ri, "5", None, now - timedelta(days=1), now))
+        self.assertIsNone(upsert_response(panelist.id, ri, "5", None, None, now))
+        self.assertEqual(upsert_response(panelist.id, ri, "5", None, saved.updated_at, now), (saved.id, False))
+
+        RoundSubmission.objects.create(panelist=panelist, round=self.round)
+        with self.assertRaises(RoundLocked):
+            save_response(panelist.id, ri, "1")
+        self.assertEqual(Response.objects.get(id=saved.id).value, "5")
+
+    def test_item_page_reports_a_write_that_keeps_losing(self):
+        ri = self.add_item()
+        self.login(self.panelists[0])
+        with mock.patch("delphi.services.upsert_response", return_value=None):
+            response = self.client.post(f"/item/{ri.id}/", {"value": "4"})
+        self.assertRedirects(response, f"/item/{ri.id}/", fetch_redirect_response=False)
+        self.assertContains(self.client.get(f"/item/{ri.id}/"), "Please try again.")
+
+
+class ResponseChoiceTests(DelphiTestCase):
+    def selections(self, ri):
+        return Counter(ResponseChoice.objects.filter(round_item=ri).values_list("row_key", "option_code"))
+
+    def test_choices_follow_every_write_path(self):
+        likert = self.add_item("likert5", 1)
+        checkbox = self.add_item("checkbox", 2, option_a="Red", option_b="Blue", option_c="Other (please specify)")
+        matrix = self.add_item("matrix", 3, matrix_rows=json.dumps(["R1", "R2"]), matrix_columns=json.dumps(["X", "Y"]))
+        self.answer(likert, ["4", "2"])
+        save_response(self.panelists[2].id, likert, "5")
+        saved = save_response(self.panelists[3].id, checkbox, "A,Other: teal")
+        save_response(self.panelists[3].id, checkbox, "A,B", expected_version=saved.updated_at)
+        cells = {"R1": {"answer": "Yes", "classification": "X"}, "R2": {"answer": "No", "classification": None}}
+        save_round_responses(self.panelists[0].id, self.round.id, {
+            checkbox: ("B", None), matrix: (json.dumps(cells), None),
+        })
+
+        self.assertEqual(self.selections(likert), {("", "4"): 1, ("", "2"): 1, ("", "5"): 1})
+        self.assertEqual(self.selections(checkbox), {("", "A"): 1, ("", "B"): 2})
+        self.assertEqual(self.selections(matrix), {("R1", "Yes"): 1, ("R1", "X"): 1, ("R2", "No"): 1})
+        self.assertEqual(sorted(likert_matrix(self.round.id)[2][:, 0].tolist()), [2, 4, 5])
+
+    def test_rebuild_choices_after_queryset_update(self):
+        likert = self.add_item("likert5", 1)
+        self.answer(likert, ["1", "1", "1"])
+        Response.objects.filter(round_item=likert).update(value="3")
+        self.assertEqual(self.selections(likert), {("", "1"): 3})
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_choices", round_id=self.round.id, check=True, stdout=StringIO())
+        call_command("rebuild_choices", round_id=self.round.id, stdout=StringIO())
+        self.assertEqual(self.selections(likert), {("", "3"): 3})
+        self.assertEqual(ResponseChoice.objects.filter(round_item=likert).count(), 3)
+        call_command("rebuild_choices", round_id=self.round.id, check=True, stdout=StringIO())
+
+    def test_option_counts_and_likert_means_are_grouped_in_sql(self):
+        likert = self.add_item("likert5", 1)
+        checkbox = self.add_item("checkbox", 2, option_a="A", option_b="B", option_c="Other (please specify)")
+        matrix = self.add_item("matrix", 3, matrix_rows='["R1", "R2"]', matrix_columns='["Yes", "No"]')
+        save_response(self.panelists[0].id, likert, "4")
+        save_response(self.panelists[1].id, likert, "5")
+        save_response(self.panelists[2].id, likert, "not a level")
+        save_response(self.panelists[0].id, checkbox, "A,Other: CRP")
+        save_response(self.panelists[1].id, checkbox, "A,B")
+        save_response(self.panelists[0].id, matrix, '{"R1": {"answer": "Yes"}, "R2": {"answer": "No"}}')
+        save_response(self.panelists[1].id, matrix, '{"R1": {"answer": "Yes"}}')
+
+        with self.assertNumQueries(1):
+            counts = option_counts(self.round.id)
+        self.assertEqual(counts[likert.id], {"4": 1, "5": 1})
+        self.assertEqual(counts[checkbox.id], FeedbackAggregate.objects.get(round_item=checkbox).distribution)
+        self.assertEqual(counts[matrix.id], {"R1": {"Yes": 2}, "R2": {"No": 1}})
+
+        with self.assertNumQueries(1):
+            means = likert_means(self.round.id)
+        self.assertEqual(means, {likert.id: (2, 4.5)})
+        call_command("rebuild_choices", round_id=self.round.id, check=True, stdout=StringIO())
+
+
+class ItemSchemaTests(DelphiTestCase):
+    def test_schema_is_compiled_once_per_item_version(self):
+        ri = self.add_item("multiple", 1, option_a="Red", option_b="Something else (other)")
+        item = Item.objects.get(id=ri.item_id)
+        schema = item_schema(item)
+        self.assertIs(item_schema(Item.objects.get(id=ri.item_id)), schema)
+        self.assertEqual((schema.options, schema.other_code), ((("A", "Red"), ("B", "Something else (other)")), "B"))
+        self.assertEqual(schema.selection("Other: teal"), (["B"], "teal"))
+
+        item.option_c = "Blue"
+        item.save()
+        updated = item_schema(Item.objects.get(id=ri.item_id))
+        self.assertIsNot(updated, schema)
+        self.assertEqual(updated.accepted, {"A", "B", "C"})
+
+    def test_item_page_prefills_other_answer_from_schema(self):
+        ri = self.add_item("multiple", 1, option_a="Red", option_b="Other (please specify)")
+        Response.objects.create(panelist=self.panelists[0], round_item=ri, value="Other: teal")
+        self.login(self.panelists[0])
+
+        page = self.client.get(f"/item/{ri.id}/")
+        self.assertContains(page, 'id="optionB" checked')
+        self.assertContains(page, "teal</textarea>")
+
+
+@override_settings(DELPHI_LIVE_FEEDBACK=True)
+class FeedbackStreamTests(DelphiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.round.show_feedback_immediately = True
+        self.round.save()
+        self.ri = self.add_item()
+        self.login(self.panelists[0])
+        self.async_client.cookies = self.client.cookies
+        poll_interval, publisher.poll_interval = publisher.poll_interval, 0.01
+        self.addCleanup(setattr, publisher, "poll_interval", poll_interval)
+
+    async def next_event(self, content):
+        while True:
+            chunk = (await asyncio.wait_for(anext(content), 2)).decode()
+            if chunk.startswith("id:"):
+                return json.loads(chunk.split("data: ", 1)[1])
+
+    async def test_saves_are_pushed_to_item_and_round_streams(self):
+        item_stream = await self.async_client.get(f"/item/{self.ri.id}/feedback/stream/")
+        round_stream = await self.async_client.get(f"/round/{self.round.id}/feedback/stream/")
+        self.assertEqual(item_stream["Content-Type"], "text/event-stream")
+        try:
+            await anext(item_stream.streaming_content)  # retry: line, which subscribes the stream
+            await anext(round_stream.streaming_content)
+            await sync_to_async(save_response)(self.panelists[1].id, self.ri, "4")
+
+            for response in (item_stream, round_stream):
+                event = await self.next_event(response.streaming_content)
+                self.assertEqual((event["round_item_id"], event["n"], event["mean"]), (self.ri.id, 1, 4.0))
+                self.assertIn("Group Feedback", event["html"])
+        finally:
+            await item_stream.streaming_content.aclose()
+            await round_stream.streaming_content.aclose()
+
+    async def test_reconnect_replays_changes_and_foreign_items_are_refused(self):
+        saved = await sync_to_async(save_response)(self.panelists[1].id, self.ri, "2")
+        since = (saved.updated_at - timedelta(seconds=1)).isoformat()
+        stream = await self.async_client.get(f"/item/{self.ri.id}/feedback/stream/", headers={"last-event-id": since})
+        try:
+            self.assertEqual((await self.next_event(stream.streaming_content))["mean"], 2.0)
+        finally:
+            await stream.streaming_content.aclose()
+
+        other = await Study.objects.acreate(name="Other")
+        other_round = await Round.objects.acreate(study=other, number=1)
+        response = await self.async_client.get(f"/round/{other_round.id}/feedback/stream/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_polls_render_only_new_versions_of_followed_items(self):
+        other = self.add_item("likert5", 2)
+        save_response(self.panelists[1].id, self.ri, "4")
+        save_response(self.panelists[1].id, other, "2")
+        since = timezone.now() - timedelta(minutes=1)
+
+        changed = changed_aggregates(since, {("item", self.ri.id)})
+        self.assertEqual([c[0] for c in changed], [self.ri.id])
+        self.assertEqual({c[0] for c in changed_aggregates(since, {("round", self.round.id)})}, {self.ri.id, other.id})
+        with mock.patch("delphi.live.feedback_payload") as render:
+            self.assertEqual(changed_aggregates(since, {("item", self.ri.id)}, {self.ri.id: changed[0][2]}), [])
+        render.assert_not_called()
+
+    def test_wsgi_requests_get_no_stream(self):
+        # The WSGI handler would buffer the endless stream, holding the worker
+        self.assertEqual(self.client.get(f"/item/{self.ri.id}/feedback/stream/").status_code, 204)
+        save_response(self.panelists[1].id, self.ri, "4")
+        response = self.client.get(f"/item/{self.ri.id}/")
+        self.assertContains(response, "Group Feedback")
+        self.assertNotContains(response, 'data-stream-url="')
+
+    async def test_disabled_live_feedback_gets_no_stream(self):
+        with self.settings(DELPHI_LIVE_FEEDBACK=False):
+            response = await self.async_client.get(f"/item/{self.ri.id}/feedback/stream/")
+        self.assertEqual(response.status_code, 204)
+
+
+@override_settings(CACHES=SHARED_CACHE)
+class ConditionalGetTests(DelphiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ri = self.add_item()
+        self.login(self.panelists[0])
+
+    def revalidate(self, url, etag, status):
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, status)
+        return response
+
+    def test_item_and_overview_answer_304_until_something_they_show_changes(self):
+        for url in (f"/item/{self.ri.id}/", f"/round/{self.round.id}/"):
+            self.client.get(url)  # sets the CSRF cookie, which is part of the version
+            first = self.client.get(url)
+            self.assertIn("private", first["Cache-Control"])
+            with self.assertNumQueries(2):  # session and version only
+                self.revalidate(url, first["ETag"], 304)
+
+        etags = {url: self.client.get(url)["ETag"] for url in (f"/item/{self.ri.id}/", f"/round/{self.round.id}/")}
+        save_response(self.panelists[0].id, self.ri, "3")
+        for url, etag in etags.items():
+            self.revalidate(url, etag, 200)
+
+        # Another panelist's answer changes the item's feedback once the cached feedback goes stale,
+        # and never this panelist's overview
+        etags = {url: self.client.get(url)["ETag"] for url in etags}
+        save_response(self.panelists[1].id, self.ri, "5")
+        self.revalidate(f"/item/{self.ri.id}/", etags[f"/item/{self.ri.id}/"], 304)
+        with later(seconds=6):
+            self.revalidate(f"/item/{self.ri.id}/", etags[f"/item/{self.ri.id}/"], 200)
+        self.revalidate(f"/round/{self.round.id}/", etags[f"/round/{self.round.id}/"], 304)
+
+        item = self.ri.item
+        item.prompt = "Reworded"
+        item.save()
+        response = self.revalidate(f"/round/{self.round.id}/", etags[f"/round/{self.round.id}/"], 200)
+        self.assertContains(response, "Reworded")
+
+    def test_pending_messages_skip_the_etag(self):
+        url = f"/item/{self.ri.id}/"
+        self.client.get(url)
+        etag = self.client.get(url)["ETag"]
+        self.client.post(url, {"value": "9"})  # rejected with an error message
+        response = self.revalidate(url, etag, 200)
+        self.assertFalse(response.has_header("ETag"))
+        self.assertContains(response, "Choose a rating from 1 to 5.")
+
+    @override_settings(DELPHI_FEEDBACK_MAX_AGE=0)
+    def test_feedback_json_revalidates(self):
+        self.round.show_feedback_immediately = True
+        self.round.save()
+        url = f"/item/{self.ri.id}/feedback/"
+        self.assertEqual(self.client.get(url).json(), {"round_item_id": self.ri.id, "n": 0})
+
+        save_response(self.panelists[1].id, self.ri, "4")
+        response = self.client.get(url)
+        self.assertEqual((response.json()["n"], response.json()["mean"]), (1, 4.0))
+        self.revalidate(url, response["ETag"], 304)
+
+
+class FeedbackCacheTests(DelphiTestCase):
+    def setUp(self):
+        super().setUp()
+        feedback_cache.reset_stats()
+        self.ri = self.add_item()
+        save_response(self.panelists[1].id, self.ri, "4")
+
+    def test_fresh_feedback_is_served_without_queries(self):
+        self.assertEqual(feedback_cache.cached_feedback(self.ri.id)["mean"], 4.0)
+        save_response(self.panelists[2].id, self.ri, "2")
+        with self.assertNumQueries(0):
+            self.assertEqual(feedback_cache.cached_feedback(self.ri.id)["mean"], 4.0)
+        # Counted in process until the next flush, not written to the cache on every view
+        self.assertIsNone(cache.get("delphi:feedback:stats:hits"))
+        self.assertEqual(feedback_cache.stats(), {"hits": 1, "stale": 0, "misses": 1, "refreshes": 0})
+        self.assertEqual(cache.get("delphi:feedback:stats:hits"), 1)
+
+    def test_stale_feedback_is_served_while_another_request_refreshes_it(self):
+        feedback_cache.cached_feedback(self.ri.id)
+        save_response(self.panelists[2].id, self.ri, "2")
+        with later(seconds=6):
+            cache.add(f"delphi:feedback:{self.ri.id}:lock", 1)
+            with self.assertNumQueries(0):
+                self.assertEqual(feedback_cache.cached_feedback(self.ri.id)["mean"], 4.0)
+            cache.delete(f"delphi:feedback:{self.ri.id}:lock")
+            self.assertEqual(feedback_cache.cached_feedback(self.ri.id)["mean"], 3.0)
+        self.assertEqual(feedback_cache.stats(), {"hits": 0, "stale": 1, "misses": 1, "refreshes": 1})
+
+        out = StringIO()
+        call_command("feedback_cache_stats", "--reset", stdout=out)
+        self.assertIn("hit ratio  33.3%", out.getvalue())
+        self.assertEqual(sum(feedback_cache.stats().values()), 0)
+
+    def test_live_publisher_warms_the_cache(self):
+        changed_aggregates(timezone.now() - timedelta(minutes=1), {("item", self.ri.id)})
+        with self.assertNumQueries(0):
+            self.assertEqual(feedback_cache.cached_feedback(self.ri.id)["n"], 1)
@@ -6,7 +6,12 @@ urlpatterns = [
     path("dashboard/", views.dashboard, name="dashboard"),
     path("round/<int:round_id>/", views.round_overview, name="round_overview"),
     path("round/<int:round_id>/submit/", views.submit_round, name="submit_round"),
+    path("round/<int:round_id>/answers/", views.round_form, name="round_form"),
+    path("round/<int:round_id>/feedback/stream/", views.feedback_stream, name="round_feedback_stream"),
     path("item/<int:round_item_id>/", views.item_detail, name="item_detail"),
+    path("item/<int:round_item_id>/autosave/", views.autosave_item, name="autosave_item"),
+    path("item/<int:round_item_id>/feedback/", views.item_feedback, name="item_feedback"),
+    path("item/<int:round_item_id>/feedback/stream/", views.feedback_stream, name="feedback_stream"),
     path("demo/", views.demo_login, name="demo_login"),
     path("consent/", views.consent, name="consent"),	
     
@@ -0,0 +1,66 @@
+"""
+Version counters kept in the cache, used to invalidate cached data without deleting it.
+
+Cached values are stored under keys that include a version read from a counter
+key; bumping the counter makes every older entry unreachable. Counters start
+from the current time in nanoseconds, so a counter that was evicted never
+restarts at a value that old entries still use.
+
+A counter is only seen by the processes that share its cache. With a
+per-process cache (LocMemCache, the default unless DJANGO_CACHE is set) a bump
+in one gunicorn worker is invisible to the others, so there counters expire
+after LOCAL_TIMEOUT and every process picks up changes within that time.
+"""
+from __future__ import annotations
+
+import time
+from typing import Dict, List
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+LOCAL_TIMEOUT = 30
+
+
+def is_shared() -> bool:
+    """Whether the default cache is shared by every worker process (file, database, memcached, redis)."""
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def _timeout():
+    return None if is_shared() else LOCAL_TIMEOUT
+
+
+def current(key: str) -> int:
+    return cache.get_or_set(key, time.time_ns, _timeout())
+
+
+def current_many(keys: List[str]) -> Dict[str, int]:
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, _timeout())
+        found.update(missing)
+    return found
+
+
+def _bump(key: str) -> None:
+    if cache.add(key, time.time_ns(), _timeout()):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, time.time_ns(), _timeout())
+
+
+def bump(key: str) -> None:
+    """
+    Bump a counter now and again when the surrounding transaction commits.
+
+    The second bump discards anything another request cached from pre-commit data.
+    """
+    _bump(key)
+    transaction.on_commit(lambda: _bump(key))
@@ -1,21 +1,63 @@
+import json
+
+from asgiref.sync import sync_to_async
 from django.contrib import messages
-from django.db.models import Avg
-from django.db.models.functions import Cast
-from django.db.models import FloatField
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.http import require_POST
-from django.http import HttpResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET, require_POST
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.models import User
 from django.utils import timezone
-
-from .models import MagicLink, Panelist, Response, Round, RoundItem, RoundSubmission, Study
+from django.utils.dateparse import parse_datetime
+
+from .answers import AnswerError, answer_data, parse_answer
+from .conditional import conditional_page, item_page_version, round_page_version
+from .feedback import feedback_allowed
+from .feedback_cache import cached_feedback
+from .live import changed_aggregates, event_stream, live_enabled
+from .models import (
+    MagicLink, Panelist, PriorResponse, Response, Round, RoundItem, RoundSubmission, Study,
+)
+from .navigation import get_navigation
+from .progress import get_progress, open_rounds, round_items_with_answers, with_progress, with_submission
+from .schema import item_schema
+from .sessions import get_panelist, invalidate_panelist
+from .services import RoundLocked, StaleResponse, save_response, save_round_responses
+
+LIKERT_LABELS = {
+    "1": "Definitely Disagree",
+    "2": "Disagree",
+    "3": "I don't know",
+    "4": "Agree",
+    "5": "Definitely Agree",
+}
 
 
 def _require_panelist(request):
-    panelist_id = request.session.get("panelist_id")
-    if not panelist_id:
-        return None
-    return Panelist.objects.filter(id=panelist_id, is_active=True).first()
+    """The logged-in, active panelist as a PanelistSnapshot (read from the session), or None."""
+    return get_panelist(request)
+
+
+def _answer_display(item, value):
+    """Human-readable form of a stored answer, e.g. for "your previous answer"."""
+    if item.item_type == "likert5":
+        return LIKERT_LABELS.get(value, value)
+    if item.item_type == "yesno":
+        return value.capitalize()
+    if item.item_type in ("multiple", "checkbox"):
+        schema = item_schema(item)
+        labels = dict(schema.options)
+        codes, other_text = schema.selection(value)
+        parts = [labels.get(code, code) for code in codes if code != schema.other_code]
+        return ", ".join(parts + ([f"Other: {other_text}"] if other_text else []))
+    if item.item_type == "matrix":
+        parts = []
+        for row, cell in item_schema(item).matrix_cells(value).items():
+            chosen = [str(v) for v in (cell.get("answer"), cell.get("classification")) if v]
+            if chosen:
+                parts.append(f"{row}: {' / '.join(chosen)}")
+        return "; ".join(parts) if parts or not value else value
+    return value
 
 
 def home(request):
@@ -55,17 +97,17 @@ def dashboard(request):
     if not panelist.consent_given:
         return redirect("consent")
 
-    study = panelist.study
-    open_rounds = study.rounds.filter(is_open=True).order_by("number")
-
-    rounds = []
-    for r in open_rounds:
-        rounds.append(
-            {
-                "round": r,
-                "is_submitted": RoundSubmission.objects.filter(panelist=panelist, round=r).exists(),
-            }
-        )
+    study = {"id": panelist.study_id, "name": panelist.study_name}
+    rounds = [
+        {
+            "round": r,
+            "is_submitted": r.submitted_at is not None,
+            "submitted_at": r.submitted_at,
+            "answered": r.answered,
+            "total": r.total,
+        }
+        for r in open_rounds(panelist.study_id, panelist.id)
+    ]
 
     return render(
         request,
@@ -93,9 +135,8 @@ def consent(request):
             consent3 = request.POST.get("consent3")
             
             if consent1 and consent2 and consent3:
-                panelist.consent_given = True
-                panelist.consent_timestamp = timezone.now()
-                panelist.save()
+                Panelist.objects.filter(id=panelist.id).update(consent_given=True, consent_timestamp=timezone.now())
+                invalidate_panelist(panelist.id)
                 messages.success(request, "Thank you for agreeing to participate. Welcome to the study!")
                 return redirect("dashboard")
             else:
@@ -112,6 +153,7 @@ def consent(request):
     })
 
 
+@conditional_page(round_page_version)
 def round_overview(request, round_id):
     panelist = _require_panelist(request)
     if not panelist:
@@ -121,20 +163,16 @@ def round_overview(request, round_id):
     if not panelist.consent_given:
         return redirect("consent")
 
-    round_obj = get_object_or_404(Round, id=round_id, study=panelist.study)
-    ris = list(round_obj.round_items.select_related("item").order_by('order'))
-
-    submitted = RoundSubmission.objects.filter(panelist=panelist, round=round_obj).first()
-
-    resp_map = {
-        r.round_item_id: r
-        for r in Response.objects.filter(panelist=panelist, round_item__round=round_obj)
-    }
+    round_obj = get_object_or_404(
+        with_progress(Round.objects.select_related("study"), panelist.id), id=round_id, study_id=panelist.study_id
+    )
+    ris = list(round_items_with_answers(round_obj.id, panelist.id))
+    submitted = {"submitted_at": round_obj.submitted_at} if round_obj.submitted_at else None
 
-    rows = [{"ri": ri, "response": resp_map.get(ri.id)} for ri in ris]
+    rows = [{"ri": ri, "response": ri.answered} for ri in ris]
 
-    total = len(ris)
-    answered = sum(1 for row in rows if row["response"] is not None)
+    total = round_obj.total
+    answered = round_obj.answered
     can_submit = (submitted is None) and (total > 0) and (answered == total)
 
     return render(
@@ -158,15 +196,18 @@ def submit_round(request, round_id):
     if not panelist:
         return redirect("home")
 
-    round_obj = get_object_or_404(Round, id=round_id, study=panelist.study)
+    round_obj = get_object_or_404(Round, id=round_id, study_id=panelist.study_id)
 
-    existing = RoundSubmission.objects.filter(panelist=panelist, round=round_obj).first()
+    existing = RoundSubmission.objects.filter(panelist_id=panelist.id, round=round_obj).first()
     if existing:
         messages.info(request, "This round is already submitted and locked.")
         return redirect("round_overview", round_id=round_obj.id)
 
-    total = round_obj.round_items.count()
-    answered = Response.objects.filter(panelist=panelist, round_item__round=round_obj).count()
+    progress = get_progress(panelist.id, round_obj.id)
+    if progress is not None:
+        total, answered = progress.total_items, progress.answered_count
+    else:
+        total, answered = round_obj.round_items.count(), 0
 
     if total == 0:
         messages.error(request, "This round has no items yet.")
@@ -179,11 +220,154 @@ def submit_round(request, round_id):
         )
         return redirect("round_overview", round_id=round_obj.id)
 
-    RoundSubmission.objects.create(panelist=panelist, round=round_obj)
+    RoundSubmission.objects.create(panelist_id=panelist.id, round=round_obj)
     messages.success(request, "Submitted. Your responses are now locked.")
     return redirect("round_overview", round_id=round_obj.id)
 
 
+def _form_row(ri, value, comment):
+    """Pre-filled state of one item on the whole-round form."""
+    schema = item_schema(ri.item)
+    row = {
+        "ri": ri,
+        "schema": schema,
+        "prefix": f"ri-{ri.id}-",
+        "value": value,
+        "comment": comment or "",
+        "selected": [],
+        "other_text": "",
+        "matrix": [],
+        "error": "",
+    }
+    if schema.item_type in ("multiple", "checkbox"):
+        row["selected"], row["other_text"] = schema.selection(value)
+    elif schema.item_type == "matrix":
+        cells = schema.matrix_cells(value)
+        for i, label in enumerate(schema.matrix_rows, start=1):
+            cell = cells.get(label, {})
+            row["matrix"].append({
+                "index": i,
+                "label": label,
+                "answer": cell.get("answer") or "",
+                "classification": cell.get("classification") or "",
+            })
+    return row
+
+
+def round_form(request, round_id):
+    """
+    All of a round's items on one page. A POST (form fields prefixed "ri-<id>-",
+    or a JSON body {"answers": {round_item_id: {...}}, "submit": bool}) saves
+    every answer in one transaction and can submit the round at the same time.
+    Nothing is saved if any answer is invalid.
+    """
+    panelist = _require_panelist(request)
+    if not panelist:
+        return redirect("home")
+    if not panelist.consent_given:
+        return redirect("consent")
+
+    round_obj = get_object_or_404(
+        with_submission(Round.objects.select_related("study"), panelist.id), id=round_id, study_id=panelist.study_id
+    )
+    ris = list(RoundItem.objects.filter(round=round_obj).select_related("item").order_by("order", "id"))
+    is_json = request.content_type == "application/json"
+
+    if request.method == "POST":
+        if round_obj.submitted_at:
+            if is_json:
+                return JsonResponse({"error": "This round has been submitted. Responses are locked."}, status=409)
+            messages.error(request, "This round has been submitted. Responses are locked.")
+            return redirect("round_overview", round_id=round_obj.id)
+
+        if is_json:
+            try:
+                body = json.loads(request.body)
+                posted = {int(key): value for key, value in body.get("answers", {}).items()}
+            except (ValueError, AttributeError, TypeError):
+                return JsonResponse({"error": "Send a JSON object with an \"answers\" mapping."}, status=400)
+            submit = bool(body.get("submit"))
+        else:
+            posted = None
+            submit = request.POST.get("action") == "submit"
+
+        by_id = {ri.id: ri for ri in ris}
+        answers, errors = {}, {}
+        if posted is not None:
+            for ri_id in posted.keys() - by_id.keys():
+                errors[ri_id] = "Not an item of this round."
+        for ri in ris:
+            if posted is not None:
+                if ri.id not in posted:
+                    continue
+                if not isinstance(posted[ri.id], dict):
+                    errors[ri.id] = "Send each answer as an object."
+                    continue
+                data, prefix = answer_data(posted[ri.id]), ""
+            else:
+                data, prefix = request.POST, f"ri-{ri.id}-"
+            try:
+                value, comment = parse_answer(ri.item, data, prefix)
+            except AnswerError as e:
+                errors[ri.id] = str(e)
+                continue
+            if value:
+                answers[ri] = (value, comment)
+
+        if not errors:
+            try:
+                result = save_round_responses(panelist.id, round_obj.id, answers, submit=submit)
+            except RoundLocked:
+                if is_json:
+                    return JsonResponse({"error": "This round has been submitted. Responses are locked."}, status=409)
+                messages.error(request, "This round has been submitted. Responses are locked.")
+                return redirect("round_overview", round_id=round_obj.id)
+            if is_json:
+                return JsonResponse(result)
+            if result["submitted"]:
+                messages.success(request, "Submitted. Your responses are now locked.")
+            elif submit:
+                answered, total = result["answered"], result["total"]
+                messages.error(
+                    request, f"Saved. Please answer all items before submitting (answered {answered}/{total})."
+                )
+            else:
+                messages.success(request, f"Saved {result['saved']} answers.")
+            return redirect("round_overview", round_id=round_obj.id)
+
+        if is_json:
+            return JsonResponse({"errors": {str(key): msg for key, msg in errors.items()}}, status=400)
+        messages.error(request, "Some answers need attention; nothing was saved.")
+
+    stored = {
+        ri_id: (value, comment)
+        for ri_id, value, comment in Response.objects.filter(panelist_id=panelist.id, round_item__round=round_obj)
+        .values_list("round_item_id", "value", "comment")
+    }
+    rows = []
+    for ri in ris:
+        value, comment = stored.get(ri.id, ("", ""))
+        if request.method == "POST" and ri in answers:
+            value, comment = answers[ri]
+        row = _form_row(ri, value, comment)
+        if request.method == "POST":
+            row["error"] = errors.get(ri.id, "")
+        rows.append(row)
+
+    return render(
+        request,
+        "delphi/round_form.html",
+        {
+            "panelist": panelist,
+            "round": round_obj,
+            "rows": rows,
+            "locked": round_obj.submitted_at is not None,
+            "likert_labels": list(LIKERT_LABELS.items()),
+        },
+    )
+
+
+@conditional_page(item_page_version)
 def item_detail(request, round_item_id):
     panelist = _require_panelist(request)
     if not panelist:
@@ -193,196 +377,78 @@ def item_detail(request, round_item_id):
     if not panelist.consent_given:
         return redirect("consent")
 
-    ri = get_object_or_404(RoundItem, id=round_item_id, round__study=panelist.study)
+    ri = get_object_or_404(RoundItem, id=round_item_id, round__study_id=panelist.study_id)
     round_obj = ri.round
 
-    submitted = RoundSubmission.objects.filter(panelist=panelist, round=round_obj).first()
+    submitted = RoundSubmission.objects.filter(panelist_id=panelist.id, round=round_obj).first()
     locked = submitted is not None
 
-    resp = Response.objects.filter(panelist=panelist, round_item=ri).first()
+    resp = Response.objects.filter(panelist_id=panelist.id, round_item=ri).first()
 
-    # Get all items for navigation - ordered by 'order' field
-    all_items = list(round_obj.round_items.order_by('order'))
-    
-    # Find current index
-    current_index = -1
-    for i, item in enumerate(all_items):
-        if item.id == ri.id:
-            current_index = i
-            break
+    # Prev/next and progress come from the cached per-round index
+    nav = get_navigation(round_obj.id)
+    next_item_id = nav.next_id(ri.id)
 
     if request.method == "POST":
         if locked:
             messages.error(request, "This round has been submitted. Responses are locked.")
             return redirect("round_overview", round_id=round_obj.id)
 
-        value = None
-        comment = request.POST.get("comment", "").strip()  # Get comment from form
-
-        # Get the value based on question type
-        if ri.item.item_type == 'likert5':
-            value = request.POST.get("value", "").strip()
-
-        elif ri.item.item_type == 'yesno':
-            value = request.POST.get("value", "").strip()
-
-        elif ri.item.item_type == 'multiple':
-            value = request.POST.get("value", "").strip()
-            other_text = request.POST.get("other_text", "").strip()
-            if value and other_text:
-                option_text = ""
-                if value == "A" and ri.item.option_a:
-                    option_text = ri.item.option_a.lower()
-                elif value == "B" and ri.item.option_b:
-                    option_text = ri.item.option_b.lower()
-                elif value == "C" and ri.item.option_c:
-                    option_text = ri.item.option_c.lower()
-                elif value == "D" and ri.item.option_d:
-                    option_text = ri.item.option_d.lower()
-                elif value == "E" and ri.item.option_e:
-                    option_text = ri.item.option_e.lower()
-                elif value == "F" and ri.item.option_f:
-                    option_text = ri.item.option_f.lower()
-                
-                if "other" in option_text:
-                    value = f"Other: {other_text}"
-
-        elif ri.item.item_type == 'checkbox':
-            values = request.POST.getlist("checkbox_value")
-            other_text = request.POST.get("cb_other_text", "").strip()
-            
-            if values:
-                final_values = []
-                for v in values:
-                    option_text = ""
-                    if v == "A" and ri.item.option_a:
-                        option_text = ri.item.option_a.lower()
-                    elif v == "B" and ri.item.option_b:
-                        option_text = ri.item.option_b.lower()
-                    elif v == "C" and ri.item.option_c:
-                        option_text = ri.item.option_c.lower()
-                    elif v == "D" and ri.item.option_d:
-                        option_text = ri.item.option_d.lower()
-                    elif v == "E" and ri.item.option_e:
-                        option_text = ri.item.option_e.lower()
-                    elif v == "F" and ri.item.option_f:
-                        option_text = ri.item.option_f.lower()
-                    
-                    if "other" in option_text and other_text:
-                        final_values.append(f"Other: {other_text}")
-                    else:
-                        final_values.append(v)
-                value = ",".join(final_values)
-            else:
-                value = ""
-
-        elif ri.item.item_type == 'matrix':
-            value = request.POST.get("value", "").strip()
-            if value == "" or value == "{}":
-                value = ""
-
-        elif ri.item.item_type == 'text':
-            value = request.POST.get("value", "").strip()
-
-        else:
-            value = request.POST.get("value", "").strip()
+        try:
+            value, comment = parse_answer(ri.item, request.POST)
+        except AnswerError as e:
+            messages.error(request, str(e))
+            return redirect("item_detail", round_item_id=ri.id)
 
         # Check if we have a valid response
         if value:
-            # Save the response with comment
-            Response.objects.update_or_create(
-                panelist=panelist, 
-                round_item=ri, 
-                defaults={
-                    "value": value,
-                    "comment": comment if comment else None
-                }
-            )
+            # Save the response with comment (also updates the item's aggregate)
+            try:
+                save_response(panelist.id, ri, value, comment)
+            except RoundLocked:
+                messages.error(request, "This round has been submitted. Responses are locked.")
+                return redirect("round_overview", round_id=round_obj.id)
+            except StaleResponse:
+                messages.error(request, "Your answer was being changed elsewhere at the same time. Please try again.")
+                return redirect("item_detail", round_item_id=ri.id)
             messages.success(request, "Saved.")
             
             # Navigate to next item or back to overview
-            if current_index >= 0 and current_index < len(all_items) - 1:
-                next_item = all_items[current_index + 1]
-                return redirect("item_detail", round_item_id=next_item.id)
+            if next_item_id is not None:
+                return redirect("item_detail", round_item_id=next_item_id)
             else:
                 return redirect("round_overview", round_id=round_obj.id)
         else:
             messages.error(request, "Please provide a response before continuing.")
 
     # GET request or failed validation
-    feedback_allowed = True
-    if round_obj.number == 1 and not round_obj.show_feedback_immediately:
-        has_any = Response.objects.filter(panelist=panelist, round_item__round=round_obj).exists()
-        feedback_allowed = has_any
-
-    # FIX: Don't use AVG on text field - only calculate for likert questions with numeric values
-    agg = None
-    if feedback_allowed and ri.item.item_type == "likert5":
-        try:
-            # Get all numeric responses for this item
-            numeric_values = []
-            responses = Response.objects.filter(round_item=ri)
-            for r in responses:
-                try:
-                    numeric_values.append(float(r.value))
-                except (ValueError, TypeError):
-                    pass
-            
-            if numeric_values:
-                agg = {"mean": sum(numeric_values) / len(numeric_values)}
-        except Exception:
-            agg = None
+    allowed = feedback_allowed(panelist.id, round_obj)
+    show_feedback = allowed and ri.item.item_type != "text"
 
-    total_items = len(all_items)
-    progress_percent = int(((current_index + 1) / total_items) * 100) if total_items > 0 else 0
+    # Rendered feedback card, shared by every panelist viewing the item (see delphi.feedback_cache)
+    feedback = cached_feedback(ri.id) if show_feedback else None
+    stream_url = reverse("feedback_stream", args=[ri.id]) if show_feedback and live_enabled(request) else ""
 
-    prev_item = all_items[current_index - 1] if current_index > 0 else None
-    next_item = all_items[current_index + 1] if current_index < len(all_items) - 1 else None
+    total_items = nav.total
+    progress_percent = nav.progress_percent(ri.id)
+    prev_item_id = nav.previous_id(ri.id)
 
     current_value = resp.value if resp else ""
     current_comment = resp.comment if resp else ""  # Get existing comment
+
+    # Answer carried over from the previous round, if this round was carried forward
+    prior = (
+        PriorResponse.objects.filter(panelist_id=panelist.id, round_item=ri)
+        .select_related("previous_round_item__round")
+        .first()
+    )
+    prior_display = _answer_display(ri.item, prior.value) if prior else ""
     
-    selected_option = ""
-    other_text = ""
-    if ri.item.item_type == 'multiple' and current_value:
-        if current_value.startswith("Other:"):
-            other_text = current_value.replace("Other:", "").strip()
-            if ri.item.option_a and "other" in ri.item.option_a.lower():
-                selected_option = "A"
-            elif ri.item.option_b and "other" in ri.item.option_b.lower():
-                selected_option = "B"
-            elif ri.item.option_c and "other" in ri.item.option_c.lower():
-                selected_option = "C"
-            elif ri.item.option_d and "other" in ri.item.option_d.lower():
-                selected_option = "D"
-            elif ri.item.option_e and "other" in ri.item.option_e.lower():
-                selected_option = "E"
-            elif ri.item.option_f and "other" in ri.item.option_f.lower():
-                selected_option = "F"
-        else:
-            selected_option = current_value
-    
-    cb_other_text = ""
-    if ri.item.item_type == 'checkbox' and current_value:
-        parts = current_value.split(",")
-        for part in parts:
-            if part.startswith("Other:"):
-                cb_other_text = part.replace("Other:", "").strip()
-                break
-
-    matrix_rows = []
-    matrix_columns = []
-    current_matrix_value = {}
-    
-    if ri.item.item_type == 'matrix':
-        matrix_rows = ri.item.get_matrix_rows()
-        matrix_columns = ri.item.get_matrix_columns()
-        if current_value:
-            import json
-            try:
-                current_matrix_value = json.loads(current_value)
-            except json.JSONDecodeError:
-                current_matrix_value = {}
+    schema = item_schema(ri.item)
+    selected_codes, other_text = [], ""
+    if schema.item_type in ("multiple", "checkbox"):
+        selected_codes, other_text = schema.selection(current_value)
+    current_matrix_value = schema.matrix_cells(current_value) if schema.item_type == "matrix" else {}
 
     return render(
         request,
@@ -391,26 +457,147 @@ def item_detail(request, round_item_id):
             "panelist": panelist,
             "round_item": ri,
             "response": resp,
-            "aggregate": agg,
-            "feedback_allowed": feedback_allowed,
+            "feedback": feedback,
+            "feedback_allowed": allowed,
+            "feedback_stream_url": stream_url,
             "locked": locked,
             "submitted": submitted,
             "total_items": total_items,
             "progress_percent": progress_percent,
-            "prev_item": prev_item,
-            "next_item": next_item,
+            "prev_item_id": prev_item_id,
+            "next_item_id": next_item_id,
             "current_value": current_value,
             "current_comment": current_comment,
-            "selected_option": selected_option,
+            "schema": schema,
+            "selected_codes": selected_codes,
             "other_text": other_text,
-            "cb_other_text": cb_other_text,
-            "matrix_rows": matrix_rows,
-            "matrix_columns": matrix_columns,
             "current_matrix_value": current_matrix_value,
+            "prior": prior,
+            "prior_display": prior_display,
+            "autosave_version": resp.updated_at.isoformat() if resp else "",
         },
     )
 
 
+@require_POST
+def autosave_item(request, round_item_id):
+    """
+    Save one answer from a JSON body without rendering a page.
+
+    The body holds the item's form fields (as posted to item_detail) plus
+    "version": the `updated_at` returned by the last save, or null before the
+    first one. If the stored answer has changed since that version (another
+    tab or device), nothing is written and 409 returns the stored answer.
+    """
+    panelist = _require_panelist(request)
+    if not panelist or not panelist.consent_given:
+        return JsonResponse({"error": "forbidden", "message": "Please sign in again."}, status=403)
+
+    ri = (
+        RoundItem.objects.select_related("item")
+        .filter(id=round_item_id, round__study_id=panelist.study_id)
+        .first()
+    )
+    if ri is None:
+        return JsonResponse({"error": "not_found", "message": "Item not found."}, status=404)
+
+    try:
+        body = json.loads(request.body)
+        if not isinstance(body, dict):
+            raise ValueError
+        version = body.get("version") or None
+        if version is not None:
+            version = parse_datetime(version)
+            if version is None:
+                raise ValueError
+        value, comment = parse_answer(ri.item, answer_data(body))
+    except AnswerError as e:
+        return JsonResponse({"error": "invalid", "message": str(e)}, status=400)
+    except (ValueError, TypeError):
+        return JsonResponse({"error": "invalid", "message": "Send the answer as a JSON object."}, status=400)
+    if not value:
+        return JsonResponse({"error": "invalid", "message": "Please provide a response."}, status=400)
+
+    try:
+        response = save_response(panelist.id, ri, value, comment, expected_version=version)
+    except RoundLocked:
+        return JsonResponse(
+            {"error": "locked", "message": "This round has been submitted. Responses are locked."}, status=409
+        )
+    except StaleResponse as e:
+        stored_value, stored_comment, updated_at = e.current or ("", "", None)
+        return JsonResponse(
+            {
+                "error": "stale",
+                "message": "This answer was changed elsewhere. Reload the page to see the latest version.",
+                "version": updated_at.isoformat() if updated_at else None,
+                "value": stored_value,
+                "comment": stored_comment or "",
+            },
+            status=409,
+        )
+    return JsonResponse({"status": "saved", "version": response.updated_at.isoformat()})
+
+
+@require_GET
+@conditional_page(item_page_version)
+def item_feedback(request, round_item_id):
+    """
+    A round item's group feedback as JSON (the payload the live stream sends,
+    with the rendered card), for client-side refreshes; revalidates with ETag.
+    """
+    if _feedback_topic(request, "item", round_item_id) is None:
+        return JsonResponse({"error": "forbidden", "message": "Group feedback is not available."}, status=403)
+    feedback = cached_feedback(round_item_id)
+    if feedback is None:
+        return JsonResponse({"round_item_id": round_item_id, "n": 0})
+    return JsonResponse(feedback)
+
+
+def _feedback_topic(request, kind, pk):
+    """The stream topic (kind, pk) if the panelist may see that round item's or round's feedback, else None."""
+    panelist = _require_panelist(request)
+    if not panelist or not panelist.consent_given:
+        return None
+    if kind == "item":
+        ri = RoundItem.objects.select_related("round").filter(id=pk, round__study_id=panelist.study_id).first()
+        round_obj = ri.round if ri else None
+    else:
+        round_obj = Round.objects.filter(id=pk, study_id=panelist.study_id).first()
+    if round_obj is None or not feedback_allowed(panelist.id, round_obj):
+        return None
+    return (kind, pk)
+
+
+@require_GET
+async def feedback_stream(request, round_item_id=None, round_id=None):
+    """
+    Server-Sent Events carrying a round item's (or a whole round's) group
+    feedback each time it changes. Every event is the item's feedback payload
+    with the rendered card; see delphi.live. A reconnecting browser sends the
+    last event id and first receives whatever changed since.
+    """
+    if not live_enabled(request):
+        # No content tells EventSource not to reconnect
+        return HttpResponse(status=204)
+    kind, pk = ("item", round_item_id) if round_item_id is not None else ("round", round_id)
+    topic = await sync_to_async(_feedback_topic)(request, kind, pk)
+    if topic is None:
+        return HttpResponse(status=403)
+
+    backlog = []
+    since = parse_datetime(request.headers.get("Last-Event-ID", ""))
+    if since is not None:
+        changed = await sync_to_async(changed_aggregates)(since, {topic})
+        backlog = [(version, data) for _, _, version, data in changed]
+
+    response = StreamingHttpResponse(event_stream([topic], backlog), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx-style proxies from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 def token_login(request, token):
     panelist = get_object_or_404(Panelist, token=token)
     
@@ -551,17 +738,19 @@ def load_questions_view(request):
     if secret_key != 'delphi2024secret':
         return HttpResponse('Not authorized', status=403)
     
-    from django.core.management import call_command
-    from io import StringIO
+    from django.utils.html import escape
+    from .importers import load_question_bank
     
+    dry_run = request.GET.get('dry_run') == '1'
     try:
-        out = StringIO()
-        call_command('load_questions', stdout=out)
-        output = out.getvalue()
+        result = load_question_bank(dry_run=dry_run)
+        changes = "\n".join(result["changes"]) or "No changes."
         
         return HttpResponse(
-            f'<h3>Questions Loaded Successfully!</h3>'
-            f'<pre>{output}</pre>'
+            f'<h3>{"Dry run: nothing written" if dry_run else "Questions Loaded Successfully!"}</h3>'
+            f'<p>created={result["created"]}, updated={result["updated"]}, unchanged={result["unchanged"]}, '
+            f'attached={result["attached"]}, reordered={result["reordered"]}</p>'
+            f'<pre>{escape(changes)}</pre>'
             f'<br><br>'
             f'<strong>Go to /admin/ to verify the questions.</strong>'
         )
@@ -575,4 +764,4 @@ def load_questions_view(request):
             f'<h3>Details:</h3>'
             f'<pre>{error_details}</pre>',
             status=500
-        )
\ No newline at end of file
+        )